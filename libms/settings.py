@@ -58,7 +58,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -66,6 +65,14 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compile each template once per process; in development runserver
+            # resets the cache whenever a template file changes
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -92,6 +99,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/ref/settings/#caches
+# Use a shared backend (Redis, Memcached) in production so every worker sees
+# the same catalogue version and cached data.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='libms'),
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='libms'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -128,11 +149,35 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = config('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
+
+# collectstatic writes each file under a content-hashed name (base.4f2c9e1a.css)
+# and {% static %} links to it, so stylesheets can be cached for a year and a
+# deploy changes their URLs. It also strips unused rules from the vendored
+# CSS and writes .gz/.br variants (see library/assets.py and LIBRARY_ASSETS).
+# DEBUG serves the unhashed sources directly.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'library.assets.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 
 # Media files (uploaded content)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# How library.views.media serves MEDIA_URL: '' streams files from Django;
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache, lighttpd) hand the
+# transfer to the front-end server, which maps MEDIA_ACCEL_PREFIX to MEDIA_ROOT
+MEDIA_SERVE_MODE = config('MEDIA_SERVE_MODE', default='')
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
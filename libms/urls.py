@@ -15,9 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+from library.views.assets import serve_static
+from library.views.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,8 +26,11 @@ urlpatterns = [
 
     # Including URLs from the library app
     path('',include('library.urls')),
-]
 
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Uploaded media, streamed or delegated to the front-end server (see MEDIA_SERVE_MODE)
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+
+    # Collected static files with their precompressed variants; with DEBUG on,
+    # runserver serves the app sources before this is reached
+    re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_static),
+]
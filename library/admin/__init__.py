@@ -6,6 +6,7 @@ from django.contrib import admin
 from .user import UserProfileAdmin
 from .book import BookAdmin
 from .review import ReviewAdmin
+from .taxonomy import AuthorAdmin, CategoryAdmin
 
 # Customize admin site headers
 admin.site.site_header = "Library Management System Administration"
@@ -16,4 +17,6 @@ __all__ = [
     'UserProfileAdmin',
     'BookAdmin',
     'ReviewAdmin',
+    'AuthorAdmin',
+    'CategoryAdmin',
 ]
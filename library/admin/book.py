@@ -4,6 +4,7 @@ Django admin configuration for Book model
 """
 from django.contrib import admin
 from ..models import Book
+from ..models.book import RATING_AGGREGATE_FIELDS
 
 
 @admin.register(Book)
@@ -12,6 +13,7 @@ class BookAdmin(admin.ModelAdmin):
     list_filter = ('category', 'published_date')
     search_fields = ('title', 'author', 'isbn')
     ordering = ('title',)
+    readonly_fields = RATING_AGGREGATE_FIELDS
     fieldsets = (
         ('Book Information', {
             'fields': ('title', 'author', 'isbn', 'category')
@@ -22,5 +24,9 @@ class BookAdmin(admin.ModelAdmin):
         ('Media', {
             'fields': ('cover_pic',)
         }),
+        ('Ratings', {
+            'fields': RATING_AGGREGATE_FIELDS,
+            'classes': ('collapse',)
+        }),
     )
     list_per_page = 10
@@ -0,0 +1,25 @@
+"""
+Taxonomy Admin
+Django admin configuration for Author and Category models
+"""
+from django.contrib import admin
+from ..models import Author, Category
+
+
+class CatalogueEntityAdmin(admin.ModelAdmin):
+    list_display = ('name', 'book_count')
+    search_fields = ('name', 'key')
+    ordering = ('name',)
+    readonly_fields = ('key', 'book_count')
+    fields = ('name', 'key', 'book_count')
+    list_per_page = 50
+
+
+@admin.register(Author)
+class AuthorAdmin(CatalogueEntityAdmin):
+    pass
+
+
+@admin.register(Category)
+class CategoryAdmin(CatalogueEntityAdmin):
+    pass
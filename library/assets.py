@@ -0,0 +1,308 @@
+"""
+Static Asset Pipeline
+Static files storage used by collectstatic in production.
+
+Before hashing, the vendored stylesheets listed in LIBRARY_ASSETS['PURGE']
+lose every rule whose selectors name a class found nowhere in the app's
+templates, Python code, scripts and own stylesheets. The files are then
+stored under content-hashed names as with ManifestStaticFilesStorage, and
+each hashed text file gets gzip and, when the brotli package is installed,
+brotli variants next to it (`base.4ffc35d4549c.css.gz`, `.br`) for
+library.views.assets or the front-end server to pick by Accept-Encoding.
+"""
+import gzip
+import os
+import re
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only gzip variants are written
+    brotli = None
+
+DEFAULTS = {
+    # Stylesheets stripped of the rules no source uses
+    'PURGE': [
+        'library/vendor/bootstrap/css/bootstrap.min.css',
+        'library/vendor/fontawesome/css/all.min.css',
+    ],
+    # Classes that only appear at runtime, mostly toggled by bootstrap.bundle.js
+    'SAFELIST': [
+        r'^(show|showing|hiding|fade|collapse|collapsing|collapse-horizontal|active|disabled|was-validated)$',
+        r'^(modal|offcanvas|tooltip|popover|bs-tooltip|bs-popover|carousel-item|dropdown-menu)(-|$)',
+    ],
+    # Extra files or directories scanned for class names, e.g. project-level templates
+    'CONTENT': [],
+    # Types that get compressed variants; images and woff2 fonts are compressed already
+    'COMPRESS_EXTENSIONS': ['.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.ttf', '.eot', '.otf', '.ico'],
+    # Files smaller than this are sent as they are
+    'COMPRESS_MIN_SIZE': 512,
+}
+
+# (Accept-Encoding coding, file suffix) in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+SOURCE_EXTENSIONS = ('.html', '.py', '.js', '.css', '.txt')
+TOKEN = re.compile(r'[A-Za-z_][\w-]*')
+CLASS_SELECTOR = re.compile(r'\.((?:\\.|[\w-])+)')
+LEADING_COMMENTS = re.compile(r'^\s*(?:/\*.*?\*/\s*)*', re.S)
+NESTING_AT_RULES = ('@media', '@supports', '@container', '@layer', '@document')
+
+
+def assets_settings():
+    """
+    Return LIBRARY_ASSETS merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'LIBRARY_ASSETS', {})}
+
+
+def content_files(extra=()):
+    """
+    Yield the source files of the library app (vendored assets and migrations
+    excluded) and of the extra paths that may name CSS classes
+    """
+    library = apps.get_app_config('library').path
+    vendor = os.path.join(library, 'static', 'library', 'vendor')
+    for root in (library, *extra):
+        if os.path.isfile(root):
+            yield root
+            continue
+        for directory, subdirectories, files in os.walk(root):
+            subdirectories[:] = [
+                name for name in subdirectories
+                if name not in ('migrations', '__pycache__') and os.path.join(directory, name) != vendor
+            ]
+            for name in files:
+                if name.endswith(SOURCE_EXTENSIONS):
+                    yield os.path.join(directory, name)
+
+
+def class_filter(config=None):
+    """
+    Return keep(class_name) deciding whether a class may be used by a page.
+    Every identifier-like word of the sources counts as used, as does every
+    class starting with a word that ends in '-', which a template completes
+    at render time (alert-{{ message.tags }}).
+    """
+    config = config or assets_settings()
+    tokens = set()
+    for path in content_files(config['CONTENT']):
+        with open(path, encoding='utf-8', errors='ignore') as source:
+            tokens.update(TOKEN.findall(source.read()))
+    prefixes = tuple(token for token in tokens if token.endswith('-'))
+    safelist = [re.compile(pattern) for pattern in config['SAFELIST']]
+
+    def keep(name):
+        return (
+            name in tokens
+            or name.startswith(prefixes)
+            or any(pattern.search(name) for pattern in safelist)
+        )
+
+    return keep
+
+
+def _skip(css, index):
+    """
+    Return the index after the comment or string starting at index, or index itself
+    """
+    if css.startswith('/*', index):
+        end = css.find('*/', index + 2)
+        return len(css) if end < 0 else end + 2
+    if css[index] in '"\'':
+        quote = css[index]
+        index += 1
+        while index < len(css) and css[index] != quote:
+            index += 2 if css[index] == '\\' else 1
+        return index + 1
+    return index
+
+
+def split_rules(css):
+    """
+    Yield (prelude, block) for every top-level rule of a stylesheet, with
+    block None for statements such as @charset and for trailing text
+    """
+    index, length = 0, len(css)
+    while index < length:
+        start = index
+        while index < length and css[index] not in '{;':
+            skipped = _skip(css, index)
+            index = skipped if skipped != index else index + 1
+        if index >= length:
+            yield css[start:], None
+            return
+        if css[index] == ';':
+            yield css[start:index + 1], None
+            index += 1
+            continue
+        opening, depth = index, 0
+        while index < length:
+            skipped = _skip(css, index)
+            if skipped != index:
+                index = skipped
+                continue
+            if css[index] == '{':
+                depth += 1
+            elif css[index] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            index += 1
+        yield css[start:opening], css[opening + 1:index]
+        index += 1
+
+
+def split_selectors(prelude):
+    """
+    Split a selector list on its top-level commas
+    """
+    selectors, depth, start, index = [], 0, 0, 0
+    while index < len(prelude):
+        skipped = _skip(prelude, index)
+        if skipped != index:
+            index = skipped
+            continue
+        character = prelude[index]
+        if character in '([':
+            depth += 1
+        elif character in ')]':
+            depth -= 1
+        elif character == ',' and depth == 0:
+            selectors.append(prelude[start:index])
+            start = index + 1
+        index += 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def _outer_classes(selector):
+    """
+    Return the class names a selector requires, ignoring attribute selectors and
+    the arguments of :not(), :is() and the like, or None when it cannot tell
+    """
+    outer, depth, index = [], 0, 0
+    while index < len(selector):
+        skipped = _skip(selector, index)
+        if skipped != index:
+            index = skipped
+            continue
+        character = selector[index]
+        if character in '([':
+            depth += 1
+        elif character in ')]':
+            depth -= 1
+        elif depth == 0:
+            outer.append(character)
+        index += 1
+    names = CLASS_SELECTOR.findall(''.join(outer))
+    if any('\\' in name for name in names):
+        return None
+    return names
+
+
+def purge_css(css, keep):
+    """
+    Return the stylesheet without the rules whose every selector names a
+    class rejected by keep(); comments leading a rule (licenses) stay
+    """
+    output = []
+    for prelude, block in split_rules(css):
+        if block is None:
+            output.append(prelude)
+            continue
+        comments = LEADING_COMMENTS.match(prelude).group(0)
+        rule = prelude[len(comments):]
+        if rule.startswith('@'):
+            if rule.lower().startswith(NESTING_AT_RULES):
+                block = purge_css(block, keep)
+                if not block.strip():
+                    output.append(comments)
+                    continue
+            output.append(f'{prelude}{{{block}}}')
+            continue
+        selectors = [
+            selector for selector in split_selectors(rule)
+            if (names := _outer_classes(selector)) is None or all(keep(name) for name in names)
+        ]
+        if selectors:
+            output.append(f"{comments}{','.join(selectors)}{{{block}}}")
+        else:
+            output.append(comments)
+    return ''.join(output)
+
+
+def compressed_variants(data):
+    """
+    Yield (suffix, bytes) of every compressed encoding available
+    """
+    # mtime=0 keeps the output identical between collectstatic runs
+    yield '.gz', gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that purges unused CSS before hashing and
+    writes gzip/brotli variants of the hashed files
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        paths = dict(paths)
+        if not dry_run:
+            self.purge(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Templates link to the hashed names only, so only those are compressed
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            for variant in self.compress(hashed_name):
+                yield hashed_name, variant, True
+
+    def purge(self, paths):
+        """
+        Replace the collected copies of the PURGE stylesheets with their used rules
+        """
+        config = assets_settings()
+        targets = [name for name in config['PURGE'] if name in paths]
+        if not targets:
+            return
+        keep = class_filter(config)
+        for name in targets:
+            storage, path = paths[name]
+            with storage.open(path) as source:
+                css = source.read().decode('utf-8')
+            self.replace(name, purge_css(css, keep).encode('utf-8'))
+            paths[name] = (self, name)
+
+    def compress(self, name):
+        """
+        Write the compressed variants of a stored file that are worth keeping; return their names
+        """
+        config = assets_settings()
+        if os.path.splitext(name)[1].lower() not in config['COMPRESS_EXTENSIONS']:
+            return []
+        with self.open(name) as source:
+            data = source.read()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return []
+        written = []
+        for suffix, compressed in compressed_variants(data):
+            variant = f'{name}{suffix}'
+            if len(compressed) >= len(data):
+                if self.exists(variant):
+                    self.delete(variant)
+                continue
+            self.replace(variant, compressed)
+            written.append(variant)
+        return written
+
+    def replace(self, name, data):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(data))
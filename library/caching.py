@@ -0,0 +1,64 @@
+"""
+Cache Helpers
+Shared-cache patterns used by the catalogue views
+"""
+import time
+from django.core.cache import cache
+
+# How long a recompute may hold the single-flight lock before others give up waiting
+LOCK_TIMEOUT = 10
+
+
+def get_or_compute(key, compute, ttl, grace=None, wait=2.0):
+    """
+    Return the cached value of `key`, recomputing it at most once at a time.
+
+    Values are stored with a soft expiry `ttl` seconds out and kept for `grace`
+    more seconds. Once stale, the first caller takes a lock and recomputes
+    while everyone else keeps serving the stale copy. When nothing is cached at
+    all, the others wait up to `wait` seconds for the winner before computing
+    it themselves.
+    """
+    grace = ttl * 5 if grace is None else grace
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None and entry['expires_at'] > now:
+        return entry['value']
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            return store(key, compute(), ttl, grace)
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry['value']
+
+    deadline = now + wait
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+    return compute()
+
+
+def expire(key):
+    """
+    Mark a value stale without recomputing it: the next get_or_compute call
+    refreshes it once under the lock while the others keep the stale copy
+    """
+    entry = cache.get(key)
+    if entry is not None and entry['expires_at'] > 0:
+        # The stale copy only has to outlive the next read
+        cache.set(key, {**entry, 'expires_at': 0})
+
+
+def store(key, value, ttl, grace=None):
+    """
+    Cache a value in the format get_or_compute reads, e.g. for eager refreshes
+    """
+    grace = ttl * 5 if grace is None else grace
+    cache.set(key, {'value': value, 'expires_at': time.time() + ttl}, ttl + grace)
+    return value
@@ -0,0 +1,63 @@
+"""
+Catalogue Version
+Counters in the shared cache that change whenever a Book (the catalogue
+version) or a Review (the review version) is created, updated or deleted.
+Cached data derived from them embeds the version in its key, so a bump
+invalidates all of it at once without deleting anything.
+"""
+import time
+from django.core.cache import cache
+
+VERSION_KEY = 'library:catalogue:version'
+REVIEW_VERSION_KEY = 'library:reviews:version'
+
+
+def _initial_version():
+    # Milliseconds since the epoch, so a version lost to cache eviction or a
+    # restart never restarts at a value that earlier keys were built with
+    return int(time.time() * 1000)
+
+
+def _current(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key, _initial_version())
+    return version
+
+
+def _bump(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The key was missing or evicted; start a fresh, larger version
+        cache.add(key, _initial_version(), timeout=None)
+        return cache.incr(key)
+
+
+def catalogue_version():
+    """
+    Return the current catalogue version
+    """
+    return _current(VERSION_KEY)
+
+
+def bump_catalogue_version():
+    """
+    Advance the catalogue version; call once the change is committed
+    """
+    return _bump(VERSION_KEY)
+
+
+def review_version():
+    """
+    Return the current review version
+    """
+    return _current(REVIEW_VERSION_KEY)
+
+
+def bump_review_version():
+    """
+    Advance the review version; call once the change is committed
+    """
+    return _bump(REVIEW_VERSION_KEY)
@@ -0,0 +1,121 @@
+"""
+Conditional GET
+Decorators answering repeat requests for catalogue pages with 304 Not Modified.
+
+Validators come from the catalogue version (a cache read) or from one indexed
+row lookup, so a 304 costs no template rendering. Every page embeds the
+navbar of whoever is signed in, so the ETag covers the user, their role and
+their session as well, the response varies on Cookie and pages of signed-in
+users are marked private.
+"""
+import hashlib
+from functools import wraps
+from django.contrib.messages import get_messages
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from .catalogue import catalogue_version
+from .models import Book, Review
+
+
+def user_key(request):
+    """
+    Identify what the user-dependent parts of a page are rendered from: who is
+    signed in, under which name and role, and in which session, so a role
+    change or a new login never revalidates a copy rendered before it
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    return ':'.join(str(part) for part in (
+        'user', user.pk, user.get_username(), int(user.is_staff), int(user.is_superuser),
+        user.get_session_auth_hash(), request.session.session_key,
+    ))
+
+
+def has_pending_messages(request):
+    # len() of the message storage does not mark the messages as shown
+    return len(get_messages(request)) > 0
+
+
+def conditional_page(etag_parts, last_modified=None):
+    """
+    Make a read view answer If-None-Match / If-Modified-Since with 304.
+
+    `etag_parts(request, *args, **kwargs)` returns the values the page depends
+    on besides the user, or None when they cannot be computed cheaply (the view
+    then renders normally). `last_modified` works like condition()'s and is
+    only used for anonymous requests.
+    Pages carrying flash messages are always rendered and never validated.
+    """
+    def etag_func(request, *args, **kwargs):
+        parts = etag_parts(request, *args, **kwargs)
+        if parts is None:
+            return None
+        source = '|'.join(str(part) for part in (*parts, user_key(request)))
+        return hashlib.sha1(source.encode()).hexdigest()
+
+    def last_modified_func(request, *args, **kwargs):
+        # A date cannot tell one user's copy from another's
+        if last_modified is None or request.user.is_authenticated:
+            return None
+        return last_modified(request, *args, **kwargs)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if has_pending_messages(request):
+                response = view(request, *args, **kwargs)
+            else:
+                response = conditional_view(request, *args, **kwargs)
+            patch_vary_headers(response, ['Cookie'])
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(response, public=True, no_cache=True)
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def catalogue_etag(request, *args, **kwargs):
+    """
+    Pages built only from catalogue data change with the catalogue version
+    """
+    return [catalogue_version()]
+
+
+def book_page_state(request, pk):
+    """
+    Return (book.updated_at, newest review updated_at) in one query, or None.
+    The newest review is one seek on the (book, updated_at) index, however
+    many reviews the book has.
+    """
+    if not hasattr(request, '_book_page_state'):
+        last_review = (
+            Review.objects.filter(book=OuterRef('pk'))
+            .order_by('-updated_at')
+            .values('updated_at')[:1]
+        )
+        request._book_page_state = (
+            Book.objects.filter(pk=pk)
+            .annotate(last_review=Subquery(last_review))
+            .values_list('updated_at', 'last_review')
+            .first()
+        )
+    return request._book_page_state
+
+
+def book_etag(request, pk):
+    return book_page_state(request, pk)
+
+
+def book_last_modified(request, pk):
+    state = book_page_state(request, pk)
+    if state is None:
+        return None
+    return max(timestamp for timestamp in state if timestamp is not None)
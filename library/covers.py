@@ -0,0 +1,149 @@
+"""
+Cover Renditions
+Resized WebP and JPEG copies of Book.cover_pic, made after an upload is
+committed so the request that saved it does not wait for them.
+
+Renditions are named after a hash of the source image and their width, so
+identical uploads share files, a new cover gets new URLs that can be cached
+forever, and regenerating is a no-op. Until they exist templates fall back to
+the original upload.
+"""
+import hashlib
+import io
+import logging
+import re
+import threading
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models.functions import Now
+from PIL import Image, ImageOps
+from .catalogue import bump_catalogue_version
+from .models import Book
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Rendition widths in pixels: card and detail sizes plus their 2x versions
+    'WIDTHS': (300, 400, 600, 800),
+    # Output format -> (Pillow format, quality)
+    'FORMATS': {'webp': ('WEBP', 80), 'jpg': ('JPEG', 82)},
+    # Directory of the renditions inside the media storage
+    'DIRECTORY': 'cover_pics/renditions',
+    # Generate in a background thread after commit; False renders inline (e.g. for tests)
+    'BACKGROUND': True,
+}
+
+# Template layouts -> (width of the fallback src, sizes attribute)
+LAYOUTS = {
+    'card': (300, '(min-width: 1200px) 300px, (min-width: 768px) 33vw, 100vw'),
+    'detail': (400, '(min-width: 768px) 33vw, 100vw'),
+}
+
+MIME_TYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+
+def cover_settings():
+    """
+    Return LIBRARY_COVERS merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'LIBRARY_COVERS', {})}
+
+
+def rendition_name(digest, width, extension):
+    config = cover_settings()
+    return f"{config['DIRECTORY']}/{digest[:2]}/{digest}-{width}.{extension}"
+
+
+def is_rendition(name):
+    """
+    Whether a media path names a rendition, whose content never changes
+    """
+    directory = re.escape(cover_settings()['DIRECTORY'])
+    return bool(re.match(rf'{directory}/[0-9a-f]{{2}}/[0-9a-f]{{16}}-\d+\.\w+$', name))
+
+
+def rendition_url(book, width, extension):
+    return default_storage.url(rendition_name(book.cover_digest, width, extension))
+
+
+def srcset(book, extension):
+    """
+    Return the srcset attribute listing every rendition of a book's cover in one format
+    """
+    return ', '.join(
+        f'{rendition_url(book, width, extension)} {width}w' for width in cover_settings()['WIDTHS']
+    )
+
+
+def _flatten(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render(image, width, pillow_format, quality):
+    """
+    Return the encoded bytes of an image scaled down to `width`; smaller images are not enlarged
+    """
+    copy = image.copy()
+    copy.thumbnail((width, width * 2), Image.LANCZOS)
+    output = io.BytesIO()
+    options = {'optimize': True, 'progressive': True} if pillow_format == 'JPEG' else {'method': 4}
+    copy.save(output, pillow_format, quality=quality, **options)
+    return output.getvalue()
+
+
+def generate(book_id):
+    """
+    Make the missing renditions of a book's current cover and record their digest.
+    Returns the digest, or None when the book has no readable cover.
+    """
+    book = Book.objects.filter(pk=book_id).only('pk', 'cover_pic', 'cover_digest').first()
+    if book is None or not book.cover_pic:
+        return None
+    source_name = book.cover_pic.name
+    with book.cover_pic.storage.open(source_name, 'rb') as source:
+        data = source.read()
+    digest = hashlib.sha1(data).hexdigest()[:16]
+
+    config = cover_settings()
+    image = None
+    for extension, (pillow_format, quality) in config['FORMATS'].items():
+        for width in config['WIDTHS']:
+            name = rendition_name(digest, width, extension)
+            # Plain default storage: the names are already derived from the content
+            if default_storage.exists(name):
+                continue
+            if image is None:
+                image = _flatten(Image.open(io.BytesIO(data)))
+            default_storage.save(name, io.BytesIO(render(image, width, pillow_format, quality)))
+
+    # Guarded by the source name in case the cover was replaced meanwhile
+    books = Book.objects.filter(pk=book_id, cover_pic=source_name).exclude(cover_digest=digest)
+    if books.update(cover_digest=digest, updated_at=Now()):
+        bump_catalogue_version()
+    return digest
+
+
+def _generate_in_background(book_id):
+    try:
+        generate(book_id)
+    except Exception:
+        logger.exception('Could not render the cover of book %s', book_id)
+    finally:
+        connection.close()
+
+
+def schedule(book_id):
+    """
+    Generate a book's renditions off the request path
+    """
+    if not cover_settings()['BACKGROUND']:
+        generate(book_id)
+        return
+    threading.Thread(target=_generate_in_background, args=(book_id,), daemon=True).start()
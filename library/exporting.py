@@ -0,0 +1,140 @@
+"""
+Catalogue Export
+Streams Book and Review rows as CSV or JSON Lines, optionally gzipped, for the
+staff export views and the export_catalogue command. Rows are read in chunks
+and encoded as they go, so memory use does not grow with the table.
+"""
+import csv
+import json
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from .models import Book, Review
+
+# Dataset -> (model, [(column, values_list lookup)])
+DATASETS = {
+    'books': (Book, [
+        ('id', 'id'), ('isbn', 'isbn'), ('title', 'title'), ('author', 'author'), ('category', 'category'),
+        ('published_date', 'published_date'), ('available_copies', 'available_copies'),
+        ('review_count', 'review_count'), ('average_rating', 'average_rating'), ('description', 'description'),
+    ]),
+    'reviews': (Review, [
+        ('id', 'id'), ('book_id', 'book_id'), ('book_isbn', 'book__isbn'), ('username', 'user__username'),
+        ('rating', 'rating'), ('review_text', 'review_text'), ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]),
+}
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# Encoded output is handed out in pieces of about this many bytes
+BUFFER_SIZE = 64 * 1024
+
+# Leading characters that make spreadsheet applications evaluate a CSV cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def stream_rows(model, lookups, chunk_size=2000):
+    """
+    Yield value tuples of every row in primary key order.
+
+    PostgreSQL and Oracle read through a server-side cursor and SQLite steps
+    its result lazily. mysqlclient buffers whole result sets client-side, so on
+    MySQL the table is walked in primary key ranges instead.
+    """
+    queryset = model.objects.order_by('pk').values_list('pk', *lookups)
+    if connection.vendor != 'mysql':
+        for row in queryset.iterator(chunk_size=chunk_size):
+            yield row[1:]
+        return
+
+    last_pk = None
+    while True:
+        chunk = queryset.filter(pk__gt=last_pk) if last_pk is not None else queryset
+        rows = list(chunk[:chunk_size])
+        for row in rows:
+            yield row[1:]
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
+
+
+class _LineBuffer:
+    """
+    File-like target for csv.writer that hands back what was written
+    """
+
+    def write(self, value):
+        return value
+
+
+def looks_like_formula(value):
+    # Apostrophes already leading the text are quoted too, so import can undo exactly one
+    return isinstance(value, str) and value.lstrip("'").startswith(FORMULA_PREFIXES)
+
+
+def csv_cell(value):
+    """
+    Quote text a spreadsheet would run as a formula (CSV injection) with a leading apostrophe
+    """
+    return f"'{value}" if looks_like_formula(value) else value
+
+
+def csv_lines(columns, rows):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([csv_cell(value) for value in row])
+
+
+def jsonl_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def buffered(lines):
+    """
+    Join encoded lines into chunks of about BUFFER_SIZE bytes
+    """
+    pending, size = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        pending.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b''.join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b''.join(pending)
+
+
+def gzipped(chunks):
+    """
+    Compress a byte stream into one gzip member on the fly
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(dataset, output_format='csv', compress=False, chunk_size=2000):
+    """
+    Return an iterator of bytes holding the whole dataset in the given format
+    """
+    model, fields = DATASETS[dataset]
+    columns = [column for column, lookup in fields]
+    rows = stream_rows(model, [lookup for column, lookup in fields], chunk_size)
+    encode = csv_lines if output_format == 'csv' else jsonl_lines
+    chunks = buffered(encode(columns, rows))
+    return gzipped(chunks) if compress else chunks
+
+
+def export_filename(dataset, output_format, compress, date):
+    suffix = '.gz' if compress else ''
+    return f'{dataset}-{date:%Y%m%d}.{output_format}{suffix}'
@@ -4,7 +4,7 @@ Exports all form classes for easy importing
 """
 from .auth import UserRegistrationForm, UserLoginForm
 from .user import UserProfileForm, UserUpdateForm
-from .book import BookForm
+from .book import BookForm, BookImportForm
 from .review import ReviewForm
 
 __all__ = [
@@ -13,5 +13,6 @@ __all__ = [
     'UserProfileForm',
     'UserUpdateForm',
     'BookForm',
+    'BookImportForm',
     'ReviewForm',
 ]
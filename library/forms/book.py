@@ -47,3 +47,16 @@ class BookForm(forms.ModelForm):
                 'class': 'form-control'
             })
         }
+
+
+class BookImportForm(BookForm):
+    """
+    Validates one imported record with the BookForm rules, minus the cover upload
+    """
+    class Meta(BookForm.Meta):
+        fields = ['title', 'author', 'isbn', 'description', 'category', 'published_date', 'available_copies']
+
+    def validate_unique(self):
+        # An ISBN already in the catalogue is an update, not an error; skipping
+        # the check also saves one query per record
+        pass
@@ -0,0 +1,65 @@
+"""
+Homepage Data
+Catalogue statistics and the recent-books strip shown by the index view,
+held in the shared cache, marked stale when books change and recomputed once
+by the next reader
+"""
+from django.db.models import Count, Q
+from .caching import expire, get_or_compute, store
+from .models import Book
+
+STATS_KEY = 'library:home:stats'
+RECENT_KEY = 'library:home:recent'
+
+# Seconds before cached values are recomputed on read
+STATS_TTL = 60
+# Books in the recently added strip
+RECENT_BOOKS = 8
+# Columns the recently added strip displays
+RECENT_FIELDS = ('id', 'title', 'author', 'cover_pic', 'cover_digest', 'review_count', 'average_rating')
+
+
+def compute_stats():
+    """
+    All homepage counts in a single aggregate query
+    """
+    return Book.objects.aggregate(
+        total_books=Count('pk'),
+        total_categories=Count('category', distinct=True),
+        total_authors=Count('author', distinct=True),
+        available_books=Count('pk', filter=Q(available_copies__gt=0)),
+    )
+
+
+def compute_recent_ids():
+    return list(Book.objects.order_by('-id').values_list('id', flat=True)[:RECENT_BOOKS])
+
+
+def catalogue_stats():
+    return get_or_compute(STATS_KEY, compute_stats, STATS_TTL)
+
+
+def recent_books():
+    """
+    Return the most recently added books, newest first, from the cached id list
+    """
+    ids = get_or_compute(RECENT_KEY, compute_recent_ids, STATS_TTL)
+    books = Book.objects.only(*RECENT_FIELDS).in_bulk(ids)
+    return [books[pk] for pk in ids if pk in books]
+
+
+def mark_stale():
+    """
+    Have the next homepage request recompute the data; called once a Book
+    change is committed, so a run of saves costs no aggregate each
+    """
+    expire(STATS_KEY)
+    expire(RECENT_KEY)
+
+
+def refresh():
+    """
+    Recompute and store the homepage data now, e.g. after a bulk import
+    """
+    store(STATS_KEY, compute_stats(), STATS_TTL)
+    store(RECENT_KEY, compute_recent_ids(), STATS_TTL)
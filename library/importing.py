@@ -0,0 +1,328 @@
+"""
+Catalogue Import
+Streams book records out of CSV, JSON Lines or MARC 21 files, validates them
+with the BookForm rules and upserts them by ISBN one chunk at a time.
+
+Bulk writes bypass the model signals, so each chunk also recounts the authors
+and categories it touched, indexes its books for search and bumps the
+catalogue version. Autocomplete indexes of running workers pick the new books
+up on their next periodic rebuild.
+"""
+import csv
+import gzip
+import hashlib
+import json
+import os
+import re
+from django.db import transaction
+from django.utils import timezone
+from .catalogue import bump_catalogue_version
+from .exporting import looks_like_formula
+from .forms import BookImportForm
+from .models import Author, Book, Category
+from .models.taxonomy import name_key
+from .search import get_search_backend
+
+# Columns an import writes; cover images and rating aggregates are left alone
+IMPORT_FIELDS = tuple(BookImportForm._meta.fields)
+
+
+class MalformedRecord:
+    """
+    Stands in for a record the reader could not parse or would not trust
+    """
+
+    def __init__(self, message, isbn=''):
+        self.message = message
+        self.isbn = isbn
+
+
+def open_source(path, binary=False):
+    """
+    Open an input file for streaming, decompressing .gz files on the fly
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    if binary:
+        return opener(path, 'rb')
+    return opener(path, 'rt', encoding='utf-8-sig', newline='')
+
+
+def read_csv(stream):
+    """
+    Yield one dict per CSV row, keyed by the header line, undoing the formula
+    quoting of export_catalogue so exported files import unchanged. Columns
+    the import does not write are ignored, but a row with more values than the
+    header has is rejected, since its values may have shifted into the wrong columns.
+    """
+    for row in csv.DictReader(stream):
+        extra = row.pop(None, None)
+        if extra is not None:
+            yield MalformedRecord(f'Row has {len(extra)} more values than the header', isbn=row.get('isbn') or '')
+            continue
+        yield {key: csv_value(value) for key, value in row.items()}
+
+
+def csv_value(value):
+    if looks_like_formula(value) and value.startswith("'"):
+        return value[1:]
+    return value
+
+
+def read_jsonl(stream):
+    """
+    Yield one dict per non-blank JSON line
+    """
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield MalformedRecord(f'Invalid JSON: {error}')
+            continue
+        yield record if isinstance(record, dict) else MalformedRecord('Expected a JSON object')
+
+
+# ISO 2709 separators used by MARC 21 transmission files
+MARC_FIELD_TERMINATOR = b'\x1e'
+MARC_SUBFIELD_DELIMITER = b'\x1f'
+
+
+def read_marc(stream):
+    """
+    Yield one book dict per MARC 21 record of an ISO 2709 file
+    """
+    while True:
+        leader = stream.read(24)
+        if not leader.strip(b'\x1a\r\n '):
+            return
+        try:
+            length, base = int(leader[:5]), int(leader[12:17])
+        except ValueError:
+            # Without a record length there is no way to find the next record
+            yield MalformedRecord('Invalid MARC leader; stopped reading the file')
+            return
+        data = leader + stream.read(length - 24)
+        encoding = 'utf-8' if leader[9:10] == b'a' else 'latin-1'
+        try:
+            yield marc_to_book(marc_fields(data, base, encoding))
+        except ValueError as error:
+            yield MalformedRecord(f'Invalid MARC record: {error}')
+
+
+def marc_fields(data, base, encoding):
+    """
+    Return {tag: [(indicators, {code: [values]})]} for the data fields of a record
+    """
+    fields = {}
+    directory = data[24:base - 1]
+    for offset in range(0, len(directory) - len(directory) % 12, 12):
+        entry = directory[offset:offset + 12]
+        tag, length, start = entry[:3].decode('ascii'), int(entry[3:7]), int(entry[7:12])
+        raw = data[base + start:base + start + length].rstrip(MARC_FIELD_TERMINATOR)
+        if tag < '010':
+            fields.setdefault(tag, []).append(('', {'': [raw.decode(encoding, 'replace')]}))
+            continue
+        indicators, *chunks = raw.split(MARC_SUBFIELD_DELIMITER)
+        subfields = {}
+        for chunk in chunks:
+            if chunk:
+                subfields.setdefault(chr(chunk[0]), []).append(chunk[1:].decode(encoding, 'replace').strip())
+        fields.setdefault(tag, []).append((indicators.decode(encoding, 'replace'), subfields))
+    return fields
+
+
+def _subfield(fields, tags, code):
+    for tag in tags:
+        for indicators, subfields in fields.get(tag, ()):
+            if subfields.get(code):
+                return indicators, subfields[code][0]
+    return '', ''
+
+
+def _trim(value):
+    # Drops ISBD closing punctuation, keeping the period of a trailing initial ('J. K.')
+    value = value.strip().rstrip(' /:;,=').strip()
+    if value.endswith('.') and not re.search(r'(^|\s)\w\.$', value):
+        value = value[:-1].rstrip()
+    return value
+
+
+def marc_to_book(fields):
+    """
+    Map the MARC fields of one record onto the Book import fields
+    """
+    isbn = _subfield(fields, ['020'], 'a')[1].split(' ')[0]
+    title = _trim(_subfield(fields, ['245'], 'a')[1])
+    subtitle = _trim(_subfield(fields, ['245'], 'b')[1])
+    indicators, author = _subfield(fields, ['100', '110', '700'], 'a')
+    author = _trim(author)
+    if indicators[:1] == '1' and ', ' in author:
+        # Surname-first personal names: 'Rowling, J. K.' files as 'J. K. Rowling'
+        surname, forenames = author.split(', ', 1)
+        author = f'{forenames} {surname}'
+    year = re.search(r'\d{4}', _subfield(fields, ['264', '260'], 'c')[1])
+    if year is None:
+        year = re.match(r'\d{4}', _subfield(fields, ['008'], '')[1][7:11])
+    return {
+        'isbn': isbn,
+        'title': f'{title}: {subtitle}' if subtitle else title,
+        'author': author,
+        'description': _subfield(fields, ['520', '505', '500'], 'a')[1],
+        'category': _trim(_subfield(fields, ['650', '655'], 'a')[1]),
+        'published_date': f'{year.group()}-01-01' if year else '',
+    }
+
+
+# Input format -> (reader, reads bytes)
+READERS = {
+    'csv': (read_csv, False),
+    'jsonl': (read_jsonl, False),
+    'marc': (read_marc, True),
+}
+
+FORMAT_EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.mrc': 'marc', '.marc': 'marc'}
+
+
+def detect_format(path):
+    """
+    Guess the input format from the file extension, ignoring a trailing .gz
+    """
+    root, extension = os.path.splitext(path[:-3] if path.endswith('.gz') else path)
+    return FORMAT_EXTENSIONS.get(extension.lower())
+
+
+def normalize_record(record):
+    """
+    Strip text values, drop ISBN punctuation and fill in omitted defaults
+    """
+    data = {
+        field: value.strip() if isinstance(value, str) else value
+        for field, value in record.items()
+        if field in IMPORT_FIELDS
+    }
+    if isinstance(data.get('isbn'), str):
+        data['isbn'] = re.sub(r'[\s-]', '', data['isbn'])
+    if 'available_copies' not in data:
+        data['available_copies'] = Book._meta.get_field('available_copies').default
+    return data
+
+
+def validate_record(record):
+    """
+    Return (cleaned_data, None) for a valid record or (None, [(field, message)])
+    """
+    if isinstance(record, MalformedRecord):
+        return None, [('', record.message)]
+    form = BookImportForm(data=normalize_record(record))
+    if form.is_valid():
+        return form.cleaned_data, None
+    return None, [
+        (field if field != '__all__' else '', message)
+        for field, messages in form.errors.items()
+        for message in messages
+    ]
+
+
+def upsert_chunk(rows):
+    """
+    Create or update the books of a chunk of cleaned records, matched by ISBN.
+    A later record of the same ISBN wins and unchanged books are not written.
+    Returns (created, updated).
+    """
+    rows = {row['isbn']: row for row in rows}
+    if not rows:
+        return 0, 0
+    backend = get_search_backend()
+    with transaction.atomic():
+        existing = (
+            Book.objects.filter(isbn__in=rows)
+            .only('pk', 'author_ref', 'category_ref', *IMPORT_FIELDS)
+            .in_bulk(field_name='isbn')
+        )
+        author_pks = Author.for_names(row['author'] for row in rows.values())
+        category_pks = Category.for_names(row['category'] for row in rows.values())
+        touched_authors, touched_categories = set(), set()
+
+        created, updated = [], []
+        for isbn, row in rows.items():
+            values = {
+                **row,
+                'author_ref_id': author_pks[name_key(row['author'])],
+                'category_ref_id': category_pks[name_key(row['category'])],
+            }
+            book = existing.get(isbn)
+            if book is None:
+                created.append(Book(**values))
+                continue
+            if all(getattr(book, field) == value for field, value in values.items()):
+                # Unchanged, e.g. when a file is imported again
+                continue
+            touched_authors.add(book.author_ref_id)
+            touched_categories.add(book.category_ref_id)
+            for field, value in values.items():
+                setattr(book, field, value)
+            updated.append(book)
+
+        Book.objects.bulk_create(created)
+        if created and created[0].pk is None:
+            # Backends that do not return ids from a bulk insert (MySQL)
+            pks = dict(Book.objects.filter(isbn__in=[book.isbn for book in created]).values_list('isbn', 'pk'))
+            for book in created:
+                book.pk = pks[book.isbn]
+        now = timezone.now()
+        for book in updated:
+            book.updated_at = now
+        update_fields = [field for field in IMPORT_FIELDS if field != 'isbn'] + ['author_ref', 'category_ref', 'updated_at']
+        Book.objects.bulk_update(updated, update_fields)
+
+        for book in created + updated:
+            touched_authors.add(book.author_ref_id)
+            touched_categories.add(book.category_ref_id)
+        Author.recount_books(touched_authors - {None})
+        Category.recount_books(touched_categories - {None})
+        if created or updated:
+            backend.index_books(created + updated)
+            transaction.on_commit(bump_catalogue_version)
+    return len(created), len(updated)
+
+
+def file_fingerprint(path):
+    """
+    Identify an input file by its size and the hash of its first megabyte
+    """
+    with open(path, 'rb') as source:
+        head = source.read(1 << 20)
+    return f'{os.path.getsize(path)}:{hashlib.sha1(head).hexdigest()}'
+
+
+class Checkpoint:
+    """
+    Progress of an import, persisted after every committed chunk
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+
+    def load(self):
+        """
+        Return the saved counters, or None when there is nothing to resume for this input
+        """
+        try:
+            with open(self.path) as source:
+                state = json.load(source)
+        except (OSError, ValueError):
+            return None
+        return state if state.get('fingerprint') == self.fingerprint else None
+
+    def save(self, **counters):
+        # Written aside and renamed so a crash never leaves a torn checkpoint
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as target:
+            json.dump({'fingerprint': self.fingerprint, **counters}, target)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
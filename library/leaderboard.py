@@ -0,0 +1,205 @@
+"""
+Book Leaderboard
+Ranks books by Bayesian average rating, materialized per window in LeaderboardEntry.
+
+    score = (prior_weight * prior_mean + rating_sum) / (prior_weight + review_count)
+
+A book with a single 5-star review is pulled towards the window's mean rating,
+so it no longer outranks one with hundreds of reviews averaging 4.9.
+
+Review changes re-score their book at once, but reviews leave the dated
+windows without any event: those windows are rebuilt by the periodic
+refresh_leaderboard command, and a read finding one older than MAX_AGE (or
+never built) rebuilds it in the background while the current entries are shown.
+"""
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from .models import Book, LeaderboardEntry, LeaderboardWindow, Review
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Window name -> label and length in days (None covers all reviews)
+    'WINDOWS': {
+        'all': {'label': 'All time', 'days': None},
+        '30d': {'label': 'Last 30 days', 'days': 30},
+    },
+    # Window shown when none is requested
+    'DEFAULT_WINDOW': 'all',
+    # Prior votes blended into each score; None uses the mean review count of rated books
+    'PRIOR_WEIGHT': None,
+    # Books shown on the staff dashboard
+    'SIZE': 5,
+    # Seconds a dated window may go without a full refresh before a read rebuilds it
+    'MAX_AGE': 60 * 60,
+    # Rebuild stale windows in a background thread; False rebuilds inline (e.g. for tests)
+    'BACKGROUND': True,
+}
+
+BUILDING_KEY = 'library:leaderboard:building:{}'
+ENTRY_FIELDS = ['review_count', 'average_rating', 'score']
+
+
+def leaderboard_settings():
+    """
+    Return LIBRARY_LEADERBOARD merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'LIBRARY_LEADERBOARD', {})}
+
+
+def bayesian_score(rating_sum, review_count, prior_mean, prior_weight):
+    return (prior_weight * prior_mean + rating_sum) / (prior_weight + review_count)
+
+
+def window_aggregates(window, book_ids=None):
+    """
+    Return {book_id: (rating_sum, review_count)} for books reviewed within the window.
+    The all-time window reads the denormalized Book columns instead of scanning reviews.
+    """
+    days = leaderboard_settings()['WINDOWS'][window]['days']
+    if days is None:
+        books = Book.objects.filter(review_count__gt=0)
+        if book_ids is not None:
+            books = books.filter(pk__in=book_ids)
+        return {pk: (total, count) for pk, total, count in books.values_list('pk', 'rating_sum', 'review_count')}
+
+    reviews = Review.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+    if book_ids is not None:
+        reviews = reviews.filter(book_id__in=book_ids)
+    rows = reviews.order_by().values('book_id').annotate(total=Sum('rating'), count=Count('pk'))
+    return {row['book_id']: (row['total'], row['count']) for row in rows}
+
+
+def refresh_window(window):
+    """
+    Recompute the prior and every entry of a window from scratch
+    """
+    config = leaderboard_settings()
+    aggregates = window_aggregates(window)
+    total_sum = sum(total for total, count in aggregates.values())
+    total_count = sum(count for total, count in aggregates.values())
+    prior_mean = total_sum / total_count if total_count else 0.0
+    prior_weight = config['PRIOR_WEIGHT']
+    if prior_weight is None:
+        prior_weight = max(total_count / len(aggregates), 1.0) if aggregates else 1.0
+
+    entries = [
+        LeaderboardEntry(
+            window=window,
+            book_id=book_id,
+            review_count=count,
+            average_rating=total / count,
+            score=bayesian_score(total, count, prior_mean, prior_weight),
+        )
+        for book_id, (total, count) in aggregates.items()
+    ]
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(window=window).delete()
+        # Upserts, since a review committed meanwhile may have re-scored a book already
+        upsert(LeaderboardEntry, entries, ['window', 'book'], ENTRY_FIELDS)
+        upsert(LeaderboardWindow, [LeaderboardWindow(
+            window=window, prior_mean=prior_mean, prior_weight=prior_weight, refreshed_at=timezone.now(),
+        )], ['window'], ['prior_mean', 'prior_weight', 'refreshed_at'])
+    return len(entries)
+
+
+def upsert(model, objects, unique_fields, update_fields):
+    """
+    Insert rows, updating the ones whose unique key exists, in one statement
+    that concurrent workers cannot race into an IntegrityError
+    """
+    if not connection.features.supports_update_conflicts_with_target:
+        # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+        unique_fields = None
+    model.objects.bulk_create(
+        objects, batch_size=1000, update_conflicts=True, unique_fields=unique_fields, update_fields=update_fields,
+    )
+
+
+def refresh_book(book_id):
+    """
+    Re-score one book in every window against the prior of the last full refresh.
+    Windows that were never refreshed are left for their first build.
+    """
+    windows = {row.window: row for row in LeaderboardWindow.objects.all()}
+    for window in leaderboard_settings()['WINDOWS']:
+        prior = windows.get(window)
+        if prior is None:
+            continue
+        aggregate = window_aggregates(window, [book_id]).get(book_id)
+        if aggregate is None:
+            LeaderboardEntry.objects.filter(window=window, book_id=book_id).delete()
+            continue
+        total, count = aggregate
+        upsert(LeaderboardEntry, [LeaderboardEntry(
+            window=window,
+            book_id=book_id,
+            review_count=count,
+            average_rating=total / count,
+            score=bayesian_score(total, count, prior.prior_mean, prior.prior_weight),
+        )], ['window', 'book'], ENTRY_FIELDS)
+
+
+def is_stale(window, refreshed_at):
+    """
+    Tell whether a window was never built, or is a dated window that reviews may have left since
+    """
+    if refreshed_at is None:
+        return True
+    config = leaderboard_settings()
+    if config['WINDOWS'][window]['days'] is None:
+        return False
+    return timezone.now() - refreshed_at > timedelta(seconds=config['MAX_AGE'])
+
+
+def schedule_refresh(window):
+    """
+    Rebuild a window off the request path, once across workers
+    """
+    if not leaderboard_settings()['BACKGROUND']:
+        refresh_window(window)
+        return
+    key = BUILDING_KEY.format(window)
+    if cache.add(key, True, timeout=leaderboard_settings()['MAX_AGE']):
+        threading.Thread(target=_refresh_in_background, args=(window, key), daemon=True).start()
+
+
+def _refresh_in_background(window, key):
+    try:
+        refresh_window(window)
+    except Exception:
+        logger.exception('Could not refresh the %s leaderboard', window)
+    finally:
+        cache.delete(key)
+        connection.close()
+
+
+def top_entries(window, limit=None):
+    """
+    Return (entries, refreshed_at): the top `limit` entries of a window with
+    their books, read off the rank index, and the time of its last full
+    refresh (None while it is first being built). A stale window is rebuilt
+    in the background.
+    """
+    limit = limit or leaderboard_settings()['SIZE']
+    refreshed_at = last_refresh(window)
+    if is_stale(window, refreshed_at):
+        schedule_refresh(window)
+        refreshed_at = last_refresh(window)
+    entries = (
+        LeaderboardEntry.objects.filter(window=window)
+        .select_related('book')
+        .only('book_id', 'review_count', 'average_rating', 'score', 'book__title', 'book__author')
+        .order_by('-score', 'book_id')
+    )
+    return list(entries[:limit]), refreshed_at
+
+
+def last_refresh(window):
+    return LeaderboardWindow.objects.filter(window=window).values_list('refreshed_at', flat=True).first()
@@ -0,0 +1,88 @@
+"""
+Management command to benchmark the autocomplete prefix index
+Usage: python manage.py bench_autocomplete [--size 1000000] [--lookups 10000]
+
+Titles are generated in memory, so no database rows are written.
+"""
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+from library.search.autocomplete import PrefixIndex
+from .bench_search import NAMES, SYLLABLES, WORDS
+
+
+class Command(BaseCommand):
+    help = 'Reports build time, memory footprint and lookup latency of the autocomplete index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000000, help='Number of synthetic books')
+        parser.add_argument('--lookups', type=int, default=10000, help='Number of timed prefix lookups')
+        parser.add_argument(
+            '--trace-memory',
+            action='store_true',
+            help='Also measure allocations with tracemalloc (slows the build considerably)'
+        )
+
+    def handle(self, *args, **options):
+        size = options['size']
+        self.random = random.Random(42)
+        rows = self.synthetic_rows(size)
+
+        gc.collect()
+        if options['trace_memory']:
+            tracemalloc.start()
+        start = time.perf_counter()
+        index = PrefixIndex.build(rows)
+        build_seconds = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(f'Books: {size}  entries: {len(index)}'))
+        self.stdout.write(f'  build time         {build_seconds:9.2f} s')
+        self.stdout.write(f'  footprint (sizeof) {index.memory_footprint() / 2 ** 20:9.1f} MiB')
+        if options['trace_memory']:
+            traced_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            self.stdout.write(f'  allocated (traced) {traced_bytes / 2 ** 20:9.1f} MiB')
+
+        prefixes = []
+        for _ in range(options['lookups']):
+            book_id, title, author = rows[self.random.randrange(size)]
+            source = title if self.random.random() < 0.7 else author.split()[-1]
+            prefixes.append(source[:self.random.randint(1, 8)])
+        timings = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.suggest(prefix)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'  lookup             p50 {statistics.median(timings):.3f} ms  p99 {p99:.3f} ms  max {timings[-1]:.3f} ms'
+        )
+
+        # Enough updates to include the compactions of the pending changes
+        updates = min(size, 2000)
+        start = time.perf_counter()
+        for book_id, title, author in rows[:updates]:
+            index.remove_book(book_id, title, author)
+            index.add_book(book_id, title, author)
+        self.stdout.write(
+            f'  incremental update {(time.perf_counter() - start) * 1000 / updates:9.3f} ms per book'
+        )
+
+    def synthetic_rows(self, size):
+        generated = [
+            ''.join(self.random.choices(SYLLABLES, k=self.random.randint(2, 4)))
+            for _ in range(20000)
+        ]
+        vocabulary = WORDS + generated
+        return [
+            (
+                number,
+                ' '.join(self.random.choices(vocabulary, k=self.random.randint(2, 5))).title(),
+                ' '.join(self.random.sample(NAMES, 2)) + ' ' + self.random.choice(generated).title(),
+            )
+            for number in range(1, size + 1)
+        ]
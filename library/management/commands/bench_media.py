@@ -0,0 +1,102 @@
+"""
+Management command to benchmark worker occupancy of media serving
+Usage: python manage.py bench_media [--size-mb 5] [--requests 20] [--client-mbps 2]
+
+Measures how long a worker is busy per request for the old static() view, the
+FileResponse fallback (read loop and sendfile) and X-Accel-Redirect. Network
+time is not simulated; the modeled column adds the time a client downloading
+at --client-mbps keeps a worker that streams the body itself.
+"""
+import os
+import shutil
+import tempfile
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.views.static import serve
+from library.views.media import serve_media
+
+
+def consume(response, zero_copy):
+    """
+    Drain a response the way a WSGI server would; returns the bytes sent
+    """
+    filelike = getattr(response, 'file_to_stream', None)
+    if zero_copy and filelike is not None and hasattr(os, 'sendfile'):
+        length = int(response['Content-Length'])
+        offset = os.lseek(filelike.fileno(), 0, os.SEEK_CUR)
+        with open(os.devnull, 'wb') as sink:
+            sent = 0
+            while sent < length:
+                count = os.sendfile(sink.fileno(), filelike.fileno(), offset + sent, length - sent)
+                if not count:
+                    break
+                sent += count
+        response.close()
+        return sent
+    if not response.streaming:
+        return len(response.content)
+    sent = sum(len(chunk) for chunk in response.streaming_content)
+    response.close()
+    return sent
+
+
+class Command(BaseCommand):
+    help = 'Compares per-request worker time of the media serving modes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=float, default=5, help='Size of the served file')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per mode')
+        parser.add_argument(
+            '--client-mbps',
+            type=float,
+            default=2,
+            help='Client download speed in MB/s used for the modeled occupancy'
+        )
+
+    def handle(self, *args, **options):
+        size = int(options['size_mb'] * 1024 * 1024)
+        media_root = tempfile.mkdtemp(prefix='bench_media_')
+        try:
+            name = 'bench/file.bin'
+            os.makedirs(os.path.join(media_root, 'bench'))
+            with open(os.path.join(media_root, name), 'wb') as target:
+                target.write(os.urandom(size))
+            self.run(media_root, name, size, options)
+        finally:
+            shutil.rmtree(media_root)
+
+    def run(self, media_root, name, size, options):
+        factory = RequestFactory()
+        transfer = size / (options['client_mbps'] * 1024 * 1024)
+        modes = [
+            ('static() view', '', lambda request: serve(request, name, document_root=media_root), False),
+            ('FileResponse, read loop', '', lambda request: serve_media(request, name), False),
+            ('FileResponse, sendfile', '', lambda request: serve_media(request, name), True),
+            ('X-Accel-Redirect', 'x-accel-redirect', lambda request: serve_media(request, name), False),
+        ]
+
+        self.stdout.write(f"{size / 1024 / 1024:.1f} MB file, {options['requests']} requests per mode")
+        self.stdout.write(f"{'mode':<26}{'worker ms':>12}{'MB/s':>10}{'modeled ms':>13}")
+        for label, serve_mode, view, zero_copy in modes:
+            with override_settings(MEDIA_ROOT=media_root, MEDIA_SERVE_MODE=serve_mode):
+                elapsed = sent = 0
+                for _ in range(options['requests']):
+                    request = factory.get(f'{settings.MEDIA_URL}{name}')
+                    started = time.perf_counter()
+                    sent = consume(view(request), zero_copy)
+                    elapsed += time.perf_counter() - started
+            per_request = elapsed / options['requests']
+            throughput = sent / per_request / 1024 / 1024 if sent else 0
+            # A worker streaming the body stays busy until the client has it all
+            modeled = per_request + (transfer if sent else 0)
+            self.stdout.write(
+                f'{label:<26}{per_request * 1000:>12.2f}{throughput:>10.0f}{modeled * 1000:>13.0f}'
+            )
+
+        with override_settings(MEDIA_ROOT=media_root, MEDIA_SERVE_MODE=''):
+            response = serve_media(factory.get(f'/media/{name}', HTTP_RANGE='bytes=100-1099'), name)
+            partial = consume(response, False)
+        self.stdout.write(f"Range check: {response.status_code} {response['Content-Range']}, {partial} bytes")
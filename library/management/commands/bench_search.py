@@ -0,0 +1,161 @@
+"""
+Management command to benchmark book search backends
+Usage: python manage.py bench_search [--sizes 10000,100000,1000000] [--repeat 5]
+
+Synthetic books are generated inside a transaction that is rolled back at the end,
+so run it against a scratch database of the same engine as production.
+"""
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from datetime import date
+from library.models import Book, SearchTrigram
+from library.search import fuzzy
+from library.search.backends import DatabaseSearchBackend, IndexSearchBackend
+
+WORDS = [
+    'war', 'peace', 'night', 'garden', 'river', 'shadow', 'empire', 'winter', 'stone', 'silent',
+    'house', 'ocean', 'secret', 'fire', 'glass', 'king', 'storm', 'island', 'letter', 'mountain',
+    'dream', 'city', 'forest', 'queen', 'journey', 'memory', 'light', 'history', 'machine', 'song',
+]
+NAMES = [
+    'Austen', 'Orwell', 'Tolkien', 'Rowling', 'Brown', 'Coelho', 'Lee', 'Salinger', 'Fitzgerald', 'Woolf',
+    'Jane', 'George', 'Harper', 'Paulo', 'Dan', 'Virginia', 'Scott', 'Mary', 'James', 'Leo',
+]
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ten', 'vo', 'sha', 'del', 'ur', 'bri', 'mon', 'es', 'tal', 'qui', 'nor']
+CATEGORIES = ['Fantasy', 'Mystery', 'Romance', 'Science Fiction', 'Classic Literature', 'History', 'Philosophy']
+
+# (query, search type) pairs timed against every backend
+QUERIES = [
+    ('war', 'all'),
+    ('silent garden', 'all'),
+    ('orwell', 'author'),
+    ('stone', 'title'),
+    ('fantasy', 'genre'),
+    ('mem', 'all'),
+]
+
+# Misspelled tokens used to time fuzzy candidate generation
+FUZZY_TOKENS = ['orwel', 'tolkein', 'shadwo', 'mountian', 'kalomi', 'brimonten']
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the ORM substring search against the inverted index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10000,100000,1000000',
+            help='Comma-separated catalogue sizes to benchmark'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed runs per query and backend'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Books generated per bulk insert'
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        backends = [DatabaseSearchBackend(), IndexSearchBackend()]
+        self.random = random.Random(42)
+        self.build_vocabulary()
+
+        with transaction.atomic():
+            for size in sizes:
+                self.grow_catalogue(size, options['batch_size'])
+                self.stdout.write(self.style.SUCCESS(f'\nCatalogue size: {Book.objects.count()}'))
+                for backend in backends:
+                    timings = self.time_backend(backend, options['repeat'])
+                    self.report(type(backend).__name__, timings)
+                self.report_fuzzy(options['repeat'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.WARNING('\nSynthetic books rolled back.'))
+
+    def grow_catalogue(self, size, batch_size):
+        """Add synthetic books until the catalogue holds `size` rows"""
+        missing = size - Book.objects.count()
+        last_pk = Book.objects.aggregate(last=Max('pk'))['last'] or 0
+        counter = last_pk
+        while missing > 0:
+            batch = []
+            for _ in range(min(batch_size, missing)):
+                counter += 1
+                batch.append(self.fake_book(counter))
+            Book.objects.bulk_create(batch)
+            missing -= len(batch)
+
+        # bulk_create skips signals, so index the new rows explicitly
+        IndexSearchBackend().index_books(
+            Book.objects.filter(pk__gt=last_pk).order_by('pk').iterator(chunk_size=batch_size),
+            batch_size=batch_size,
+        )
+
+    def build_vocabulary(self):
+        """Common words plus generated ones, drawn with Zipf-like frequencies"""
+        generated = {
+            ''.join(self.random.choices(SYLLABLES, k=self.random.randint(2, 4)))
+            for _ in range(20000)
+        }
+        self.vocabulary = WORDS + sorted(generated - set(WORDS))
+        self.cum_weights = []
+        total = 0.0
+        for rank in range(1, len(self.vocabulary) + 1):
+            total += 1.0 / rank
+            self.cum_weights.append(total)
+
+    def words(self, count):
+        return self.random.choices(self.vocabulary, cum_weights=self.cum_weights, k=count)
+
+    def fake_book(self, number):
+        return Book(
+            title=' '.join(self.words(self.random.randint(2, 4))).title(),
+            author=' '.join(self.random.sample(NAMES, 2)),
+            isbn=f'B{number:012d}',
+            description=' '.join(self.words(12)),
+            category=self.random.choice(CATEGORIES),
+            published_date=date(self.random.randint(1800, 2024), 1, 1),
+            available_copies=self.random.randint(0, 5),
+        )
+
+    def time_backend(self, backend, repeat):
+        """Time each query as book_search runs it: the first page plus its bounded count"""
+        timings = []
+        for query, search_type in QUERIES:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                backend.search_page(query, search_type)
+                timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def report(self, label, timings):
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'  {label:<24} mean {statistics.mean(timings):9.2f} ms  '
+            f'p50 {statistics.median(timings):9.2f} ms  p95 {p95:9.2f} ms'
+        )
+
+    def report_fuzzy(self, repeat):
+        """
+        Time trigram candidate generation against the size of the fuzzy vocabulary;
+        it should track the postings of the token's trigrams, not the vocabulary
+        """
+        vocabulary = SearchTrigram.objects.values('term').distinct().count()
+        timings = []
+        for token in FUZZY_TOKENS:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fuzzy.similar_terms(token)
+                timings.append((time.perf_counter() - start) * 1000)
+        self.report(f'fuzzy ({vocabulary} terms)', timings)
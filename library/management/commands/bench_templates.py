@@ -0,0 +1,112 @@
+"""
+Management command to benchmark page template rendering
+Usage: python manage.py bench_templates [--renders 50] [--username admin]
+
+Requests every page once as a staff user with the test client, keeps the
+context its top-level template was rendered with and renders that template
+again --renders times. Reports the time to fetch the template from the
+engine (near zero with the cached loader), the time to render it and the
+size of the HTML sent. Cached template fragments are warm after the first
+request, as they are in production. Everything runs inside a transaction
+that is rolled back.
+"""
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.template import loader
+from django.test import Client
+from django.test.signals import template_rendered
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from library.models import Author, Book, Category, Review
+
+
+class Command(BaseCommand):
+    help = 'Reports per-template load time, render time and HTML size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=50, help='Renders per template')
+        parser.add_argument('--username', help='Staff user to render as (default: the first staff user)')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_staff=True)
+        if options['username']:
+            users = users.filter(username=options['username'])
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('A staff user is needed to reach every page')
+
+        setup_test_environment()
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+                client = Client()
+                client.force_login(user)
+                self.stdout.write(f"{'page':<18}{'template':<44}{'load ms':>9}{'render ms':>11}{'KB':>8}")
+                for label, url in self.pages(user):
+                    self.bench(client, label, url, options['renders'])
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+
+    def bench(self, client, label, url, renders):
+        rendered = []
+
+        def capture(sender, template, context, **kwargs):
+            rendered.append((template.origin.template_name, context.flatten()))
+
+        template_rendered.connect(capture)
+        try:
+            response = client.get(url)
+        finally:
+            template_rendered.disconnect(capture)
+        if response.status_code != 200 or not rendered:
+            self.stdout.write(f'{label:<18}skipped (status {response.status_code})')
+            return
+
+        # The first template rendered is the page; the rest are its includes and parents
+        name, context = rendered[0]
+        request = response.wsgi_request
+        started = time.perf_counter()
+        for _ in range(renders):
+            template = loader.get_template(name)
+        loading = (time.perf_counter() - started) / renders
+        started = time.perf_counter()
+        for _ in range(renders):
+            html = template.render(context, request)
+        rendering = (time.perf_counter() - started) / renders
+        size = len(html.encode()) / 1024
+        self.stdout.write(f'{label:<18}{name:<44}{loading * 1000:>9.3f}{rendering * 1000:>11.2f}{size:>8.1f}')
+
+    def pages(self, user):
+        """
+        Yield (label, url) of the pages to render
+        """
+        book = Book.objects.order_by('pk').first()
+        author = Author.objects.order_by('pk').first()
+        category = Category.objects.order_by('pk').first()
+        review = Review.objects.filter(user=user).order_by('pk').first()
+        unreviewed = Book.objects.exclude(reviews__user=user).order_by('pk').first()
+
+        yield 'index', reverse('index')
+        yield 'book_list', reverse('book_list')
+        yield 'book_create', reverse('book_create')
+        if book:
+            yield 'book_detail', reverse('book_detail', args=[book.pk])
+            yield 'book_update', reverse('book_update', args=[book.pk])
+            yield 'book_delete', reverse('book_delete', args=[book.pk])
+            yield 'book_search', f"{reverse('book_search')}?q={book.title.split()[0]}"
+        if unreviewed:
+            yield 'add_review', reverse('add_review', args=[unreviewed.pk])
+        if review:
+            yield 'edit_review', reverse('edit_review', args=[review.pk])
+            yield 'delete_review', reverse('delete_review', args=[review.pk])
+        yield 'category_list', reverse('category_list')
+        if category:
+            yield 'category_detail', reverse('category_detail', args=[category.pk])
+        yield 'author_list', reverse('author_list')
+        if author:
+            yield 'author_detail', reverse('author_detail', args=[author.pk])
+        yield 'user_dashboard', reverse('user_dashboard')
+        yield 'user_profile', reverse('user_profile')
+        yield 'staff_dashboard', reverse('staff_dashboard')
@@ -0,0 +1,49 @@
+"""
+Management command to report drift in the denormalized rating aggregates of books
+Usage: python manage.py check_book_ratings [--chunk-size 1000] [--limit 20]
+
+Exits with status 1 when any book disagrees with its reviews, so it can run from cron or CI.
+"""
+import sys
+from django.core.management.base import BaseCommand
+from library.ratings import book_id_chunks, find_drift
+
+
+class Command(BaseCommand):
+    help = 'Compares the stored rating aggregates of every book with its reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of books compared per query'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Maximum number of drifted books listed'
+        )
+
+    def handle(self, *args, **options):
+        scanned = 0
+        drifted = 0
+        for chunk in book_id_chunks(options['chunk_size']):
+            for book, expected in find_drift(chunk):
+                drifted += 1
+                if drifted <= options['limit']:
+                    differences = ', '.join(
+                        f'{field} {getattr(book, field)} != {value}'
+                        for field, value in expected.items()
+                        if getattr(book, field) != value
+                    )
+                    self.stdout.write(self.style.WARNING(f'  #{book.pk} {book.title}: {differences}'))
+            scanned += len(chunk)
+
+        if drifted:
+            self.stdout.write(self.style.ERROR(
+                f'{drifted} of {scanned} book(s) have drifted; run rebuild_book_ratings to repair them'
+            ))
+            sys.exit(1)
+        self.stdout.write(self.style.SUCCESS(f'All {scanned} book(s) match their reviews'))
@@ -0,0 +1,150 @@
+"""
+Management command to check the query plans of the hot views
+Usage: python manage.py check_query_plans [--verbose] [--allow-table django_session]
+
+Requests each hot page with the test client, runs EXPLAIN on every SELECT it
+issued and fails when one of them reads a whole table instead of an index.
+Caching is disabled for the run so every path reaches the database, and a
+path that issues no SELECT fails. Everything runs inside a transaction that
+is rolled back. Run it against a
+database holding a realistic amount of data: on near-empty tables most
+planners prefer a full scan and will be reported.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from library.forms import UserRegistrationForm
+from library.models import Author, Book, Category
+
+# Tables whose full scans are expected and harmless
+DEFAULT_ALLOWED_TABLES = ('django_session', 'django_content_type', 'django_migrations')
+
+# Cached pages, fragments and statistics would hide the queries to check
+NO_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class QueryRecorder:
+    """
+    execute_wrapper collecting (sql, params) of every statement
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def full_scans(sql, params):
+    """
+    Return (tables read in full, plan lines) for a SELECT on the current backend
+    """
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+            # 'SCAN t' reads the table; 'SCAN t USING [COVERING] INDEX i' walks an index.
+            # Only an unfiltered LIMIT without OFFSET walking rowid order (no temp
+            # b-tree) stops after its first rows; a WHERE may make it read most of the table.
+            statement = sql.upper()
+            bounded = (
+                ' LIMIT ' in statement
+                and ' WHERE ' not in statement
+                and ' OFFSET ' not in statement
+                and not any('TEMP B-TREE' in line for line in plan)
+            )
+            scans = [] if bounded else [
+                line.split()[1] for line in plan if line.startswith('SCAN ') and ' USING ' not in line
+            ]
+        elif vendor == 'mysql':
+            cursor.execute(f'EXPLAIN {sql}', params)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            plan = [f"{row['table']}: type={row['type']} key={row['key']}" for row in rows]
+            scans = [row['table'] for row in rows if row['type'] == 'ALL']
+        elif vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}', params)
+            plan = [row[0] for row in cursor.fetchall()]
+            scans = [line.split('Seq Scan on ')[1].split()[0] for line in plan if 'Seq Scan on ' in line]
+        else:
+            raise CommandError(f'EXPLAIN parsing is not implemented for {vendor}')
+    # Derived tables and subqueries are scanned by design; only real tables count
+    tables = set(connection.introspection.table_names())
+    return [table.strip('"`') for table in scans if table.strip('"`') in tables], plan
+
+
+class Command(BaseCommand):
+    help = 'Fails when a hot-path view query falls back to a full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--allow-table',
+            action='append',
+            default=[],
+            help='Table whose full scans are acceptable (repeatable)'
+        )
+        parser.add_argument('--verbose', action='store_true', help='Print the plan of every query')
+
+    def handle(self, *args, **options):
+        allowed = set(DEFAULT_ALLOWED_TABLES) | set(options['allow_table'])
+        failures = []
+
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver'], CACHES=NO_CACHES):
+            for label, check in self.hot_paths():
+                recorder = QueryRecorder()
+                with connection.execute_wrapper(recorder):
+                    check()
+                selects = [
+                    (sql, params) for sql, params in recorder.queries
+                    if sql.lstrip().upper().startswith('SELECT')
+                ]
+                if not selects:
+                    failures.append((label, None, [], []))
+                    self.stdout.write(self.style.ERROR(f'[{label}] issued no SELECT; nothing was checked'))
+                for sql, params in selects:
+                    tables, plan = full_scans(sql, params)
+                    scanned = [table for table in tables if table not in allowed]
+                    if scanned:
+                        failures.append((label, sql, scanned, plan))
+                    if options['verbose'] or scanned:
+                        style = self.style.ERROR if scanned else self.style.SUCCESS
+                        self.stdout.write(style(f'[{label}] {sql[:160]}'))
+                        for line in plan:
+                            self.stdout.write(f'    {line}')
+                self.stdout.write(f'{label}: {len(selects)} queries checked')
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot paths or queries failed the check')
+        self.stdout.write(self.style.SUCCESS('No full table scans on the hot paths'))
+
+    def hot_paths(self):
+        """
+        Yield (label, callable) pairs exercising the hot views
+        """
+        anonymous = Client()
+        staff = Client()
+        staff_user = User.objects.filter(is_staff=True).first()
+        if staff_user:
+            staff.force_login(staff_user)
+        book = Book.objects.order_by('pk').first()
+        author = Author.objects.order_by('pk').first()
+        category = Category.objects.order_by('pk').first()
+
+        yield 'index', lambda: anonymous.get(reverse('index'))
+        yield 'book_list', lambda: anonymous.get(reverse('book_list'))
+        if book:
+            yield 'book_detail', lambda: staff.get(reverse('book_detail', args=[book.pk]))
+            yield 'book_search', lambda: anonymous.get(reverse('book_search'), {'q': book.title.split()[0]})
+        if author:
+            yield 'author_detail', lambda: anonymous.get(reverse('author_detail', args=[author.pk]))
+        if category:
+            yield 'category_detail', lambda: anonymous.get(reverse('category_detail', args=[category.pk]))
+        if staff_user:
+            yield 'staff_dashboard', lambda: staff.get(reverse('staff_dashboard'))
+        yield 'register_email_check', lambda: UserRegistrationForm(data={'email': 'nobody@example.com'}).is_valid()
@@ -0,0 +1,184 @@
+"""
+Management command to check the production static bundle without network access
+Usage: python manage.py check_static_bundle [--verbose]
+
+Runs collectstatic with the production storage into a temporary STATIC_ROOT,
+then renders the main pages with DEBUG off and fails when a page loads a
+script or stylesheet from another host, when a referenced asset (including
+fonts referenced from the CSS) is not served from its hashed name with
+immutable caching and a matching precompressed variant, or when a class used
+on a page lost its rules to the CSS purge. Everything runs inside a
+transaction that is rolled back.
+"""
+import gzip
+import re
+import shutil
+import tempfile
+from urllib.parse import urljoin, urlsplit
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from library.assets import CLASS_SELECTOR, assets_settings, brotli
+from library.models import Author, Book, Category
+from library.storage import IMMUTABLE_CACHE_CONTROL
+
+ASSET_TAG = re.compile(r'<(?:link|script)\b[^>]*?\b(?:href|src)="([^"]+)"', re.I)
+CSS_URL = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+CLASS_ATTRIBUTE = re.compile(r'\bclass="([^"]*)"')
+
+
+def decode(response):
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    encoding = response.get('Content-Encoding')
+    if encoding == 'gzip':
+        return gzip.decompress(content)
+    if encoding == 'br':
+        return brotli.decompress(content)
+    return content
+
+
+class Command(BaseCommand):
+    help = 'Fails when the collected static bundle needs the network or lost rules a page uses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose', action='store_true', help='List every asset checked')
+
+    def handle(self, *args, **options):
+        static_root = tempfile.mkdtemp(prefix='check_static_')
+        storages = {**settings.STORAGES, 'staticfiles': {
+            'BACKEND': 'library.assets.CompressedManifestStaticFilesStorage',
+        }}
+        try:
+            with override_settings(STATIC_ROOT=static_root, STORAGES=storages, DEBUG=False,
+                                   ALLOWED_HOSTS=['testserver']):
+                call_command('collectstatic', interactive=False, verbosity=0)
+                with transaction.atomic():
+                    failures = self.check_pages(options['verbose'])
+                    transaction.set_rollback(True)
+        finally:
+            shutil.rmtree(static_root)
+
+        for failure in failures:
+            self.stdout.write(self.style.ERROR(failure))
+        if failures:
+            raise CommandError(f'{len(failures)} problems in the static bundle')
+        self.stdout.write(self.style.SUCCESS('Static bundle is self-hosted, hashed, precompressed and complete'))
+
+    def check_pages(self, verbose):
+        failures = []
+        selectors = self.vendored_classes()
+        purged = {}
+        checked = set()
+        client = Client()
+        for label, page_client, url in self.pages(client):
+            response = page_client.get(url)
+            if response.status_code != 200:
+                failures.append(f'[{label}] {url} answered {response.status_code}')
+                continue
+            html = response.content.decode()
+
+            assets = ASSET_TAG.findall(html)
+            for asset in assets:
+                if urlsplit(asset).netloc:
+                    failures.append(f'[{label}] loads {asset} from another host')
+            pending = [asset for asset in assets if asset.startswith(settings.STATIC_URL) or asset.startswith('/static/')]
+            while pending:
+                asset = pending.pop()
+                if asset in checked:
+                    continue
+                checked.add(asset)
+                content, problems = self.check_asset(asset)
+                failures.extend(f'[{label}] {problem}' for problem in problems)
+                if verbose:
+                    self.stdout.write(f'{asset}: {len(content)} bytes')
+                if asset.endswith('.css') and content:
+                    css = content.decode('utf-8', errors='ignore')
+                    purged[asset] = set(CLASS_SELECTOR.findall(css))
+                    pending.extend(
+                        urljoin(asset, reference) for reference in CSS_URL.findall(css)
+                        if not reference.startswith(('data:', '#'))
+                    )
+
+            used = {name for value in CLASS_ATTRIBUTE.findall(html) for name in value.split()}
+            served = set().union(*purged.values()) if purged else set()
+            for name in sorted(used & selectors - served):
+                failures.append(f'[{label}] class "{name}" lost its rules to the CSS purge')
+        return failures
+
+    def check_asset(self, url):
+        """
+        Fetch an asset plain and compressed; return (plain content, problems)
+        """
+        problems = []
+        plain = Client().get(url)
+        if plain.status_code != 200:
+            return b'', [f'{url} answered {plain.status_code}']
+        content = decode(plain)
+        if plain.get('Cache-Control') != IMMUTABLE_CACHE_CONTROL:
+            problems.append(f'{url} is not served with a hashed, immutable name')
+
+        compressible = url.rsplit('.', 1)[-1].lower() in {
+            extension.lstrip('.') for extension in assets_settings()['COMPRESS_EXTENSIONS']
+        }
+        if compressible and len(content) >= assets_settings()['COMPRESS_MIN_SIZE']:
+            codings = ['gzip'] + (['br'] if brotli is not None else [])
+            for coding in codings:
+                compressed = Client().get(url, HTTP_ACCEPT_ENCODING=coding)
+                if compressed.get('Content-Encoding') != coding:
+                    problems.append(f'{url} has no {coding} variant')
+                elif decode(compressed) != content:
+                    problems.append(f'{url} {coding} variant differs from the file')
+                if 'Accept-Encoding' not in compressed.get('Vary', ''):
+                    problems.append(f'{url} does not vary on Accept-Encoding')
+        return content, problems
+
+    def vendored_classes(self):
+        """
+        Return every class named by the unpurged vendored stylesheets
+        """
+        names = set()
+        for name in assets_settings()['PURGE']:
+            path = finders.find(name)
+            if path:
+                with open(path, encoding='utf-8') as source:
+                    names.update(CLASS_SELECTOR.findall(source.read()))
+        return names
+
+    def pages(self, anonymous):
+        """
+        Yield (label, client, url) of the pages to check
+        """
+        staff = Client()
+        staff_user = User.objects.filter(is_staff=True).first()
+        if staff_user:
+            staff.force_login(staff_user)
+        book = Book.objects.order_by('pk').first()
+        author = Author.objects.order_by('pk').first()
+        category = Category.objects.order_by('pk').first()
+
+        yield 'index', anonymous, reverse('index')
+        yield 'book_list', anonymous, reverse('book_list')
+        yield 'book_search', anonymous, reverse('book_search')
+        yield 'login', anonymous, reverse('login')
+        yield 'register', anonymous, reverse('register')
+        yield 'category_list', anonymous, reverse('category_list')
+        yield 'author_list', anonymous, reverse('author_list')
+        if book:
+            yield 'book_detail', anonymous, reverse('book_detail', args=[book.pk])
+        if author:
+            yield 'author_detail', anonymous, reverse('author_detail', args=[author.pk])
+        if category:
+            yield 'category_detail', anonymous, reverse('category_detail', args=[category.pk])
+        if staff_user:
+            yield 'staff_dashboard', staff, reverse('staff_dashboard')
+            yield 'book_create', staff, reverse('book_create')
+            yield 'user_profile', staff, reverse('user_profile')
+            if book:
+                yield 'book_detail (staff)', staff, reverse('book_detail', args=[book.pk])
+                yield 'book_update', staff, reverse('book_update', args=[book.pk])
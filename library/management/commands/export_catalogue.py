@@ -0,0 +1,41 @@
+"""
+Management command to export books or reviews as CSV or JSON Lines
+Usage: python manage.py export_catalogue books [--format jsonl] [--gzip] [--output books.csv]
+
+Rows are streamed in chunks, so memory use stays flat for any table size.
+Without --output the export is written to standard output.
+"""
+import sys
+from django.core.management.base import BaseCommand
+from library.exporting import DATASETS, FORMATS, export_stream
+
+
+class Command(BaseCommand):
+    help = 'Streams all books or reviews to a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS), help='What to export')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv', help='Output format')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip')
+        parser.add_argument('--output', help='File to write (default: standard output)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of rows fetched from the database at a time'
+        )
+
+    def handle(self, *args, **options):
+        chunks = export_stream(options['dataset'], options['format'], options['gzip'], options['chunk_size'])
+        if options['output'] is None:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        written = 0
+        with open(options['output'], 'wb') as target:
+            for chunk in chunks:
+                target.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written:,} bytes to {options['output']}"))
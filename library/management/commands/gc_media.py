@@ -0,0 +1,41 @@
+"""
+Management command to delete media files nothing references
+Usage: python manage.py gc_media [--dry-run] [--min-age 24]
+
+Removes uploads no Book or UserProfile points at and cover renditions of
+covers no longer in use. Files younger than --min-age hours are kept, so an
+upload whose row is not committed yet is never collected.
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from library.media import unreferenced_files
+
+
+class Command(BaseCommand):
+    help = 'Deletes stored covers, renditions and profile pictures that are no longer referenced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List the files without deleting them')
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=24,
+            help='Only delete files older than this many hours'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['min_age'])
+        deleted = freed = 0
+        for storage, name in unreferenced_files():
+            if storage.get_modified_time(name) > cutoff:
+                continue
+            size = storage.size(name)
+            self.stdout.write(f'  {name} ({size:,} bytes)')
+            if not options['dry_run']:
+                storage.delete(name)
+            deleted += 1
+            freed += size
+
+        verb = 'would be deleted' if options['dry_run'] else 'deleted'
+        self.stdout.write(self.style.SUCCESS(f'{deleted} file(s) {verb}, {freed:,} bytes'))
@@ -0,0 +1,40 @@
+"""
+Management command to make the resized cover renditions
+Usage: python manage.py generate_cover_renditions [--all]
+
+Covers are normally rendered in the background after an upload; this catches
+up on covers uploaded before the renditions existed or whose rendering failed.
+"""
+from django.core.management.base import BaseCommand
+from library import covers
+from library.models import Book
+
+
+class Command(BaseCommand):
+    help = 'Renders the WebP and JPEG renditions of book covers that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Check every cover, e.g. after changing LIBRARY_COVERS widths or formats'
+        )
+
+    def handle(self, *args, **options):
+        books = Book.objects.exclude(cover_pic='').exclude(cover_pic__isnull=True)
+        if not options['all']:
+            books = books.filter(cover_digest='')
+
+        rendered = failed = 0
+        for book_id in books.order_by('pk').values_list('pk', flat=True).iterator():
+            try:
+                covers.generate(book_id)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  Book {book_id}: {error}'))
+                continue
+            rendered += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered covers of {rendered} book(s)'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} cover(s) could not be read'))
@@ -0,0 +1,113 @@
+"""
+Management command to bulk import books from a CSV, JSON Lines or MARC 21 file
+Usage: python manage.py import_books books.csv [--format csv] [--chunk-size 1000] [--resume]
+
+Records are validated with the BookForm rules and upserted by ISBN. CSV and
+JSONL records use the BookForm field names (title, author, isbn, description,
+category, published_date, available_copies); .gz inputs are read as is.
+Progress is checkpointed after every chunk, so an interrupted run continues
+with --resume. Rejected records are written to an error report.
+"""
+import csv
+import os
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from library import homepage
+from library.importing import READERS, Checkpoint, detect_format, file_fingerprint, open_source, upsert_chunk, validate_record
+
+
+class Command(BaseCommand):
+    help = 'Streams books from a CSV, JSONL or MARC file into the catalogue, upserting by ISBN'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='Input format (default: guessed from the file extension)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of records written per transaction'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the last chunk recorded in the checkpoint'
+        )
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--errors', help='Per-record error report (default: <path>.errors.csv)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No such file: {path}')
+        input_format = options['format'] or detect_format(path)
+        if input_format is None:
+            raise CommandError('Cannot tell the input format from the extension; pass --format')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        reader, binary = READERS[input_format]
+
+        checkpoint = Checkpoint(options['checkpoint'] or f'{path}.checkpoint', file_fingerprint(path))
+        counters = {'records': 0, 'created': 0, 'updated': 0, 'failed': 0}
+        if options['resume']:
+            state = checkpoint.load()
+            if state is None:
+                self.stdout.write(self.style.WARNING('No checkpoint for this file; starting from the beginning'))
+            else:
+                counters = {name: state[name] for name in counters}
+                self.stdout.write(f"Resuming after record {counters['records']}")
+        skip = counters['records']
+
+        errors_path = options['errors'] or f'{path}.errors.csv'
+        with open_source(path, binary) as source, open(errors_path, 'a' if skip else 'w', newline='') as report:
+            errors = csv.writer(report)
+            if not skip:
+                errors.writerow(['record', 'isbn', 'field', 'error'])
+            records = islice(enumerate(reader(source), start=1), skip, None)
+            started = time.monotonic()
+            processed = 0
+
+            while True:
+                chunk = list(islice(records, options['chunk_size']))
+                if not chunk:
+                    break
+                rows, rejected = [], []
+                for number, record in chunk:
+                    cleaned, problems = validate_record(record)
+                    if cleaned is not None:
+                        rows.append(cleaned)
+                        continue
+                    isbn = record.get('isbn', '') if isinstance(record, dict) else record.isbn
+                    rejected.extend([number, isbn, field, message] for field, message in problems)
+                    counters['failed'] += 1
+
+                created, updated = upsert_chunk(rows)
+                errors.writerows(rejected)
+                report.flush()
+                counters['records'] = chunk[-1][0]
+                counters['created'] += created
+                counters['updated'] += updated
+                checkpoint.save(**counters)
+
+                processed += len(chunk)
+                rate = processed / max(time.monotonic() - started, 1e-9)
+                self.stdout.write(
+                    f"  {counters['records']:,} records: {counters['created']:,} created, "
+                    f"{counters['updated']:,} updated, {counters['failed']:,} rejected ({rate:,.0f} rows/s)"
+                )
+
+        checkpoint.clear()
+        homepage.refresh()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counters['records']:,} records in {elapsed:.1f}s "
+            f"({processed / max(elapsed, 1e-9):,.0f} rows/s): {counters['created']:,} created, "
+            f"{counters['updated']:,} updated, {counters['failed']:,} rejected"
+        ))
+        if counters['failed']:
+            self.stdout.write(self.style.WARNING(f'Rejected records are listed in {errors_path}'))
@@ -0,0 +1,43 @@
+"""
+Management command to move uploaded images to content-addressed names
+Usage: python manage.py migrate_media [--dry-run]
+
+Each cover and profile picture still stored under its upload name is copied to
+its content-addressed name (identical files collapse into one) and the row is
+pointed at it. Old files stay in place until gc_media removes them.
+"""
+from django.core.management.base import BaseCommand
+from library.catalogue import bump_catalogue_version
+from library.media import MEDIA_FIELDS, legacy_rows, migrate_file
+
+
+class Command(BaseCommand):
+    help = 'Moves existing covers and profile pictures into the content-addressed media storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only count the files that would move')
+
+    def handle(self, *args, **options):
+        moved = missing = 0
+        for model, field_name in MEDIA_FIELDS:
+            label = f'{model.__name__}.{field_name}'
+            for pk, name in legacy_rows(model, field_name):
+                if options['dry_run']:
+                    moved += 1
+                    continue
+                try:
+                    new_name = migrate_file(model, field_name, pk, name)
+                except FileNotFoundError:
+                    missing += 1
+                    self.stdout.write(self.style.WARNING(f'  {label} #{pk}: {name} is missing'))
+                    continue
+                moved += 1
+                self.stdout.write(f'  {label} #{pk}: {name} -> {new_name}')
+
+        if moved and not options['dry_run']:
+            # Cached pages embed the old cover URLs
+            bump_catalogue_version()
+        verb = 'would be moved' if options['dry_run'] else 'moved'
+        self.stdout.write(self.style.SUCCESS(f'{moved} file(s) {verb}, {missing} missing'))
+        if moved and not options['dry_run']:
+            self.stdout.write('Run gc_media to delete the files left behind')
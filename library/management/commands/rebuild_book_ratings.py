@@ -0,0 +1,29 @@
+"""
+Management command to rebuild the denormalized rating aggregates of books
+Usage: python manage.py rebuild_book_ratings [--chunk-size 1000]
+"""
+from django.core.management.base import BaseCommand
+from library.ratings import book_id_chunks, rebuild_chunk
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the rating sum, count, average and star histogram of every book from its reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of books recomputed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        scanned = 0
+        changed = 0
+        for chunk in book_id_chunks(options['chunk_size']):
+            changed += rebuild_chunk(chunk)
+            scanned += len(chunk)
+            self.stdout.write(f'  {scanned} book(s) scanned, {changed} corrected', ending='\r')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings of {scanned} book(s); {changed} needed correcting'))
@@ -0,0 +1,30 @@
+"""
+Management command to rebuild the book search index
+Usage: python manage.py rebuild_search_index [--chunk-size 1000]
+"""
+from django.core.management.base import BaseCommand
+from library.models import Book
+from library.search import get_search_backend
+from library.search.indexing import INDEXED_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the search index and its term statistics for every book in the catalogue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of books indexed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        backend = get_search_backend()
+        self.stdout.write(f'Rebuilding search index with {type(backend).__name__}...')
+
+        books = Book.objects.only('pk', *INDEXED_FIELDS).order_by('pk').iterator(chunk_size=chunk_size)
+        backend.rebuild(books, batch_size=chunk_size)
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {Book.objects.count()} book(s)'))
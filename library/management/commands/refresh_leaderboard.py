@@ -0,0 +1,31 @@
+"""
+Management command to refresh the materialized book leaderboard
+Usage: python manage.py refresh_leaderboard [--window all]
+
+Run it periodically (e.g. hourly from cron): reviews age out of the dated
+windows without any event, and the prior mean drifts as reviews accumulate.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from library.leaderboard import leaderboard_settings, refresh_window
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the Bayesian leaderboard of every configured window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window',
+            action='append',
+            help='Window to refresh (repeatable); defaults to all configured windows'
+        )
+
+    def handle(self, *args, **options):
+        windows = leaderboard_settings()['WINDOWS']
+        selected = options['window'] or list(windows)
+        unknown = set(selected) - set(windows)
+        if unknown:
+            raise CommandError(f"Unknown window(s): {', '.join(sorted(unknown))}")
+
+        for window in selected:
+            ranked = refresh_window(window)
+            self.stdout.write(self.style.SUCCESS(f"{windows[window]['label']}: ranked {ranked} book(s)"))
@@ -0,0 +1,95 @@
+"""
+Media Maintenance
+Moves uploaded files to their content-addressed names and finds stored files
+that no row references any more
+"""
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.db.models.functions import Now
+from .covers import cover_settings
+from .models import Book, UserProfile
+from .storage import is_content_addressed
+
+# Image fields whose uploads live in the content-addressed storage
+MEDIA_FIELDS = ((Book, 'cover_pic'), (UserProfile, 'profile_picture'))
+
+
+def field_storage(model, field_name):
+    return model._meta.get_field(field_name).storage
+
+
+def legacy_rows(model, field_name, chunk_size=500):
+    """
+    Yield (pk, name) of rows whose file still has its upload name
+    """
+    rows = (
+        model.objects.exclude(Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True}))
+        .order_by('pk')
+        .values_list('pk', field_name)
+    )
+    for pk, name in rows.iterator(chunk_size=chunk_size):
+        if not is_content_addressed(name):
+            yield pk, name
+
+
+def migrate_file(model, field_name, pk, name):
+    """
+    Store a row's file under its content-addressed name and point the row at it.
+    Returns the new name; the old file is left for gc_media.
+    """
+    storage = field_storage(model, field_name)
+    with storage.open(name, 'rb') as source:
+        new_name = storage.save(name, source)
+    # Guarded by the old name in case the row was changed meanwhile
+    changes = {field_name: new_name}
+    if model is Book:
+        changes['updated_at'] = Now()
+    model.objects.filter(pk=pk, **{field_name: name}).update(**changes)
+    return new_name
+
+
+def referenced_names():
+    """
+    Return the names of every stored upload some row points at
+    """
+    names = set()
+    for model, field_name in MEDIA_FIELDS:
+        names.update(
+            model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            .values_list(field_name, flat=True)
+            .iterator(chunk_size=5000)
+        )
+    return names
+
+
+def walk(storage, directory):
+    """
+    Yield the names of all files below a storage directory
+    """
+    if not storage.exists(directory):
+        return
+    subdirectories, files = storage.listdir(directory)
+    for filename in files:
+        yield f'{directory}/{filename}'
+    for subdirectory in subdirectories:
+        yield from walk(storage, f'{directory}/{subdirectory}')
+
+
+def unreferenced_files():
+    """
+    Yield (storage, name) of uploads and cover renditions nothing refers to
+    """
+    referenced = referenced_names()
+    rendition_directory = cover_settings()['DIRECTORY']
+    digests = set(Book.objects.exclude(cover_digest='').values_list('cover_digest', flat=True).iterator())
+
+    for model, field_name in MEDIA_FIELDS:
+        field = model._meta.get_field(field_name)
+        for name in walk(field.storage, field.upload_to.rstrip('/')):
+            if not name.startswith(f'{rendition_directory}/') and name not in referenced:
+                yield field.storage, name
+
+    # Renditions are named '<cover digest>-<width>.<format>'
+    for name in walk(default_storage, rendition_directory):
+        if name.rsplit('/', 1)[-1].split('-', 1)[0] not in digests:
+            yield default_storage, name
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+from collections import Counter
+
+# Books read, and postings written, per round trip
+BATCH_SIZE = 1000
+
+
+def tokenize(value):
+    # Frozen copy of library.search.text.tokenize as this migration shipped
+    import re
+    import unicodedata
+    if not value:
+        return []
+    decomposed = unicodedata.normalize('NFKD', str(value).casefold())
+    normalized = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return [token[:64] for token in re.findall(r'\w+', normalized)]
+
+
+def index_existing_books(apps, schema_editor):
+    """
+    Build postings for books that existed before the index, a batch at a time
+    """
+    Book = apps.get_model('library', 'Book')
+    SearchPosting = apps.get_model('library', 'SearchPosting')
+    fields = ('title', 'author', 'category', 'description')
+    postings = []
+    for book in Book.objects.only('pk', *fields).order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        for field in fields:
+            for term, frequency in Counter(tokenize(getattr(book, field))).items():
+                postings.append(SearchPosting(book_id=book.pk, field=field, term=term, term_frequency=frequency))
+        if len(postings) >= BATCH_SIZE:
+            SearchPosting.objects.bulk_create(postings, batch_size=BATCH_SIZE)
+            postings = []
+    SearchPosting.objects.bulk_create(postings, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_review'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(help_text='Normalized index term', max_length=64)),
+                ('field', models.CharField(choices=[('title', 'Title'), ('author', 'Author'), ('category', 'Category'), ('description', 'Description')], help_text='Book field the term occurs in', max_length=12)),
+                ('term_frequency', models.PositiveIntegerField(default=1, help_text='Occurrences of the term in the field')),
+                ('book', models.ForeignKey(help_text='Book containing the term', on_delete=django.db.models.deletion.CASCADE, related_name='search_postings', to='library.book')),
+            ],
+            options={
+                'verbose_name': 'Search Posting',
+                'verbose_name_plural': 'Search Postings',
+                'unique_together': {('term', 'field', 'book')},
+            },
+        ),
+        migrations.RunPython(index_existing_books, migrations.RunPython.noop),
+    ]
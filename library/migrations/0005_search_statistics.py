@@ -0,0 +1,95 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:11
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+# Books whose postings are updated per round trip
+BATCH_SIZE = 200
+
+
+def compute_statistics(apps, schema_editor):
+    """
+    Derive field lengths and term statistics from the existing postings.
+    A field's length is the sum of the term frequencies of its postings.
+    """
+    Book = apps.get_model('library', 'Book')
+    SearchPosting = apps.get_model('library', 'SearchPosting')
+    SearchTermStat = apps.get_model('library', 'SearchTermStat')
+    SearchFieldStat = apps.get_model('library', 'SearchFieldStat')
+
+    field_totals = {}
+    last_pk = 0
+    while True:
+        batch = list(Book.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_pk = batch[-1]
+        lengths = {
+            (row['book_id'], row['field']): row['length']
+            for row in SearchPosting.objects.filter(book_id__in=batch)
+            .values('book_id', 'field').annotate(length=Sum('term_frequency')).order_by()
+        }
+        postings = list(SearchPosting.objects.filter(book_id__in=batch).only('pk', 'book_id', 'field'))
+        for posting in postings:
+            posting.field_length = lengths[(posting.book_id, posting.field)]
+        SearchPosting.objects.bulk_update(postings, ['field_length'], batch_size=1000)
+
+        for (book_id, field), length in lengths.items():
+            count, total = field_totals.get(field, (0, 0))
+            field_totals[field] = (count + 1, total + length)
+
+    SearchFieldStat.objects.bulk_create([
+        SearchFieldStat(field=field, document_count=count, total_length=total)
+        for field, (count, total) in field_totals.items()
+    ])
+    SearchTermStat.objects.bulk_create(
+        [
+            SearchTermStat(term=row['term'], field=row['field'], document_frequency=row['frequency'])
+            for row in SearchPosting.objects.values('term', 'field').annotate(frequency=Count('book_id')).iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_searchposting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchFieldStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('title', 'Title'), ('author', 'Author'), ('category', 'Category'), ('description', 'Description')], help_text='Indexed Book field', max_length=12, unique=True)),
+                ('document_count', models.PositiveIntegerField(default=0, help_text='Books with at least one term in the field')),
+                ('total_length', models.PositiveBigIntegerField(default=0, help_text='Sum of the field lengths of those books')),
+            ],
+            options={
+                'verbose_name': 'Search Field Statistic',
+                'verbose_name_plural': 'Search Field Statistics',
+            },
+        ),
+        migrations.AddField(
+            model_name='searchposting',
+            name='field_length',
+            field=models.PositiveIntegerField(default=1, help_text='Number of terms in the field'),
+        ),
+        migrations.CreateModel(
+            name='SearchTermStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(help_text='Normalized index term', max_length=64)),
+                ('field', models.CharField(choices=[('title', 'Title'), ('author', 'Author'), ('category', 'Category'), ('description', 'Description')], help_text='Book field the term occurs in', max_length=12)),
+                ('document_frequency', models.PositiveIntegerField(default=0, help_text='Number of books containing the term')),
+            ],
+            options={
+                'verbose_name': 'Search Term Statistic',
+                'verbose_name_plural': 'Search Term Statistics',
+                'unique_together': {('term', 'field')},
+            },
+        ),
+        migrations.RunPython(compute_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+# Terms read, and trigrams written, per round trip
+BATCH_SIZE = 1000
+
+
+def index_vocabulary(apps, schema_editor):
+    """
+    Build trigrams for the title and author vocabulary already in the index,
+    streaming the terms and writing the trigrams in batches
+    """
+    SearchTermStat = apps.get_model('library', 'SearchTermStat')
+    SearchTrigram = apps.get_model('library', 'SearchTrigram')
+
+    terms = (
+        SearchTermStat.objects.filter(field__in=['title', 'author'])
+        .values_list('term', flat=True).distinct().order_by()
+    )
+    trigrams = []
+    for term in terms.iterator(chunk_size=BATCH_SIZE):
+        padded = f'  {term} '
+        for gram in {padded[position:position + 3] for position in range(len(padded) - 2)}:
+            trigrams.append(SearchTrigram(gram=gram, term=term))
+        if len(trigrams) >= BATCH_SIZE:
+            SearchTrigram.objects.bulk_create(trigrams, batch_size=BATCH_SIZE)
+            trigrams = []
+    SearchTrigram.objects.bulk_create(trigrams, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_search_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(help_text='Three-character slice of the padded term', max_length=3)),
+                ('term', models.CharField(help_text='Normalized index term', max_length=64)),
+            ],
+            options={
+                'verbose_name': 'Search Trigram',
+                'verbose_name_plural': 'Search Trigrams',
+                'indexes': [models.Index(fields=['term'], name='library_sea_term_03b137_idx')],
+                'unique_together': {('gram', 'term')},
+            },
+        ),
+        migrations.RunPython(index_vocabulary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:27
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def compute_aggregates(apps, schema_editor):
+    """
+    Fill the new columns from the existing reviews
+    """
+    Book = apps.get_model('library', 'Book')
+    Review = apps.get_model('library', 'Review')
+
+    totals = Review.objects.order_by().values('book_id').annotate(total=Sum('rating'), reviews=Count('pk'))
+    books = []
+    for row in totals.iterator():
+        books.append(Book(
+            pk=row['book_id'],
+            rating_sum=row['total'],
+            review_count=row['reviews'],
+            average_rating=row['total'] / row['reviews'],
+        ))
+    Book.objects.bulk_update(books, ['rating_sum', 'review_count', 'average_rating'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0006_searchtrigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='average_rating',
+            field=models.FloatField(default=0, editable=False, help_text='rating_sum / review_count'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of all review ratings'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews'),
+        ),
+        migrations.RunPython(compute_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:28
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def compute_histograms(apps, schema_editor):
+    """
+    Fill the star counts from the existing reviews
+    """
+    Book = apps.get_model('library', 'Book')
+    Review = apps.get_model('library', 'Review')
+
+    histograms = {}
+    counts = Review.objects.order_by().values('book_id', 'rating').annotate(reviews=Count('pk'))
+    for row in counts.iterator():
+        book = histograms.setdefault(row['book_id'], Book(pk=row['book_id']))
+        setattr(book, f"rating_{row['rating']}_count", row['reviews'])
+    Book.objects.bulk_update(
+        list(histograms.values()),
+        [f'rating_{stars}_count' for stars in range(1, 6)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0007_book_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 1-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 2-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 3-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 4-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 5-star reviews'),
+        ),
+        migrations.RunPython(compute_histograms, migrations.RunPython.noop),
+    ]
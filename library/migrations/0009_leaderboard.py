@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0008_book_rating_histogram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(help_text='Window name from LIBRARY_LEADERBOARD', max_length=16, unique=True)),
+                ('prior_mean', models.FloatField(default=0, help_text='Mean rating of all reviews in the window')),
+                ('prior_weight', models.FloatField(default=1, help_text='Number of prior-mean votes blended into each score')),
+                ('refreshed_at', models.DateTimeField(blank=True, help_text='Time of the last full refresh', null=True)),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Window',
+                'verbose_name_plural': 'Leaderboard Windows',
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(help_text='Window name from LIBRARY_LEADERBOARD', max_length=16)),
+                ('review_count', models.PositiveIntegerField(default=0, help_text='Reviews of the book in the window')),
+                ('average_rating', models.FloatField(default=0, help_text='Plain average of those reviews')),
+                ('score', models.FloatField(default=0, help_text='Bayesian average used for ranking')),
+                ('book', models.ForeignKey(help_text='Ranked book', on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='library.book')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+                'indexes': [models.Index(fields=['window', '-score', 'book'], name='leaderboard_rank_idx')],
+                'unique_together': {('window', 'book')},
+            },
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:31
+
+from collections import Counter
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Books read and updated per round trip
+BATCH_SIZE = 1000
+
+
+def name_key(name):
+    # Frozen copy of library.models.taxonomy.name_key
+    import re
+    import unicodedata
+    value = (name or '').casefold()
+    if not value.isascii():
+        value = ''.join(
+            char for char in unicodedata.normalize('NFKD', value) if not unicodedata.combining(char)
+        )
+    return ' '.join(token[:64] for token in re.findall(r'\w+', value)) or (name or '').strip().casefold()
+
+
+def file_books(apps, schema_editor):
+    """
+    Deduplicate the existing author and category strings into records,
+    named after their most common spelling, and point every book at them
+    """
+    Book = apps.get_model('library', 'Book')
+    Author = apps.get_model('library', 'Author')
+    Category = apps.get_model('library', 'Category')
+
+    for model, field, ref in ((Author, 'author', 'author_ref'), (Category, 'category', 'category_ref')):
+        spellings = {}
+        for value in Book.objects.values_list(field, flat=True).iterator():
+            spellings.setdefault(name_key(value), Counter())[value.strip()] += 1
+        records = model.objects.bulk_create([
+            model(key=key, name=counts.most_common(1)[0][0], book_count=sum(counts.values()))
+            for key, counts in spellings.items()
+        ], batch_size=BATCH_SIZE)
+        record_ids = {record.key: record.pk for record in records}
+        if None in record_ids.values():
+            record_ids = dict(model.objects.values_list('key', 'pk'))
+
+        # Books are read in primary key batches rather than through one open
+        # cursor, since each batch is written back to the table being read
+        last_pk = 0
+        while True:
+            books = list(Book.objects.filter(pk__gt=last_pk).only('pk', field).order_by('pk')[:BATCH_SIZE])
+            if not books:
+                break
+            last_pk = books[-1].pk
+            for book in books:
+                setattr(book, f'{ref}_id', record_ids[name_key(getattr(book, field))])
+            Book.objects.bulk_update(books, [ref], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0010_book_title_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Author',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Display name', max_length=200)),
+                ('key', models.CharField(help_text='Normalized name used for deduplication', max_length=200, unique=True)),
+                ('book_count', models.PositiveIntegerField(default=0, editable=False, help_text='Number of books filed here')),
+            ],
+            options={
+                'verbose_name': 'Author',
+                'verbose_name_plural': 'Authors',
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Display name', max_length=200)),
+                ('key', models.CharField(help_text='Normalized name used for deduplication', max_length=200, unique=True)),
+                ('book_count', models.PositiveIntegerField(default=0, editable=False, help_text='Number of books filed here')),
+            ],
+            options={
+                'verbose_name': 'Category',
+                'verbose_name_plural': 'Categories',
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['name', 'id'], name='category_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['name', 'id'], name='author_name_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='author_ref',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Normalized author record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='books', to='library.author'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='category_ref',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Normalized category record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='books', to='library.category'),
+        ),
+        migrations.RunPython(file_books, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author_ref', 'title', 'id'], name='book_author_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['category_ref', 'title', 'id'], name='book_category_title_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:33
+
+from django.db import migrations, models
+
+USER_EMAIL_INDEX = 'library_auth_user_email_idx'
+
+
+def create_user_email_index(apps, schema_editor):
+    """
+    UserRegistrationForm.clean_email looks users up by exact email, which
+    auth_user does not index; the table belongs to django.contrib.auth, so
+    the index is created with raw SQL instead of Meta.indexes
+    """
+    quote = schema_editor.quote_name
+    schema_editor.execute(f'CREATE INDEX {quote(USER_EMAIL_INDEX)} ON {quote("auth_user")} ({quote("email")})')
+
+
+def drop_user_email_index(apps, schema_editor):
+    # DROP INDEX syntax differs per backend (MySQL needs ON <table>)
+    schema_editor.execute(schema_editor.sql_delete_index % {
+        'name': schema_editor.quote_name(USER_EMAIL_INDEX),
+        'table': schema_editor.quote_name('auth_user'),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('library', '0011_author_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['available_copies'], name='book_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['published_date'], name='book_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['category', 'author', 'available_copies'], name='book_stats_covering_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['book', '-created_at', 'id'], name='review_book_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-created_at', 'id'], name='review_created_idx'),
+        ),
+        migrations.RunPython(create_user_email_index, drop_user_email_index),
+    ]
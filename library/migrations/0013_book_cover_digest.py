@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0012_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='cover_digest',
+            field=models.CharField(blank=True, editable=False, help_text='Content hash of the cover the renditions were made from', max_length=16),
+        ),
+    ]
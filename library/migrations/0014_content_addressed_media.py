@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:41
+
+from django.db import migrations, models
+import library.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0013_book_cover_digest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='cover_pic',
+            field=models.ImageField(blank=True, help_text='Upload book cover image', null=True, storage=library.storage.content_addressed_storage, upload_to='cover_pics/'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, help_text='Upload profile picture', null=True, storage=library.storage.content_addressed_storage, upload_to='profile_pics/'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+"""
+Give the index term columns a binary collation.
+
+prefix_condition() matches a prefix with the range [token, next token), which
+only holds where terms sort by code point. Under MySQL's utf8mb4_unicode_ci or
+a PostgreSQL locale collation, punctuation sorts before letters and digits, so
+the range after a token ending in 'z' or '9' is empty. SQLite already compares
+text as BINARY. Collation names differ per backend, so this is set here rather
+than with Field.db_collation.
+"""
+from django.db import migrations
+
+TERM_TABLES = ['SearchPosting', 'SearchTermStat']
+
+ALTER_SQL = {
+    'mysql': (
+        'ALTER TABLE {table} MODIFY {column} varchar(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL',
+        'ALTER TABLE {table} MODIFY {column} varchar(64) NOT NULL',
+    ),
+    'postgresql': (
+        'ALTER TABLE {table} ALTER COLUMN {column} TYPE varchar(64) COLLATE "C"',
+        'ALTER TABLE {table} ALTER COLUMN {column} TYPE varchar(64) COLLATE "default"',
+    ),
+}
+
+
+def set_collation(apps, schema_editor, binary=True):
+    statements = ALTER_SQL.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    sql = statements[0] if binary else statements[1]
+    for model_name in TERM_TABLES:
+        model = apps.get_model('library', model_name)
+        schema_editor.execute(sql.format(
+            table=schema_editor.quote_name(model._meta.db_table),
+            column=schema_editor.quote_name(model._meta.get_field('term').column),
+        ))
+
+
+def restore_collation(apps, schema_editor):
+    set_collation(apps, schema_editor, binary=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0016_review_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_collation, restore_collation),
+    ]
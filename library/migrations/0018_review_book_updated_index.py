@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0017_search_term_binary_collation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['book', 'updated_at'], name='review_book_updated_idx'),
+        ),
+    ]
@@ -3,11 +3,22 @@ Models Package
 Exports all model classes for easy importing
 """
 from .user import UserProfile
+from .taxonomy import Author, Category
 from .book import Book
 from .review import Review
+from .search import SearchPosting, SearchTermStat, SearchFieldStat, SearchTrigram
+from .leaderboard import LeaderboardWindow, LeaderboardEntry
 
 __all__ = [
     'UserProfile',
+    'Author',
+    'Category',
     'Book',
     'Review',
+    'SearchPosting',
+    'SearchTermStat',
+    'SearchFieldStat',
+    'SearchTrigram',
+    'LeaderboardWindow',
+    'LeaderboardEntry',
 ]
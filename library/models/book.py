@@ -3,9 +3,33 @@ Book Model
 Represents a book in the library management system
 """
 from django.db import models
+from ..storage import content_addressed_storage
+from .taxonomy import Author, Category, name_key
+from .tracking import LoadedValuesMixin
 
+# Fields a catalogue card displays; everything else stays deferred
+CARD_FIELDS = ('id', 'title', 'author', 'category', 'available_copies', 'cover_pic', 'cover_digest')
 
-class Book(models.Model):
+# Per-star review counts, index 0 holding the 1-star count
+STAR_COUNT_FIELDS = ('rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count')
+
+# Columns written only through atomic F() updates, never by a full save()
+RATING_AGGREGATE_FIELDS = ('rating_sum', 'review_count', 'average_rating') + STAR_COUNT_FIELDS
+
+
+class BookQuerySet(models.QuerySet):
+    """
+    Query helpers shared by the catalogue views
+    """
+
+    def cards(self):
+        """
+        Load only the columns of a catalogue card, leaving description and aggregates behind
+        """
+        return self.only(*CARD_FIELDS)
+
+
+class Book(LoadedValuesMixin, models.Model):
     """
     Model representing a book in the library management system.
     """
@@ -13,10 +37,18 @@ class Book(models.Model):
     author = models.CharField(max_length=200, help_text="Enter the author's name")
     cover_pic = models.ImageField(
         upload_to='cover_pics/',
+        storage=content_addressed_storage,
         blank=True,
         null=True,
         help_text="Upload book cover image"
     )
+    # Set once the resized cover renditions exist; names them (see library.covers)
+    cover_digest = models.CharField(
+        max_length=16,
+        blank=True,
+        editable=False,
+        help_text="Content hash of the cover the renditions were made from"
+    )
     isbn = models.CharField(
         max_length=13,
         unique=True,
@@ -24,16 +56,62 @@ class Book(models.Model):
     )
     description = models.TextField(help_text="Enter a detailed description of the book")
     category = models.CharField(max_length=50, help_text="Enter the book's category")
+    # Resolved from the author and category text on save
+    author_ref = models.ForeignKey(
+        Author,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='books',
+        help_text="Normalized author record"
+    )
+    category_ref = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='books',
+        help_text="Normalized category record"
+    )
     published_date = models.DateField(help_text="Enter the publication date")
     available_copies = models.IntegerField(
         default=1,
         help_text="Number of available copies"
     )
+    # Also advanced by review changes and cover renditions, which alter the detail page
+    updated_at = models.DateTimeField(auto_now=True, help_text="When the book or its page last changed")
+
+    # Review aggregates, maintained by the Review signal handlers
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, help_text="Sum of all review ratings")
+    review_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of reviews")
+    average_rating = models.FloatField(default=0, editable=False, help_text="rating_sum / review_count")
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of 1-star reviews")
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of 2-star reviews")
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of 3-star reviews")
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of 4-star reviews")
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of 5-star reviews")
+
+    objects = BookQuerySet.as_manager()
 
     class Meta:
         ordering = ['title']
         verbose_name = 'Book'
         verbose_name_plural = 'Books'
+        indexes = [
+            # Serves keyset pagination of the catalogue in (title, id) order
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+            # Serve the author and category browse pages in the same order
+            models.Index(fields=['author_ref', 'title', 'id'], name='book_author_title_idx'),
+            models.Index(fields=['category_ref', 'title', 'id'], name='book_category_title_idx'),
+            # Availability filter of the homepage counts and the search facets
+            models.Index(fields=['available_copies'], name='book_available_idx'),
+            # Decade drill-down of the search facets
+            models.Index(fields=['published_date'], name='book_published_idx'),
+            # Covers the homepage aggregate: distinct categories and authors, available copies
+            models.Index(fields=['category', 'author', 'available_copies'], name='book_stats_covering_idx'),
+        ]
 
     def __str__(self):
         """
@@ -42,18 +120,93 @@ class Book(models.Model):
         """
         return f"{self.title} (ISBN: {self.isbn})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'author' in update_fields:
+            self.resolve_author()
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = [*update_fields, 'author_ref']
+        if update_fields is None or 'category' in update_fields:
+            self.resolve_category()
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = [*update_fields, 'category_ref']
+
+        if update_fields:
+            # auto_now only applies to the fields being written
+            kwargs['update_fields'] = update_fields = [*update_fields, 'updated_at']
+
+        cover_changed = self.cover_changed()
+        if cover_changed:
+            # The renditions of the old cover no longer apply; new ones are made after commit
+            self.cover_digest = ''
+            if update_fields is not None and 'cover_pic' in update_fields:
+                kwargs['update_fields'] = update_fields = [*update_fields, 'cover_digest']
+
+        if not self._state.adding and update_fields is None:
+            # A copy loaded before a review was posted must not write back its
+            # stale aggregates, nor clear renditions finished since it was loaded
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RATING_AGGREGATE_FIELDS
+                and (field.name != 'cover_digest' or cover_changed)
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    def cover_changed(self):
+        """
+        Whether cover_pic differs from the value it was loaded or last saved with
+        """
+        if 'cover_pic' in self.get_deferred_fields():
+            return False
+        loaded = self.get_loaded_value('cover_pic')
+        return (getattr(loaded, 'name', loaded) or '') != (self.cover_pic.name or '')
+
+    def resolve_author(self):
+        """
+        Point author_ref at the Author record of the author text
+        """
+        if self._name_changed('author', 'author_ref_id'):
+            self.author_ref = Author.for_name(self.author)
+
+    def resolve_category(self):
+        """
+        Point category_ref at the Category record of the category text
+        """
+        if self._name_changed('category', 'category_ref_id'):
+            self.category_ref = Category.for_name(self.category)
+
+    def _name_changed(self, field_name, ref_attname):
+        loaded = self.get_loaded_value(field_name)
+        return (
+            getattr(self, ref_attname) is None
+            or loaded is None
+            or name_key(loaded) != name_key(getattr(self, field_name))
+        )
+
     def get_average_rating(self):
         """
-        Calculate and return the average rating for this book
+        Return the average rating for this book, rounded to one decimal
         """
-        reviews = self.reviews.all()
-        if reviews:
-            total = sum(review.rating for review in reviews)
-            return round(total / len(reviews), 1)
+        if self.review_count:
+            return round(self.average_rating, 1)
         return 0
 
     def get_review_count(self):
         """
         Return the total number of reviews for this book
         """
-        return self.reviews.count()
+        return self.review_count
+
+    def get_rating_histogram(self):
+        """
+        Return the star distribution from 5 down to 1 as dicts of stars, count and percent
+        """
+        histogram = []
+        for stars in range(5, 0, -1):
+            count = getattr(self, STAR_COUNT_FIELDS[stars - 1])
+            percent = round(100 * count / self.review_count) if self.review_count else 0
+            histogram.append({'stars': stars, 'count': count, 'percent': percent})
+        return histogram
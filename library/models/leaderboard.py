@@ -0,0 +1,49 @@
+"""
+Leaderboard Models
+Materialized Bayesian ranking of books, one row per book and ranking window
+"""
+from django.db import models
+from .book import Book
+
+
+class LeaderboardWindow(models.Model):
+    """
+    Prior used to score a ranking window, fixed at its last full refresh
+    """
+    window = models.CharField(max_length=16, unique=True, help_text="Window name from LIBRARY_LEADERBOARD")
+    prior_mean = models.FloatField(default=0, help_text="Mean rating of all reviews in the window")
+    prior_weight = models.FloatField(default=1, help_text="Number of prior-mean votes blended into each score")
+    refreshed_at = models.DateTimeField(null=True, blank=True, help_text="Time of the last full refresh")
+
+    class Meta:
+        verbose_name = 'Leaderboard Window'
+        verbose_name_plural = 'Leaderboard Windows'
+
+    def __str__(self):
+        return f"{self.window}: mean {self.prior_mean:.2f}, weight {self.prior_weight:.1f}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    A book's reviews within a window and its Bayesian average score
+    """
+    window = models.CharField(max_length=16, help_text="Window name from LIBRARY_LEADERBOARD")
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        help_text="Ranked book"
+    )
+    review_count = models.PositiveIntegerField(default=0, help_text="Reviews of the book in the window")
+    average_rating = models.FloatField(default=0, help_text="Plain average of those reviews")
+    score = models.FloatField(default=0, help_text="Bayesian average used for ranking")
+
+    class Meta:
+        verbose_name = 'Leaderboard Entry'
+        verbose_name_plural = 'Leaderboard Entries'
+        unique_together = ['window', 'book']
+        # Serves the top-N read as an index range scan
+        indexes = [models.Index(fields=['window', '-score', 'book'], name='leaderboard_rank_idx')]
+
+    def __str__(self):
+        return f"[{self.window}] {self.book_id}: {self.score:.3f}"
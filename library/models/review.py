@@ -5,9 +5,10 @@ Represents user reviews and ratings for books
 from django.db import models
 from django.contrib.auth.models import User
 from .book import Book
+from .tracking import LoadedValuesMixin
 
 
-class Review(models.Model):
+class Review(LoadedValuesMixin, models.Model):
     """
     Model representing a user review for a book.
     Allows registered users to rate and review books.
@@ -54,6 +55,16 @@ class Review(models.Model):
         ordering = ['-created_at']
         # Ensure one review per user per book
         unique_together = ['book', 'user']
+        indexes = [
+            # book_detail pages through a book's reviews newest first, or by
+            # rating; each sort scans one of these in a single direction
+            models.Index(fields=['book', 'created_at', 'id'], name='review_book_created_idx'),
+            models.Index(fields=['book', 'rating', 'created_at', 'id'], name='review_book_rating_idx'),
+            # The detail page validators read a book's newest review change in one seek
+            models.Index(fields=['book', 'updated_at'], name='review_book_updated_idx'),
+            # staff_dashboard and the admin list every review newest first
+            models.Index(fields=['-created_at', 'id'], name='review_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s review of {self.book.title} - {self.rating} stars"
@@ -0,0 +1,101 @@
+"""
+Search Index Models
+Inverted index of Book fields and the term statistics used for ranking
+"""
+from django.db import models
+from .book import Book
+
+FIELD_CHOICES = [
+    ('title', 'Title'),
+    ('author', 'Author'),
+    ('category', 'Category'),
+    ('description', 'Description'),
+]
+
+
+class SearchPosting(models.Model):
+    """
+    One posting of the inverted index: a term occurring in a field of a book.
+    The (term, field, book) key doubles as the index serving term and prefix lookups.
+    """
+    FIELD_CHOICES = FIELD_CHOICES
+
+    term = models.CharField(max_length=64, help_text="Normalized index term")
+    field = models.CharField(max_length=12, choices=FIELD_CHOICES, help_text="Book field the term occurs in")
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name='search_postings',
+        help_text="Book containing the term"
+    )
+    term_frequency = models.PositiveIntegerField(default=1, help_text="Occurrences of the term in the field")
+    field_length = models.PositiveIntegerField(default=1, help_text="Number of terms in the field")
+
+    class Meta:
+        verbose_name = 'Search Posting'
+        verbose_name_plural = 'Search Postings'
+        unique_together = ['term', 'field', 'book']
+
+    def __str__(self):
+        return f"{self.term} [{self.field}] -> {self.book_id}"
+
+
+class SearchTermStat(models.Model):
+    """
+    Document frequency of a term within a field, kept in step with the postings
+    """
+    term = models.CharField(max_length=64, help_text="Normalized index term")
+    field = models.CharField(max_length=12, choices=FIELD_CHOICES, help_text="Book field the term occurs in")
+    document_frequency = models.PositiveIntegerField(default=0, help_text="Number of books containing the term")
+
+    class Meta:
+        verbose_name = 'Search Term Statistic'
+        verbose_name_plural = 'Search Term Statistics'
+        unique_together = ['term', 'field']
+
+    def __str__(self):
+        return f"{self.term} [{self.field}]: {self.document_frequency}"
+
+
+class SearchFieldStat(models.Model):
+    """
+    Per-field corpus totals used for BM25 length normalisation
+    """
+    field = models.CharField(max_length=12, choices=FIELD_CHOICES, unique=True, help_text="Indexed Book field")
+    document_count = models.PositiveIntegerField(default=0, help_text="Books with at least one term in the field")
+    total_length = models.PositiveBigIntegerField(default=0, help_text="Sum of the field lengths of those books")
+
+    class Meta:
+        verbose_name = 'Search Field Statistic'
+        verbose_name_plural = 'Search Field Statistics'
+
+    def __str__(self):
+        return f"{self.field}: {self.document_count} books"
+
+    @property
+    def average_length(self):
+        """
+        Average field length, at least 1 to keep the BM25 norm finite
+        """
+        if not self.document_count:
+            return 1.0
+        return max(self.total_length / self.document_count, 1.0)
+
+
+class SearchTrigram(models.Model):
+    """
+    Trigram posting over the vocabulary of the fuzzy-searchable fields.
+    Misspelled query tokens are matched to index terms by intersecting these postings.
+    """
+    gram = models.CharField(max_length=3, help_text="Three-character slice of the padded term")
+    term = models.CharField(max_length=64, help_text="Normalized index term")
+
+    class Meta:
+        verbose_name = 'Search Trigram'
+        verbose_name_plural = 'Search Trigrams'
+        unique_together = ['gram', 'term']
+        # Removing a term's trigrams looks them up by term
+        indexes = [models.Index(fields=['term'])]
+
+    def __str__(self):
+        return f"{self.gram!r} -> {self.term}"
@@ -0,0 +1,99 @@
+"""
+Taxonomy Models
+Authors and categories books are filed under, deduplicated by a normalized name
+"""
+from django.db import models
+from django.db.models import Count, F
+
+
+def name_key(name):
+    """
+    Deduplication key of a name: 'J.K. Rowling' and 'j. k.  rowling' share one
+    """
+    # Imported here: the search package imports the models package
+    from ..search.text import tokenize
+    return ' '.join(tokenize(name)) or (name or '').strip().casefold()
+
+
+class CatalogueEntity(models.Model):
+    """
+    A named entity books point at, with a denormalized count of those books
+    """
+    name = models.CharField(max_length=200, help_text="Display name")
+    key = models.CharField(max_length=200, unique=True, help_text="Normalized name used for deduplication")
+    book_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of books filed here")
+
+    class Meta:
+        abstract = True
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def for_name(cls, name):
+        """
+        Return the entity a name resolves to, creating it on first use
+        """
+        entity, created = cls.objects.get_or_create(key=name_key(name), defaults={'name': name.strip()})
+        return entity
+
+    @classmethod
+    def for_names(cls, names):
+        """
+        Return {key: pk} for many names at once, creating the missing entities in bulk
+        """
+        spellings = {}
+        for name in names:
+            spellings.setdefault(name_key(name), name.strip())
+        pks = dict(cls.objects.filter(key__in=spellings).values_list('key', 'pk'))
+        missing = [cls(key=key, name=name) for key, name in spellings.items() if key not in pks]
+        if missing:
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+            pks.update(cls.objects.filter(key__in=[entity.key for entity in missing]).values_list('key', 'pk'))
+        return pks
+
+    @classmethod
+    def adjust_book_count(cls, pk, delta):
+        if pk is not None and delta:
+            cls.objects.filter(pk=pk).update(book_count=F('book_count') + delta)
+
+    @classmethod
+    def recount_books(cls, pks):
+        """
+        Recompute book_count of the given entities, e.g. after a bulk write bypassing the signals
+        """
+        ref = cls.books.field
+        counts = dict(
+            ref.model.objects.filter(**{f'{ref.name}__in': pks})
+            .order_by()
+            .values_list(ref.name)
+            .annotate(Count('pk'))
+        )
+        entities = list(cls.objects.filter(pk__in=pks).only('pk', 'book_count'))
+        for entity in entities:
+            entity.book_count = counts.get(entity.pk, 0)
+        cls.objects.bulk_update(entities, ['book_count'])
+
+
+class Author(CatalogueEntity):
+    """
+    Model representing a book author
+    """
+
+    class Meta(CatalogueEntity.Meta):
+        verbose_name = 'Author'
+        verbose_name_plural = 'Authors'
+        # Serves keyset pagination of the author index
+        indexes = [models.Index(fields=['name', 'id'], name='author_name_id_idx')]
+
+
+class Category(CatalogueEntity):
+    """
+    Model representing a book category
+    """
+
+    class Meta(CatalogueEntity.Meta):
+        verbose_name = 'Category'
+        verbose_name_plural = 'Categories'
+        indexes = [models.Index(fields=['name', 'id'], name='category_name_id_idx')]
@@ -0,0 +1,49 @@
+"""
+Loaded Value Tracking
+Model mixin remembering the field values an instance was loaded or last saved with
+"""
+
+
+class LoadedValuesMixin:
+    """
+    Lets signal handlers tell what a save changed by comparing the current
+    field values with the ones read from the database
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the values loaded from the database
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # The saved state becomes the baseline for the next save
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: field.value_from_object(self)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
+
+    def get_loaded_value(self, field_name, default=None):
+        """
+        Return a field's value as last loaded or saved, before any pending changes
+        """
+        return getattr(self, '_loaded_values', {}).get(field_name, default)
+
+    def load_stored_values(self, *field_names):
+        """
+        Read the stored values of fields the instance was not loaded with
+        (deferred, or built in memory for an existing row) into the loaded values
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        missing = [name for name in field_names if name not in loaded]
+        if not missing or self.pk is None:
+            return
+        stored = type(self)._base_manager.filter(pk=self.pk).values(*missing).first()
+        if stored is not None:
+            self._loaded_values = {**loaded, **stored}
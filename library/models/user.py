@@ -6,6 +6,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from ..storage import content_addressed_storage
 
 
 class UserProfile(models.Model):
@@ -16,7 +17,7 @@ class UserProfile(models.Model):
     phone_number = models.CharField(max_length=15, blank=True, null=True, help_text="Enter phone number")
     address = models.TextField(blank=True, null=True, help_text="Enter address")
     date_of_birth = models.DateField(blank=True, null=True, help_text="Enter date of birth")
-    profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True, help_text="Upload profile picture")
+    profile_picture = models.ImageField(upload_to='profile_pics/', storage=content_addressed_storage, blank=True, null=True, help_text="Upload profile picture")
 
     class Meta:
         verbose_name = 'User Profile'
@@ -0,0 +1,131 @@
+"""
+Anonymous Page Cache
+Whole rendered catalogue pages kept in the shared cache for anonymous visitors.
+
+Keys hold the versions a page was built from together with its path and the
+query parameters the view reads, so a catalogue or review change makes every
+affected page miss at once and nothing has to be deleted; the timeout only
+lets stale versions age out. Other query parameters do not make new entries,
+and requests carrying a cursor this site did not issue are rendered without
+the cache. Signed-in users, pages with pending flash messages and responses
+that set cookies (e.g. a CSRF token) are never served from or stored in the
+cache. Keys are hashed, so they stay valid for memcached.
+"""
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from .catalogue import catalogue_version, review_version
+from .conditional import book_page_state, has_pending_messages
+from .pagination import is_valid_cursor
+
+DEFAULTS = {
+    # Seconds a page of an old version may linger before the backend drops it
+    'TIMEOUT': 24 * 60 * 60,
+}
+
+STATS_KEY = 'library:page:stats:{}'
+COUNTERS = ('hits', 'misses', 'bypasses')
+
+
+def page_cache_settings():
+    """
+    Return LIBRARY_PAGE_CACHE merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'LIBRARY_PAGE_CACHE', {})}
+
+
+def record(counter):
+    key = STATS_KEY.format(counter)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def stats():
+    """
+    Return the shared hit, miss and bypass counters with the hit ratio of cacheable requests
+    """
+    values = cache.get_many([STATS_KEY.format(counter) for counter in COUNTERS])
+    counts = {counter: values.get(STATS_KEY.format(counter), 0) for counter in COUNTERS}
+    lookups = counts['hits'] + counts['misses']
+    counts['hit_ratio'] = round(counts['hits'] / lookups, 4) if lookups else None
+    return counts
+
+
+def reset_stats():
+    cache.delete_many([STATS_KEY.format(counter) for counter in COUNTERS])
+
+
+def page_key(name, request, parts, params=()):
+    query = [(param, request.GET[param]) for param in params if request.GET.get(param)]
+    source = '|'.join(str(part) for part in (request.get_host(), request.path, query, *parts))
+    return f'library:page:{name}:{hashlib.sha1(source.encode()).hexdigest()}'
+
+
+def is_cacheable(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not response.has_header('Cache-Control')
+    )
+
+
+def cache_anonymous_page(key_parts, params=()):
+    """
+    Serve anonymous GET and HEAD requests of a view from the page cache.
+    `key_parts(request, *args, **kwargs)` returns the versions the page is
+    built from, plus any query values it normalizes itself, or None to render
+    without the cache. `params` names the query parameters keyed as they are;
+    the view must ignore all others.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if (
+                request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+                or has_pending_messages(request)
+                or ('cursor' in params and not is_valid_cursor(request.GET.get('cursor')))
+            ):
+                record('bypasses')
+                return view(request, *args, **kwargs)
+            parts = key_parts(request, *args, **kwargs)
+            if parts is None:
+                record('bypasses')
+                return view(request, *args, **kwargs)
+
+            key = page_key(view.__name__, request, parts, params)
+            cached = cache.get(key)
+            if cached is not None:
+                record('hits')
+                status, headers, content = cached
+                return HttpResponse(content, status=status, headers=headers)
+
+            record('misses')
+            response = view(request, *args, **kwargs)
+            if is_cacheable(response):
+                cache.set(key, (response.status_code, dict(response.items()), response.content),
+                          page_cache_settings()['TIMEOUT'])
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def catalogue_parts(request, *args, **kwargs):
+    return [catalogue_version()]
+
+
+def homepage_parts(request):
+    # The recently added strip shows ratings, which move with reviews
+    return [catalogue_version(), review_version()]
+
+
+def book_parts(request, pk):
+    return book_page_state(request, pk)
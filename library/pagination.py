@@ -0,0 +1,205 @@
+"""
+Keyset Pagination
+Cursor-based paging over ordered querysets; the cost of a page does not grow with its depth
+"""
+import base64
+import datetime
+import json
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, FieldError, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# JSON types a cursor value may have; lists, objects and null never name a row
+CURSOR_VALUE_TYPES = (str, int, float, bool)
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised when a cursor from the query string cannot be decoded
+    """
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder that keeps the microseconds of datetimes instead of
+    truncating them to milliseconds, so a seek on a timestamp column neither
+    skips nor repeats rows
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def cursor_signer():
+    # '.' is outside the base64url alphabet of the payload
+    return signing.Signer(salt='library.pagination.cursor', sep='.')
+
+
+def encode_cursor(values, direction):
+    """
+    Pack the ordering values of a boundary row into an opaque, signed URL-safe
+    token. Only cursors of pages actually served verify, so made-up ones
+    cannot multiply cached pages.
+    """
+    payload = json.dumps({'v': list(values), 'd': direction}, cls=CursorEncoder, separators=(',', ':'))
+    return cursor_signer().sign(base64.urlsafe_b64encode(payload.encode()).decode().rstrip('='))
+
+
+def decode_cursor(cursor):
+    """
+    Return (values, direction) from a token produced by encode_cursor
+    """
+    try:
+        cursor = cursor_signer().unsign(cursor)
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload['v'], payload['d']
+    except (signing.BadSignature, ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values, direction
+
+
+def is_valid_cursor(cursor):
+    """
+    Tell whether a query-string cursor was issued by this site; empty counts as valid
+    """
+    if not cursor:
+        return True
+    try:
+        decode_cursor(cursor)
+    except InvalidCursor:
+        return False
+    return True
+
+
+def request_cursor(request):
+    """
+    Return the request's cursor parameter, or None when it is absent or was not issued here
+    """
+    cursor = request.GET.get('cursor')
+    return cursor if cursor and is_valid_cursor(cursor) else None
+
+
+class KeysetPage:
+    """
+    One page of rows with the cursors leading to its neighbours
+    """
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class KeysetPaginator:
+    """
+    Page through a queryset by seeking past the last row seen instead of using OFFSET.
+    The ordering must be unique (end it with the primary key) and should match an index.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.per_page = per_page
+
+    def get_page(self, cursor=None):
+        """
+        Return the page after (or before) the cursor; an invalid cursor yields the first page
+        """
+        values, direction = None, 'next'
+        if cursor:
+            try:
+                values, direction = decode_cursor(cursor)
+                values = self._coerce(values)
+            except InvalidCursor:
+                values, direction = None, 'next'
+        backwards = direction == 'prev'
+
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek_condition(values, backwards))
+        order_by = [
+            ('-' if descending != backwards else '') + name
+            for name, descending in self.ordering
+        ]
+        rows = list(queryset.order_by(*order_by)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+        has_next = True if backwards else has_more
+        has_previous = has_more if backwards else values is not None
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(self._row_values(rows[-1]), 'next') if has_next else None,
+            previous_cursor=encode_cursor(self._row_values(rows[0]), 'prev') if has_previous else None,
+        )
+
+    def _coerce(self, values):
+        """
+        Convert decoded cursor values to the Python types of their ordering
+        columns, raising InvalidCursor for any value a column cannot hold
+        """
+        if len(values) != len(self.ordering):
+            raise InvalidCursor(values)
+        coerced = []
+        for (name, descending), value in zip(self.ordering, values):
+            if not isinstance(value, CURSOR_VALUE_TYPES):
+                raise InvalidCursor(values)
+            try:
+                coerced.append(self._output_field(name).to_python(value))
+            except (TypeError, ValueError, ValidationError, FieldError):
+                raise InvalidCursor(values)
+        return coerced
+
+    def _output_field(self, name):
+        """
+        Return the field holding an ordering column, annotations included
+        """
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        try:
+            return self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise FieldError(f'Cannot order a keyset page by {name!r}')
+
+    def _seek_condition(self, values, backwards):
+        """
+        Rows strictly after the boundary in the requested direction:
+        (a < x) OR (a = x AND b > y) ... with comparisons flipped per column direction
+        """
+        condition = Q()
+        equal_so_far = {}
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= Q(**equal_so_far, **{f'{name}__{lookup}': value})
+            equal_so_far[name] = value
+        return condition
+
+    def _row_values(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, descending in self.ordering]
+        return [getattr(row, name) for name, descending in self.ordering]
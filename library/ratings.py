@@ -0,0 +1,155 @@
+"""
+Rating Aggregates
+Keeps the rating sum, review count, average and star histogram of each Book
+in step with its reviews
+"""
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Now, NullIf
+from .models import Book, Review
+from .models.book import RATING_AGGREGATE_FIELDS, STAR_COUNT_FIELDS
+
+
+def apply_rating_change(book_id, added_rating=None, removed_rating=None):
+    """
+    Add and/or remove one rating from a book's aggregates in a single atomic UPDATE
+    """
+    rating_delta = (added_rating or 0) - (removed_rating or 0)
+    count_delta = (added_rating is not None) - (removed_rating is not None)
+    star_deltas = {}
+    if added_rating is not None:
+        star_deltas[STAR_COUNT_FIELDS[added_rating - 1]] = 1
+    if removed_rating is not None:
+        field = STAR_COUNT_FIELDS[removed_rating - 1]
+        star_deltas[field] = star_deltas.get(field, 0) - 1
+    star_deltas = {field: delta for field, delta in star_deltas.items() if delta}
+    if not rating_delta and not count_delta and not star_deltas:
+        return
+
+    new_sum = F('rating_sum') + rating_delta
+    new_count = F('review_count') + count_delta
+    Book.objects.filter(pk=book_id).update(
+        # Listed first: MySQL evaluates SET clauses left to right, so this must
+        # read the old sum and count like every other backend does
+        average_rating=Coalesce(
+            Cast(new_sum, FloatField()) / NullIf(new_count, Value(0)),
+            Value(0.0),
+        ),
+        rating_sum=new_sum,
+        review_count=new_count,
+        **{field: F(field) + delta for field, delta in star_deltas.items()},
+        # The detail page shows the aggregates, so its validators must move too
+        updated_at=Now(),
+    )
+
+
+def review_saved(review, created):
+    """
+    Apply a created or edited review, including a rating change or a move to another book
+    """
+    if created:
+        apply_rating_change(review.book_id, added_rating=review.rating)
+        return
+    old_book_id = review.get_loaded_value('book_id', review.book_id)
+    old_rating = review.get_loaded_value('rating', review.rating)
+    if old_book_id != review.book_id:
+        apply_rating_change(old_book_id, removed_rating=old_rating)
+        apply_rating_change(review.book_id, added_rating=review.rating)
+    elif old_rating != review.rating:
+        apply_rating_change(review.book_id, added_rating=review.rating, removed_rating=old_rating)
+
+
+def review_deleted(review):
+    """
+    Remove a deleted review, using the values it was loaded with
+    """
+    apply_rating_change(
+        review.get_loaded_value('book_id', review.book_id),
+        removed_rating=review.get_loaded_value('rating', review.rating),
+    )
+
+
+def actual_aggregates(book_ids):
+    """
+    Return {book_id: {field: value}} for books with reviews, computed from the Review table
+    """
+    stars = {
+        field: Count('pk', filter=Q(rating=position + 1))
+        for position, field in enumerate(STAR_COUNT_FIELDS)
+    }
+    rows = (
+        Review.objects.filter(book_id__in=book_ids)
+        .order_by()
+        .values('book_id')
+        .annotate(rating_sum=Sum('rating'), review_count=Count('pk'), **stars)
+    )
+    aggregates = {}
+    for row in rows:
+        book_id = row.pop('book_id')
+        row['average_rating'] = row['rating_sum'] / row['review_count']
+        aggregates[book_id] = row
+    return aggregates
+
+
+EMPTY_AGGREGATES = {field: 0 for field in RATING_AGGREGATE_FIELDS}
+
+
+def _is_stale(book, expected):
+    return any(
+        abs(getattr(book, field) - value) > 1e-9 if field == 'average_rating' else getattr(book, field) != value
+        for field, value in expected.items()
+    )
+
+
+def book_id_chunks(chunk_size):
+    """
+    Yield lists of book ids in primary key order
+    """
+    last_pk = 0
+    while True:
+        chunk = list(
+            Book.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+def rebuild_chunk(book_ids):
+    """
+    Recompute the aggregates of a chunk of books from their reviews.
+    Returns the number of books whose stored values changed.
+    """
+    with transaction.atomic():
+        # Locking the rows first makes concurrent review writes wait, so their
+        # F() deltas land on top of the rebuilt values instead of being lost
+        books = list(
+            Book.objects.select_for_update()
+            .filter(pk__in=book_ids)
+            .only('pk', *RATING_AGGREGATE_FIELDS)
+        )
+        actual = actual_aggregates(book_ids)
+        changed = []
+        for book in books:
+            expected = actual.get(book.pk, EMPTY_AGGREGATES)
+            if _is_stale(book, expected):
+                for field, value in expected.items():
+                    setattr(book, field, value)
+                changed.append(book)
+        Book.objects.bulk_update(changed, RATING_AGGREGATE_FIELDS)
+    return len(changed)
+
+
+def find_drift(book_ids):
+    """
+    Return [(book, expected)] for books whose stored aggregates disagree with their reviews
+    """
+    actual = actual_aggregates(book_ids)
+    drifted = []
+    books = Book.objects.filter(pk__in=book_ids).only('pk', 'title', *RATING_AGGREGATE_FIELDS)
+    for book in books.order_by('pk'):
+        expected = actual.get(book.pk, EMPTY_AGGREGATES)
+        if _is_stale(book, expected):
+            drifted.append((book, expected))
+    return drifted
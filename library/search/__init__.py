@@ -0,0 +1,9 @@
+"""
+Search Package
+Pluggable book search backends and the inverted index behind them
+"""
+from .backends import get_search_backend
+
+__all__ = [
+    'get_search_backend',
+]
@@ -0,0 +1,300 @@
+"""
+Search Autocomplete
+In-memory prefix index over normalized book titles and authors.
+Each worker builds it lazily on first use and keeps it current from Book signals.
+"""
+import bisect
+import heapq
+import sys
+import threading
+import time
+from array import array
+from django.db import connection
+from ..models import Book
+from .conf import search_settings
+from .text import tokenize
+
+# Leading words skipped when indexing a title a second time
+LEADING_ARTICLES = ('the', 'a', 'an')
+
+# Added and removed entries held aside before being merged into the sorted
+# arrays: at least PENDING_LIMIT, or one in PENDING_RATIO of the entries
+PENDING_LIMIT = 1024
+PENDING_RATIO = 64
+
+
+def normalize_phrase(value):
+    """
+    Reduce text to space-separated normalized tokens
+    """
+    return ' '.join(tokenize(value))
+
+
+def title_keys(title):
+    """
+    Keys a title is found under: the full title, and without a leading article
+    """
+    key = normalize_phrase(title)
+    if not key:
+        return []
+    keys = [key]
+    first, _, rest = key.partition(' ')
+    if rest and first in LEADING_ARTICLES:
+        keys.append(rest)
+    return keys
+
+
+def author_keys(author):
+    """
+    Keys an author is found under: the full name and every later name part
+    longer than an initial, so 'J.R.R. Tolkien' is suggested for 'j r' and 'tolk'
+    """
+    words = normalize_phrase(author).split()
+    if not words:
+        return []
+    return [' '.join(words)] + [
+        ' '.join(words[position:]) for position in range(1, len(words)) if len(words[position]) > 1
+    ]
+
+
+def entry_identity(key, label, book_id):
+    # Spellings normalizing alike (an author's first-seen label) name one entry
+    return key, book_id, normalize_phrase(label)
+
+
+class PrefixIndex:
+    """
+    Sorted parallel arrays of keys, display labels and book ids, searched with bisect.
+    Author entries carry book id 0 and are reference-counted across books.
+    Changes do not shift the arrays one by one: additions wait in a small sorted
+    list and removals as the positions they vacate, both merged into every
+    lookup, until enough of them are folded into the arrays in one pass.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.labels = []
+        self.book_ids = array('q')
+        self.added = []
+        self.removed = set()
+        self.author_counts = {}
+        self.built_at = time.monotonic()
+        self.lock = threading.RLock()
+
+    @classmethod
+    def build(cls, rows):
+        """
+        Build an index from (book_id, title, author) rows
+        """
+        index = cls()
+        entries = []
+        author_labels = {}
+        for book_id, title, author in rows:
+            for key in title_keys(title):
+                entries.append((key, title, book_id))
+            author_key = normalize_phrase(author)
+            if author_key:
+                index.author_counts[author_key] = index.author_counts.get(author_key, 0) + 1
+                author_labels.setdefault(author_key, author)
+        for author in author_labels.values():
+            for key in author_keys(author):
+                entries.append((key, author, 0))
+
+        entries.sort()
+        index.keys = [key for key, label, book_id in entries]
+        index.labels = [label for key, label, book_id in entries]
+        index.book_ids = array('q', (book_id for key, label, book_id in entries))
+        return index
+
+    def __len__(self):
+        return len(self.keys) + len(self.added) - len(self.removed)
+
+    def entries(self, prefix=''):
+        """
+        Iterate the live (key, label, book_id) entries in key order, from the
+        first key not below prefix. Callers hold the lock while iterating.
+        """
+        stored = (
+            (self.keys[position], self.labels[position], self.book_ids[position])
+            for position in range(bisect.bisect_left(self.keys, prefix), len(self.keys))
+            if position not in self.removed
+        )
+        added = (
+            self.added[position]
+            for position in range(bisect.bisect_left(self.added, (prefix,)), len(self.added))
+        )
+        return heapq.merge(stored, added)
+
+    def suggest(self, prefix, limit=8):
+        """
+        Return up to `limit` entries whose key starts with the normalized prefix
+        """
+        prefix = normalize_phrase(prefix)
+        if not prefix:
+            return []
+        suggestions = []
+        seen = set()
+        with self.lock:
+            for key, label, book_id in self.entries(prefix):
+                if len(suggestions) >= limit or not key.startswith(prefix):
+                    break
+                if (label, book_id) not in seen:
+                    seen.add((label, book_id))
+                    suggestions.append({
+                        'label': label,
+                        'type': 'title' if book_id else 'author',
+                        'book_id': book_id or None,
+                    })
+        return suggestions
+
+    def add_book(self, book_id, title, author):
+        with self.lock:
+            for key in title_keys(title):
+                self._insert(key, title, book_id)
+            author_key = normalize_phrase(author)
+            if author_key:
+                count = self.author_counts.get(author_key, 0)
+                self.author_counts[author_key] = count + 1
+                if not count:
+                    for key in author_keys(author):
+                        self._insert(key, author, 0)
+
+    def remove_book(self, book_id, title, author):
+        with self.lock:
+            for key in title_keys(title):
+                self._remove(key, title, book_id)
+            author_key = normalize_phrase(author)
+            count = self.author_counts.get(author_key, 0)
+            if count > 1:
+                self.author_counts[author_key] = count - 1
+            elif count == 1:
+                del self.author_counts[author_key]
+                for key in author_keys(author):
+                    self._remove(key, author, 0)
+
+    def _insert(self, key, label, book_id):
+        bisect.insort(self.added, (key, label, book_id))
+        self._compact_when_full()
+
+    def _remove(self, key, label, book_id):
+        identity = entry_identity(key, label, book_id)
+        position = bisect.bisect_left(self.added, (key,))
+        while position < len(self.added) and self.added[position][0] == key:
+            if entry_identity(*self.added[position]) == identity:
+                del self.added[position]
+                return
+            position += 1
+        position = bisect.bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if position not in self.removed and self.book_ids[position] == book_id \
+                    and entry_identity(key, self.labels[position], book_id) == identity:
+                self.removed.add(position)
+                self._compact_when_full()
+                return
+            position += 1
+
+    def _compact_when_full(self):
+        if len(self.added) + len(self.removed) >= max(PENDING_LIMIT, len(self.keys) // PENDING_RATIO):
+            self.compact()
+
+    def compact(self):
+        """
+        Fold the pending additions and removals into the sorted arrays
+        """
+        with self.lock:
+            stored = list(zip(self.keys, self.labels, self.book_ids))
+            entries, start = [], 0
+            for position in sorted(self.removed):
+                entries.extend(stored[start:position])
+                start = position + 1
+            entries.extend(stored[start:])
+            # Two sorted runs: timsort merges them in linear time
+            entries.extend(self.added)
+            entries.sort()
+            self.keys = [key for key, label, book_id in entries]
+            self.labels = [label for key, label, book_id in entries]
+            self.book_ids = array('q', (book_id for key, label, book_id in entries))
+            self.added = []
+            self.removed = set()
+
+    def memory_footprint(self):
+        """
+        Approximate bytes held by the index: containers plus the strings they own
+        """
+        with self.lock:
+            size = sys.getsizeof(self.keys) + sys.getsizeof(self.labels) + sys.getsizeof(self.book_ids)
+            size += sys.getsizeof(self.added) + sys.getsizeof(self.removed)
+            size += sum(sys.getsizeof(key) for key in self.keys)
+            # A title indexed under two keys shares one label string
+            labels = {id(label): label for label in self.labels}
+            size += sum(sys.getsizeof(label) for label in labels.values())
+            size += sys.getsizeof(self.author_counts)
+        return size
+
+
+_index = None
+_build_lock = threading.Lock()
+_refreshing = threading.Event()
+
+
+def _catalogue_rows():
+    return Book.objects.values_list('pk', 'title', 'author').order_by().iterator(chunk_size=5000)
+
+
+def get_prefix_index():
+    """
+    Return this worker's prefix index, building it on first use.
+    Once older than AUTOCOMPLETE_MAX_AGE it is rebuilt in the background to pick
+    up changes made by other workers, while the current copy keeps serving.
+    """
+    global _index
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                _index = PrefixIndex.build(_catalogue_rows())
+        return _index
+
+    max_age = search_settings()['AUTOCOMPLETE_MAX_AGE']
+    if max_age and time.monotonic() - _index.built_at > max_age and not _refreshing.is_set():
+        _refreshing.set()
+        threading.Thread(target=_rebuild_in_background, daemon=True).start()
+    return _index
+
+
+def _rebuild_in_background():
+    global _index
+    try:
+        _index = PrefixIndex.build(_catalogue_rows())
+    finally:
+        connection.close()
+        _refreshing.clear()
+
+
+def book_saved(book_id, title, author, old_title=None, old_author=None):
+    """
+    Apply a saved book to the index if this worker has built one
+    """
+    index = _index
+    if index is None:
+        return
+    with index.lock:
+        if old_title is not None and old_author is not None:
+            index.remove_book(book_id, old_title, old_author)
+        index.add_book(book_id, title, author)
+
+
+def book_deleted(book_id, title, author):
+    """
+    Drop a deleted book from the index if this worker has built one
+    """
+    index = _index
+    if index is not None:
+        index.remove_book(book_id, title, author)
+
+
+def reset_prefix_index():
+    """
+    Discard the index; the next request rebuilds it
+    """
+    global _index
+    _index = None
@@ -0,0 +1,263 @@
+"""
+Search Backends
+Pluggable implementations answering book_search
+"""
+from functools import lru_cache
+from django.db.models import Case, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Round
+from django.utils.module_loading import import_string
+from ..models import Book, SearchPosting
+from ..pagination import KeysetPaginator
+from . import fuzzy, indexing
+from .conf import fields_for_search_type, search_settings
+from .query import prefix_condition, query_tokens
+from .ranking import QueryStatistics, score_expression
+from .results import SearchResults
+
+# Scores are rounded so that keyset cursors compare them exactly
+SCORE_PRECISION = 6
+
+
+def bounded_count(queryset, threshold):
+    """
+    Count at most threshold + 1 rows; return (count, exact)
+    """
+    count = queryset[:threshold + 1].count()
+    return count, count <= threshold
+
+
+class BaseSearchBackend:
+    """
+    Interface every search backend implements.
+    The index hooks are no-ops for backends that query Book directly.
+    """
+
+    def search(self, query, search_type='all', limit=None):
+        """
+        Return a list of at most `limit` Books matching the query, best first
+        """
+        raise NotImplementedError('Search backends must implement search()')
+
+    def search_page(self, query, search_type='all', cursor=None, per_page=None, filters=None, count=True):
+        """
+        Return SearchResults for the keyset page after `cursor`.
+        `filters` is an optional Q over Book narrowing the matches (facet drill-down).
+        With `count` False the results carry no count, for callers that have one.
+        """
+        raise NotImplementedError('Search backends must implement search_page()')
+
+    def count_matches(self, query, search_type='all', filters=None):
+        """
+        Return (count, exact): the exact number of matches up to
+        EXACT_COUNT_THRESHOLD, an estimate above it
+        """
+        raise NotImplementedError('Search backends must implement count_matches()')
+
+    def matching_book_ids(self, query, search_type='all'):
+        """
+        Return a values queryset of the ids of all matching books
+        """
+        raise NotImplementedError('Search backends must implement matching_book_ids()')
+
+    def index_book(self, book):
+        """Called after a Book is saved"""
+
+    def index_books(self, books, batch_size=1000):
+        """Called after Books are written in bulk (imports, rebuilds)"""
+
+    def remove_book(self, book_id):
+        """Called before a Book is deleted"""
+
+    def rebuild(self, books, batch_size=1000):
+        """Rebuild any index from scratch"""
+        self.index_books(books, batch_size=batch_size)
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Substring search with `icontains` over the Book table.
+    Needs no index but scans every row on each query and cannot rank.
+    """
+
+    def search(self, query, search_type='all', limit=None):
+        books = self.matching_books(query, search_type)
+        return list(books[:limit] if limit else books)
+
+    def search_page(self, query, search_type='all', cursor=None, per_page=None, filters=None, count=True):
+        config = search_settings()
+        books = self.matching_books(query, search_type)
+        if filters:
+            books = books.filter(filters)
+        page = KeysetPaginator(
+            books.defer('description'),
+            ('title', 'id'),
+            per_page or config['PAGE_SIZE'],
+        ).get_page(cursor)
+        total, exact = self.count_books(books) if count else (None, False)
+        return SearchResults(page.items, total, exact, page.next_cursor, page.previous_cursor)
+
+    def count_matches(self, query, search_type='all', filters=None):
+        books = self.matching_books(query, search_type)
+        return self.count_books(books.filter(filters) if filters else books)
+
+    def count_books(self, books):
+        count, exact = bounded_count(books, search_settings()['EXACT_COUNT_THRESHOLD'])
+        if not exact:
+            # No statistics to estimate from; report the threshold as a lower bound
+            count -= 1
+        return count, exact
+
+    def matching_books(self, query, search_type='all'):
+        condition = Q()
+        for field in fields_for_search_type(search_type):
+            condition |= Q(**{f'{field}__icontains': query})
+        return Book.objects.filter(condition)
+
+    def matching_book_ids(self, query, search_type='all'):
+        return self.matching_books(query, search_type).values('pk')
+
+
+class IndexSearchBackend(BaseSearchBackend):
+    """
+    Token search over the SearchPosting inverted index, ranked with BM25.
+    Every query token must prefix-match a term in one of the searched fields.
+    """
+
+    def search(self, query, search_type='all', limit=None):
+        return self.load_books(self.rank(query, search_type, limit))
+
+    def search_page(self, query, search_type='all', cursor=None, per_page=None, filters=None, count=True,
+                    fuzzy_fallback=True):
+        config = search_settings()
+        tokens = query_tokens(query)
+        if not tokens:
+            return SearchResults([])
+        fields = fields_for_search_type(search_type)
+        statistics = QueryStatistics(tokens, fields)
+
+        if fuzzy_fallback and set(fields) & set(config['FUZZY_FIELDS']):
+            # Tokens that prefix no term in the searched fields are likely misspelled
+            known_tokens = {token for token, field in statistics.tokens_stats}
+            if len(known_tokens) < len(tokens):
+                corrected = fuzzy.correct_tokens(tokens, known_tokens)
+                if corrected:
+                    results = self.search_page(
+                        ' '.join(corrected), search_type, cursor, per_page, filters, count, fuzzy_fallback=False
+                    )
+                    results.suggestion = ' '.join(corrected)
+                    return results
+
+        matches = self.filtered_postings(tokens, fields, filters)
+        page = KeysetPaginator(
+            self.scored(matches, statistics),
+            ('-score', 'book_id'),
+            per_page or config['PAGE_SIZE'],
+        ).get_page(cursor)
+        books = self.load_books([(row['book_id'], row['score']) for row in page], defer=('description',))
+
+        total, exact = self.count_postings(matches, statistics) if count else (None, False)
+        return SearchResults(books, total, exact, page.next_cursor, page.previous_cursor)
+
+    def count_matches(self, query, search_type='all', filters=None):
+        tokens = query_tokens(query)
+        if not tokens:
+            return 0, True
+        fields = fields_for_search_type(search_type)
+        matches = self.filtered_postings(tokens, fields, filters)
+        return self.count_postings(matches, QueryStatistics(tokens, fields))
+
+    def count_postings(self, matches, statistics):
+        threshold = search_settings()['EXACT_COUNT_THRESHOLD']
+        count, exact = bounded_count(matches.distinct(), threshold)
+        if not exact:
+            count = max(statistics.estimate_matches(), threshold + 1)
+        return count, exact
+
+    def rank(self, query, search_type='all', limit=None):
+        """
+        Return [(book_id, score)] for the top `limit` matches.
+        Scoring, ordering and the top-k cut all happen in the database.
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+        fields = fields_for_search_type(search_type)
+        limit = limit or search_settings()['MAX_RESULTS']
+        matches = self.scored(self.matching_postings(tokens, fields), QueryStatistics(tokens, fields))
+        return list(matches.order_by('-score', 'book_id').values_list('book_id', 'score')[:limit])
+
+    def scored(self, matches, statistics):
+        """
+        Annotate grouped postings with their rounded BM25 score
+        """
+        return matches.annotate(score=Round(score_expression(statistics), SCORE_PRECISION))
+
+    def load_books(self, ranked, defer=()):
+        """
+        Fetch the books of [(book_id, score)] in one query, keeping the ranking order
+        """
+        books = Book.objects.defer(*defer).in_bulk([book_id for book_id, score in ranked])
+        results = []
+        for book_id, score in ranked:
+            book = books.get(book_id)
+            if book is not None:
+                book.score = score
+                results.append(book)
+        return results
+
+    def matching_book_ids(self, query, search_type='all'):
+        """
+        Return a values queryset of the ids of books matching every query token
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return SearchPosting.objects.none().values('book_id')
+        return self.matching_postings(tokens, fields_for_search_type(search_type)).values('book_id')
+
+    def filtered_postings(self, tokens, fields, filters=None):
+        matches = self.matching_postings(tokens, fields)
+        if filters:
+            matches = matches.filter(book_id__in=Book.objects.filter(filters).values('pk'))
+        return matches
+
+    def matching_postings(self, tokens, fields):
+        """
+        Return postings grouped per book, restricted to books covering every token
+        """
+        any_token = Q()
+        for token in tokens:
+            any_token |= prefix_condition(token)
+        postings = SearchPosting.objects.filter(any_token, field__in=fields).values('book_id')
+        if len(tokens) == 1:
+            return postings
+
+        per_token = {
+            f'token_{position}': Max(Case(
+                When(prefix_condition(token), then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+            for position, token in enumerate(tokens)
+        }
+        return postings.annotate(**per_token).filter(**{name: 1 for name in per_token})
+
+    def index_book(self, book):
+        indexing.index_book(book)
+
+    def index_books(self, books, batch_size=1000):
+        indexing.index_books(books, batch_size=batch_size)
+
+    def remove_book(self, book_id):
+        indexing.remove_book(book_id)
+
+    def rebuild(self, books, batch_size=1000):
+        indexing.clear_index()
+        indexing.index_books(books, batch_size=batch_size)
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """
+    Return the configured search backend instance
+    """
+    return import_string(search_settings()['BACKEND'])()
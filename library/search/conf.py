@@ -0,0 +1,66 @@
+"""
+Search Settings
+Defaults for the LIBRARY_SEARCH setting
+"""
+from django.conf import settings
+
+DEFAULTS = {
+    # Dotted path of the backend class answering book_search
+    'BACKEND': 'library.search.backends.IndexSearchBackend',
+    # Relative importance of a match in each field
+    'FIELD_WEIGHTS': {
+        'title': 3.0,
+        'author': 2.0,
+        'category': 1.5,
+        'description': 1.0,
+    },
+    # BM25 term-frequency saturation and length normalisation
+    'BM25_K1': 1.2,
+    'BM25_B': 0.75,
+    # Score multiplier for terms that only start with a query token
+    'PREFIX_MATCH_WEIGHT': 0.5,
+    # Top-k cut applied by the database before results are loaded
+    'MAX_RESULTS': 100,
+    # Books per page of search results
+    'PAGE_SIZE': 24,
+    # Match counts above this are estimated from term statistics instead of counted
+    'EXACT_COUNT_THRESHOLD': 1000,
+    # Suggestions returned by the autocomplete endpoint
+    'AUTOCOMPLETE_LIMIT': 8,
+    # Seconds before a worker rebuilds its prefix index to pick up other workers' changes
+    'AUTOCOMPLETE_MAX_AGE': 300,
+    # Fields whose vocabulary is trigram-indexed for typo tolerance
+    'FUZZY_FIELDS': ('title', 'author'),
+    # Minimum trigram (Jaccard) similarity for a term to count as a near match
+    'FUZZY_SIMILARITY': 0.4,
+    # Candidate terms fetched from the trigram postings per misspelled token
+    'FUZZY_CANDIDATES': 50,
+    # Seconds the grouped facet rows of a query's result set stay cached
+    'FACET_CACHE_TIMEOUT': 300,
+    # Result pages kept in each worker's LRU cache (0 disables it)
+    'RESULT_CACHE_SIZE': 500,
+    # Seconds a cached result page may be served
+    'RESULT_CACHE_TIMEOUT': 300,
+}
+
+# Fields searched for each value of the `type` query parameter
+SEARCH_TYPE_FIELDS = {
+    'title': ('title',),
+    'author': ('author',),
+    'genre': ('category',),
+    'all': ('title', 'author', 'category', 'description'),
+}
+
+
+def search_settings():
+    """
+    Return LIBRARY_SEARCH merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'LIBRARY_SEARCH', {})}
+
+
+def fields_for_search_type(search_type):
+    """
+    Map a search type to the Book fields it covers; unknown types search everything
+    """
+    return SEARCH_TYPE_FIELDS.get(search_type, SEARCH_TYPE_FIELDS['all'])
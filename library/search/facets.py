@@ -0,0 +1,195 @@
+"""
+Search Facets
+Facet counts for a result set, computed from one grouped query.
+The grouped rows of a query's base result set are cached, so drill-down
+requests recount every facet in Python without touching the database.
+"""
+import hashlib
+from datetime import date
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, Count, Q, Value, When
+from django.db.models.functions import ExtractYear, Left
+from django.utils.http import urlencode
+from ..catalogue import catalogue_version
+from ..models import Book
+from .conf import search_settings
+from .query import query_tokens
+
+# Facet request parameter -> heading shown in the sidebar
+FACETS = {
+    'category': 'Category',
+    'initial': 'Author',
+    'decade': 'Decade',
+    'availability': 'Availability',
+}
+
+AVAILABILITY_LABELS = {
+    'available': 'Available',
+    'checked_out': 'Checked out',
+}
+
+
+def parse_filters(params):
+    """
+    Read the active drill-down filters from request parameters, dropping invalid ones
+    """
+    filters = {}
+    category = params.get('category', '').strip()
+    if category:
+        filters['category'] = category
+    initial = params.get('initial', '').strip().upper()
+    if len(initial) == 1:
+        filters['initial'] = initial
+    decade = params.get('decade', '')
+    if decade.isdigit() and int(decade) % 10 == 0 and int(decade) <= 9990:
+        filters['decade'] = int(decade)
+    if params.get('availability') in AVAILABILITY_LABELS:
+        filters['availability'] = params['availability']
+    return filters
+
+
+def filter_condition(filters):
+    """
+    Translate drill-down filters into a Q over Book
+    """
+    condition = Q()
+    if 'category' in filters:
+        condition &= Q(category=filters['category'])
+    if 'initial' in filters:
+        condition &= Q(author__istartswith=filters['initial'])
+    if 'decade' in filters:
+        # A date range rather than __year so an index on published_date applies
+        decade = max(filters['decade'], 1)
+        condition &= Q(published_date__gte=date(decade, 1, 1))
+        if decade + 10 <= date.max.year:
+            condition &= Q(published_date__lt=date(decade + 10, 1, 1))
+    if 'availability' in filters:
+        available = Q(available_copies__gt=0)
+        condition &= available if filters['availability'] == 'available' else ~available
+    return condition
+
+
+def filter_params(filters):
+    """
+    Encode filters back into a query string fragment
+    """
+    return urlencode(filters)
+
+
+def grouped_rows(book_ids, limit=None):
+    """
+    Count the books of `book_ids` (a values queryset of ids) per combination of
+    (category, author initial, decade, availability) in a single GROUP BY query.
+    Year and initial are folded into decade and upper case here, which keeps the
+    SQL portable and the number of groups bounded by the catalogue's diversity.
+    With a limit only the first `limit` matching books are grouped; returns
+    (rows, complete) where complete tells whether every match was counted.
+    """
+    complete = True
+    if limit is not None:
+        ids = [next(iter(row.values())) for row in book_ids.distinct()[:limit + 1]]
+        complete = len(ids) <= limit
+        book_ids = ids[:limit]
+    rows = (
+        Book.objects.filter(pk__in=book_ids)
+        .order_by()
+        .values(
+            'category',
+            initial=Left('author', 1),
+            year=ExtractYear('published_date'),
+            available=Case(When(available_copies__gt=0, then=Value(True)), default=Value(False),
+                           output_field=BooleanField()),
+        )
+        .annotate(books=Count('pk'))
+    )
+    combined = {}
+    for row in rows:
+        key = (
+            row['category'],
+            (row['initial'] or '#').upper(),
+            row['year'] // 10 * 10,
+            'available' if row['available'] else 'checked_out',
+        )
+        combined[key] = combined.get(key, 0) + row['books']
+    return [key + (books,) for key, books in combined.items()], complete
+
+
+def cached_grouped_rows(backend, query, search_type):
+    """
+    Return (rows, complete) for a query's unfiltered result set, grouped from
+    at most EXACT_COUNT_THRESHOLD books and cached per normalized query and
+    catalogue version
+    """
+    config = search_settings()
+    digest = hashlib.sha1(f"{search_type}\0{' '.join(query_tokens(query))}".encode()).hexdigest()
+    key = f'library:search:facet-rows:{catalogue_version()}:{digest}'
+    grouped = cache.get(key)
+    if grouped is None:
+        grouped = grouped_rows(backend.matching_book_ids(query, search_type), config['EXACT_COUNT_THRESHOLD'])
+        cache.set(key, grouped, config['FACET_CACHE_TIMEOUT'])
+    return grouped
+
+
+class FacetCounts:
+    """
+    Counts per facet value for a result set under the active filters.
+    Each facet is counted with every filter applied except its own, so a
+    selected value still shows the alternatives it can be switched to.
+    """
+
+    def __init__(self, rows, filters, complete=True):
+        self.filters = filters
+        # False when the rows cover only the first matches; counts are then partial
+        self.complete = complete
+        self.counts = {name: {} for name in FACETS}
+        self.total = 0
+        names = list(FACETS)
+        for row in rows:
+            *values, books = row
+            misses = [name for name, value in zip(names, values)
+                      if name in filters and filters[name] != value]
+            if not misses:
+                self.total += books
+            for name, value in zip(names, values):
+                if not misses or misses == [name]:
+                    self.counts[name][value] = self.counts[name].get(value, 0) + books
+
+    def facets(self, params=None):
+        """
+        Return the facets for display, with the query string that toggles each value
+        """
+        params = {key: value for key, value in (params or {}).items() if key not in FACETS and key != 'cursor'}
+        facets = []
+        for name, heading in FACETS.items():
+            values = []
+            for value, books in self.ordered(name):
+                selected = self.filters.get(name) == value
+                toggled = {key: item for key, item in self.filters.items() if key != name}
+                if not selected:
+                    toggled[name] = value
+                values.append({
+                    'value': value,
+                    'label': self.label(name, value),
+                    'count': books,
+                    'selected': selected,
+                    'query_string': urlencode({**params, **toggled}),
+                })
+            if values:
+                facets.append({'name': name, 'label': heading, 'values': values})
+        return facets
+
+    def ordered(self, name):
+        counts = self.counts[name].items()
+        if name == 'category':
+            return sorted(counts, key=lambda item: (-item[1], item[0]))
+        if name == 'decade':
+            return sorted(counts, reverse=True)
+        return sorted(counts)
+
+    @staticmethod
+    def label(name, value):
+        if name == 'decade':
+            return f'{value}s'
+        if name == 'availability':
+            return AVAILABILITY_LABELS[value]
+        return value
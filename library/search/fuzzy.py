@@ -0,0 +1,106 @@
+"""
+Search Fuzzy Matching
+Trigram index over the title and author vocabulary for typo-tolerant search.
+Candidates come from intersecting trigram postings, never from scanning terms.
+"""
+import math
+from django.db.models import Count
+from ..models import SearchTermStat, SearchTrigram
+from .conf import search_settings
+
+
+def trigrams(term):
+    """
+    Return the set of trigrams of a term padded like pg_trgm ('  ab ')
+    """
+    padded = f'  {term} '
+    return {padded[position:position + 3] for position in range(len(padded) - 2)}
+
+
+def similarity(grams, other_grams):
+    """
+    Jaccard similarity of two trigram sets
+    """
+    if not grams or not other_grams:
+        return 0.0
+    shared = len(grams & other_grams)
+    return shared / (len(grams) + len(other_grams) - shared)
+
+
+def similar_terms(token, cutoff=None, limit=None):
+    """
+    Return [(term, similarity)] for vocabulary terms at least `cutoff` similar to the token, best first.
+    A term can only reach the cutoff if it shares ceil(cutoff * |grams|) trigrams with the
+    token, so that bound is applied in the database before any similarity is computed.
+    """
+    config = search_settings()
+    cutoff = config['FUZZY_SIMILARITY'] if cutoff is None else cutoff
+    limit = limit or config['FUZZY_CANDIDATES']
+    grams = trigrams(token)
+    min_shared = max(1, math.ceil(cutoff * len(grams)))
+
+    candidates = (
+        SearchTrigram.objects.filter(gram__in=grams)
+        .values('term')
+        .annotate(shared=Count('gram'))
+        .filter(shared__gte=min_shared)
+        .order_by('-shared', 'term')
+        .values_list('term', flat=True)[:limit]
+    )
+    scored = [(term, similarity(grams, trigrams(term))) for term in candidates if term != token]
+    return sorted(
+        [(term, score) for term, score in scored if score >= cutoff],
+        key=lambda match: (-match[1], match[0]),
+    )
+
+
+def correct_tokens(tokens, known_tokens):
+    """
+    Replace every token outside `known_tokens` by its closest vocabulary term.
+    Returns the corrected token list, or None when nothing could be corrected.
+    """
+    corrected = []
+    changed = False
+    for token in tokens:
+        if token not in known_tokens:
+            matches = similar_terms(token)
+            if matches:
+                corrected.append(matches[0][0])
+                changed = True
+                continue
+        corrected.append(token)
+    return corrected if changed else None
+
+
+def add_terms(terms, batch_size=1000):
+    """
+    Index the trigrams of terms that are not indexed yet
+    """
+    terms = set(terms)
+    if not terms:
+        return
+    existing = set(SearchTrigram.objects.filter(term__in=terms).values_list('term', flat=True).distinct())
+    SearchTrigram.objects.bulk_create(
+        [
+            SearchTrigram(gram=gram, term=term)
+            for term in terms - existing
+            for gram in trigrams(term)
+        ],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+
+def remove_terms(terms):
+    """
+    Drop the trigrams of terms no longer used by any fuzzy-searchable field
+    """
+    terms = set(terms)
+    if not terms:
+        return
+    still_used = set(
+        SearchTermStat.objects.filter(term__in=terms, field__in=search_settings()['FUZZY_FIELDS'])
+        .values_list('term', flat=True)
+    )
+    if terms - still_used:
+        SearchTrigram.objects.filter(term__in=terms - still_used).delete()
@@ -0,0 +1,169 @@
+"""
+Search Indexing
+Builds and maintains the inverted index of Book fields and its term statistics
+"""
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from ..models import SearchFieldStat, SearchPosting, SearchTermStat, SearchTrigram
+from . import fuzzy
+from .conf import search_settings
+from .text import tokenize
+
+# Book fields covered by the inverted index
+INDEXED_FIELDS = ('title', 'author', 'category', 'description')
+
+
+def build_postings(book):
+    """
+    Return unsaved SearchPosting rows for every term of every indexed field
+    """
+    postings = []
+    for field in INDEXED_FIELDS:
+        terms = tokenize(getattr(book, field))
+        for term, frequency in Counter(terms).items():
+            postings.append(SearchPosting(
+                book_id=book.pk,
+                field=field,
+                term=term,
+                term_frequency=frequency,
+                field_length=len(terms),
+            ))
+    return postings
+
+
+def index_book(book):
+    """
+    Replace the postings of a single book
+    """
+    _replace_postings([book.pk], build_postings(book))
+
+
+def index_books(books, batch_size=1000):
+    """
+    Replace the postings of many books, one chunk at a time.
+    Used by rebuilds and bulk imports, which bypass the model signals.
+    """
+    indexed = 0
+    chunk = []
+    for book in books:
+        chunk.append(book)
+        if len(chunk) >= batch_size:
+            indexed += _index_chunk(chunk, batch_size)
+            chunk = []
+    if chunk:
+        indexed += _index_chunk(chunk, batch_size)
+    return indexed
+
+
+def _index_chunk(books, batch_size):
+    postings = []
+    for book in books:
+        postings.extend(build_postings(book))
+    _replace_postings([book.pk for book in books], postings, batch_size)
+    return len(books)
+
+
+def remove_book(book_id):
+    """
+    Drop all postings of a book; must run before the Book row is deleted
+    """
+    _replace_postings([book_id], [])
+
+
+def clear_index():
+    """
+    Drop the whole index together with its statistics
+    """
+    with transaction.atomic():
+        SearchPosting.objects.all().delete()
+        SearchTermStat.objects.all().delete()
+        SearchFieldStat.objects.all().delete()
+        SearchTrigram.objects.all().delete()
+
+
+def _replace_postings(book_ids, postings, batch_size=1000):
+    """
+    Swap the postings of the given books and apply the statistic deltas
+    """
+    with transaction.atomic():
+        old_postings = SearchPosting.objects.filter(book_id__in=book_ids)
+        old_rows = list(old_postings.values_list('book_id', 'field', 'term', 'field_length'))
+        old_postings.delete()
+        SearchPosting.objects.bulk_create(postings, batch_size=batch_size)
+
+        term_deltas = Counter()
+        old_lengths = {}
+        new_lengths = {}
+        for book_id, field, term, length in old_rows:
+            term_deltas[(term, field)] -= 1
+            old_lengths[(book_id, field)] = length
+        for posting in postings:
+            term_deltas[(posting.term, posting.field)] += 1
+            new_lengths[(posting.book_id, posting.field)] = posting.field_length
+
+        _apply_term_deltas(term_deltas, batch_size)
+        _apply_field_deltas(old_lengths, new_lengths)
+
+
+def _apply_term_deltas(term_deltas, batch_size):
+    """
+    Adjust document frequencies, creating new vocabulary rows and dropping dead ones
+    """
+    grouped = defaultdict(lambda: defaultdict(list))
+    for (term, field), delta in term_deltas.items():
+        if delta:
+            grouped[delta][field].append(term)
+
+    SearchTermStat.objects.bulk_create(
+        [
+            SearchTermStat(term=term, field=field)
+            for (term, field), delta in term_deltas.items() if delta > 0
+        ],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    for delta, fields in grouped.items():
+        for field, terms in fields.items():
+            stats = SearchTermStat.objects.filter(field=field, term__in=terms)
+            stats.update(document_frequency=Greatest(F('document_frequency') + delta, Value(0)))
+            if delta < 0:
+                stats.filter(document_frequency=0).delete()
+
+    # Keep the trigram vocabulary of the fuzzy fields in step
+    fuzzy_fields = search_settings()['FUZZY_FIELDS']
+    fuzzy.add_terms(
+        {term for (term, field), delta in term_deltas.items() if delta > 0 and field in fuzzy_fields},
+        batch_size,
+    )
+    fuzzy.remove_terms(
+        {term for (term, field), delta in term_deltas.items() if delta < 0 and field in fuzzy_fields}
+    )
+
+
+def _apply_field_deltas(old_lengths, new_lengths):
+    """
+    Adjust per-field document counts and total lengths
+    """
+    count_deltas = Counter()
+    length_deltas = Counter()
+    for (book_id, field), length in old_lengths.items():
+        count_deltas[field] -= 1
+        length_deltas[field] -= length
+    for (book_id, field), length in new_lengths.items():
+        count_deltas[field] += 1
+        length_deltas[field] += length
+
+    changed = [field for field in INDEXED_FIELDS if count_deltas[field] or length_deltas[field]]
+    if not changed:
+        return
+    SearchFieldStat.objects.bulk_create(
+        [SearchFieldStat(field=field) for field in changed],
+        ignore_conflicts=True,
+    )
+    for field in changed:
+        SearchFieldStat.objects.filter(field=field).update(
+            document_count=Greatest(F('document_count') + count_deltas[field], Value(0)),
+            total_length=Greatest(F('total_length') + length_deltas[field], Value(0)),
+        )
@@ -0,0 +1,24 @@
+"""
+Search Query Helpers
+Turning a raw query into tokens and index lookups
+"""
+from django.db.models import Q
+from .text import tokenize
+
+
+def query_tokens(query):
+    """
+    Return the distinct tokens of a query in the order they were typed
+    """
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def prefix_condition(token):
+    """
+    Match terms starting with the token.
+    The explicit range lets every database walk the term index instead of
+    relying on LIKE-prefix optimisation. It assumes terms sort by code point,
+    which migration 0017 ensures by giving the term columns a binary collation.
+    """
+    upper_bound = token[:-1] + chr(ord(token[-1]) + 1)
+    return Q(term__gte=token, term__lt=upper_bound, term__startswith=token)
@@ -0,0 +1,130 @@
+"""
+Search Ranking
+BM25 scoring of postings from precomputed term and field statistics
+"""
+import math
+from django.db.models import Case, F, FloatField, Q, Sum, Value, When
+from ..models import SearchFieldStat, SearchTermStat
+from .conf import search_settings
+from .query import prefix_condition
+
+
+def inverse_document_frequency(document_frequency, document_count):
+    """
+    BM25 idf, floored at zero so very common terms never lower a score
+    """
+    document_frequency = min(document_frequency, document_count)
+    return math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+def field_statistics(fields):
+    """
+    Return {field: SearchFieldStat} for the searched fields
+    """
+    stats = {stat.field: stat for stat in SearchFieldStat.objects.filter(field__in=fields)}
+    return {field: stats.get(field, SearchFieldStat(field=field)) for field in fields}
+
+
+def token_statistics(tokens, fields):
+    """
+    Return {(token, field): (exact_df, prefix_df)}, one term-index range read per token.
+    The prefix frequency sums all expansions of the token and may overcount.
+    """
+    statistics = {}
+    for token in tokens:
+        rows = (
+            SearchTermStat.objects.filter(prefix_condition(token), field__in=fields)
+            .values('field')
+            .annotate(
+                prefix_df=Sum('document_frequency'),
+                exact_df=Sum(Case(
+                    When(term=token, then=F('document_frequency')),
+                    default=Value(0),
+                )),
+            )
+        )
+        for row in rows:
+            statistics[(token, row['field'])] = (row['exact_df'], row['prefix_df'])
+    return statistics
+
+
+class QueryStatistics:
+    """
+    Field and token statistics for one query, read once and shared by scoring and estimates
+    """
+
+    def __init__(self, tokens, fields):
+        self.tokens = tokens
+        self.fields = fields
+        self.fields_stats = field_statistics(fields)
+        self.tokens_stats = token_statistics(tokens, fields)
+
+    @property
+    def catalogue_size(self):
+        return max((stat.document_count for stat in self.fields_stats.values()), default=0)
+
+    def estimate_matches(self):
+        """
+        Estimate the number of books matching every token, assuming tokens occur independently
+        """
+        catalogue_size = self.catalogue_size
+        if not catalogue_size:
+            return 0
+        estimate = float(catalogue_size)
+        for token in self.tokens:
+            frequency = sum(
+                self.tokens_stats.get((token, field), (0, 0))[1]
+                for field in self.fields
+            )
+            estimate *= min(frequency, catalogue_size) / catalogue_size
+        return int(round(estimate))
+
+
+def score_expression(statistics):
+    """
+    Build the aggregate summing the weighted BM25 contribution of each posting.
+    idf and average field lengths are resolved here, so the database computes
+    scores from columns of the matched postings alone.
+    """
+    config = search_settings()
+    k1 = config['BM25_K1']
+    b = config['BM25_B']
+    weights = config['FIELD_WEIGHTS']
+    prefix_weight = config['PREFIX_MATCH_WEIGHT']
+
+    tokens = statistics.tokens
+    fields = statistics.fields
+    fields_stats = statistics.fields_stats
+    tokens_stats = statistics.tokens_stats
+
+    boosts = []
+    for token in tokens:
+        for field in fields:
+            document_count = fields_stats[field].document_count
+            exact_df, prefix_df = tokens_stats.get((token, field), (0, 0))
+            weight = weights.get(field, 1.0)
+            boosts.append(When(
+                field=field,
+                term=token,
+                then=Value(weight * inverse_document_frequency(exact_df, document_count)),
+            ))
+            boosts.append(When(
+                Q(field=field) & prefix_condition(token),
+                then=Value(weight * prefix_weight * inverse_document_frequency(prefix_df, document_count)),
+            ))
+    boost = Case(*boosts, default=Value(0.0), output_field=FloatField())
+
+    length_norm = Case(
+        *[
+            When(field=field, then=Value(k1 * b / fields_stats[field].average_length))
+            for field in fields
+        ],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    term_frequency = F('term_frequency')
+    return Sum(
+        boost * term_frequency * Value(k1 + 1)
+        / (term_frequency + Value(k1 * (1 - b)) + length_norm * F('field_length')),
+        output_field=FloatField(),
+    )
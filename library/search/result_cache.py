@@ -0,0 +1,185 @@
+"""
+Search Result Cache
+Per-worker LRU cache of search result pages. Entries hold only the ordered
+book ids of a page and are keyed on the normalized query plus the catalogue
+version, so any Book change makes every older entry unreachable.
+"""
+import threading
+import time
+from collections import OrderedDict
+from ..catalogue import catalogue_version
+from ..models import Book
+from .conf import fields_for_search_type, search_settings
+from .facets import filter_condition
+from .query import query_tokens
+from .results import SearchResults
+
+
+class ResultCache:
+    """
+    LRU mapping with a per-entry time to live and hit/miss/eviction counters
+    """
+
+    def __init__(self, max_entries=500, timeout=300):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """
+        Return the live entry for key, or None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """
+        Return the counters of this worker's cache
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class CachedPage:
+    """
+    The cacheable part of SearchResults: ranked ids instead of Book objects
+    """
+
+    def __init__(self, ranked, count, count_is_exact, next_cursor, previous_cursor, suggestion):
+        self.ranked = ranked
+        self.count = count
+        self.count_is_exact = count_is_exact
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.suggestion = suggestion
+
+    @classmethod
+    def from_results(cls, results):
+        return cls(
+            [(book.pk, getattr(book, 'score', None)) for book in results.books],
+            results.count,
+            results.count_is_exact,
+            results.next_cursor,
+            results.previous_cursor,
+            results.suggestion,
+        )
+
+    def hydrate(self):
+        """
+        Load the page's books with a single pk__in query, keeping the cached order
+        """
+        books = Book.objects.defer('description').in_bulk([book_id for book_id, score in self.ranked])
+        page = []
+        for book_id, score in self.ranked:
+            book = books.get(book_id)
+            if book is None:
+                continue
+            if score is not None:
+                book.score = score
+            page.append(book)
+        return SearchResults(
+            page, self.count, self.count_is_exact, self.next_cursor, self.previous_cursor, self.suggestion
+        )
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Return this worker's result cache, sized from the settings
+    """
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                config = search_settings()
+                _result_cache = ResultCache(config['RESULT_CACHE_SIZE'], config['RESULT_CACHE_TIMEOUT'])
+    return _result_cache
+
+
+def cache_key(query, search_type='all', cursor=None, filters=None):
+    """
+    Key a page on the normalized query, so 'Tolkien ' and 'tolkien' share an entry
+    """
+    return (
+        catalogue_version(),
+        fields_for_search_type(search_type),
+        tuple(query_tokens(query)),
+        cursor or '',
+        tuple(sorted((filters or {}).items())),
+    )
+
+
+def search_page(backend, query, search_type='all', cursor=None, filters=None, count=True):
+    """
+    Answer a search page from the cache, falling back to the backend on a miss.
+    `filters` are the parsed facet filters.
+    """
+    condition = filter_condition(filters or {})
+    if not search_settings()['RESULT_CACHE_SIZE']:
+        return backend.search_page(query, search_type, cursor=cursor, filters=condition, count=count)
+
+    result_cache = get_result_cache()
+    key = (*cache_key(query, search_type, cursor, filters), count)
+    page = result_cache.get(key)
+    if page is not None:
+        return page.hydrate()
+
+    results = backend.search_page(query, search_type, cursor=cursor, filters=condition, count=count)
+    result_cache.set(key, CachedPage.from_results(results))
+    return results
+
+
+def match_count(backend, query, search_type='all', filters=None):
+    """
+    Return the backend's (count, exact) for a query, cached like its pages
+    """
+    condition = filter_condition(filters or {})
+    if not search_settings()['RESULT_CACHE_SIZE']:
+        return backend.count_matches(query, search_type, condition)
+
+    result_cache = get_result_cache()
+    key = ('count', *cache_key(query, search_type, None, filters))
+    counted = result_cache.get(key)
+    if counted is None:
+        counted = backend.count_matches(query, search_type, condition)
+        result_cache.set(key, counted)
+    return counted
@@ -0,0 +1,34 @@
+"""
+Search Results
+A page of search hits together with its match count
+"""
+
+
+class SearchResults:
+    """
+    One keyset page of books plus the total match count.
+    `count_is_exact` is False when the count was estimated because it crossed
+    the EXACT_COUNT_THRESHOLD setting. `suggestion` holds the corrected query
+    when the books are near matches for a misspelled one.
+    """
+
+    def __init__(self, books, count=0, count_is_exact=True, next_cursor=None, previous_cursor=None,
+                 suggestion=None):
+        self.books = books
+        self.count = count
+        self.count_is_exact = count_is_exact
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.suggestion = suggestion
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
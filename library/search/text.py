@@ -0,0 +1,31 @@
+"""
+Search Text Processing
+Normalization and tokenization shared by the search index and the query side
+"""
+import re
+import unicodedata
+
+# Longest term stored in the index; longer tokens are truncated
+MAX_TERM_LENGTH = 64
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(value):
+    """
+    Case-fold the text and strip accents so that 'Émile' and 'emile' match
+    """
+    if not value:
+        return ''
+    value = str(value).casefold()
+    if value.isascii():
+        return value
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(value):
+    """
+    Split text into normalized index terms
+    """
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall(normalize(value))]
@@ -0,0 +1,152 @@
+"""
+Signal Handlers
+Keeps derived data in sync when library models change
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from . import covers, homepage, leaderboard, ratings
+from .catalogue import bump_catalogue_version, bump_review_version
+from .models import Author, Book, Category, Review
+from .search import autocomplete, get_search_backend
+
+
+@receiver(pre_save, sender=Book)
+def remember_indexed_names(sender, instance, raw=False, **kwargs):
+    """
+    Read the stored title and author of a book saved without them loaded, so
+    the autocomplete index can drop the old entries of a rename
+    """
+    if raw:
+        return
+    instance.load_stored_values('title', 'author')
+
+
+@receiver(post_save, sender=Book)
+def index_saved_book(sender, instance, raw=False, **kwargs):
+    """
+    Refresh the search index entry of a saved book
+    """
+    if raw:
+        return
+    get_search_backend().index_book(instance)
+
+    # Capture the values now; the loaded values are reset once save() returns
+    change = (
+        instance.pk,
+        instance.title,
+        instance.author,
+        instance.get_loaded_value('title'),
+        instance.get_loaded_value('author'),
+    )
+    transaction.on_commit(lambda: autocomplete.book_saved(*change))
+
+
+@receiver(post_save, sender=Book)
+def render_new_cover(sender, instance, raw=False, **kwargs):
+    """
+    Make the resized renditions of a newly uploaded cover once the save is committed
+    """
+    if raw or not instance.cover_changed() or not instance.cover_pic:
+        return
+    book_id = instance.pk
+    transaction.on_commit(lambda: covers.schedule(book_id))
+
+
+@receiver(pre_delete, sender=Book)
+def unindex_deleted_book(sender, instance, **kwargs):
+    """
+    Remove a book from the search index while its postings still exist
+    """
+    get_search_backend().remove_book(instance.pk)
+
+    book_id, title, author = instance.pk, instance.title, instance.author
+    transaction.on_commit(lambda: autocomplete.book_deleted(book_id, title, author))
+
+
+@receiver(post_save, sender=Book)
+def count_filed_book(sender, instance, created, raw=False, **kwargs):
+    """
+    Move the book between the denormalized counts of its author and category
+    """
+    if raw:
+        return
+    for model, attname in ((Author, 'author_ref_id'), (Category, 'category_ref_id')):
+        old_pk = None if created else instance.get_loaded_value(attname)
+        new_pk = getattr(instance, attname)
+        if old_pk != new_pk:
+            model.adjust_book_count(old_pk, -1)
+            model.adjust_book_count(new_pk, 1)
+
+
+@receiver(post_delete, sender=Book)
+def uncount_deleted_book(sender, instance, **kwargs):
+    """
+    Remove a deleted book from the counts of its author and category
+    """
+    Author.adjust_book_count(instance.author_ref_id, -1)
+    Category.adjust_book_count(instance.category_ref_id, -1)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def bump_version_on_book_change(sender, **kwargs):
+    """
+    Invalidate catalogue-derived caches once the Book change is committed
+    """
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def refresh_homepage_on_book_change(sender, **kwargs):
+    """
+    Mark the homepage statistics and recent strip stale once the Book change is committed
+    """
+    transaction.on_commit(homepage.mark_stale)
+
+
+@receiver(post_save, sender=Review)
+def update_ratings_on_review_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Apply a new review or an edited rating to the book's aggregates
+    """
+    if raw:
+        return
+    ratings.review_saved(instance, created)
+
+
+@receiver(post_delete, sender=Review)
+def update_ratings_on_review_delete(sender, instance, **kwargs):
+    """
+    Remove a deleted review from the book's aggregates
+    """
+    ratings.review_deleted(instance)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def rescore_reviewed_book(sender, instance, raw=False, **kwargs):
+    """
+    Re-score the affected books on the leaderboard once the review change is committed
+    """
+    if raw:
+        return
+    book_ids = {instance.book_id, instance.get_loaded_value('book_id', instance.book_id)}
+
+    def rescore():
+        for book_id in book_ids:
+            leaderboard.refresh_book(book_id)
+
+    transaction.on_commit(rescore)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_version_on_review_change(sender, raw=False, **kwargs):
+    """
+    Invalidate review-derived caches once the Review change is committed
+    """
+    if raw:
+        return
+    transaction.on_commit(bump_review_version)
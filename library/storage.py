@@ -0,0 +1,81 @@
+"""
+Media Storage
+Content-addressed file storage for uploaded covers and profile pictures.
+
+A file is stored under its SHA-256 digest, sharded by the first two pairs of
+hex digits, inside the upload_to directory of its field:
+
+    cover_pics/3f/a9/3fa9...e1.jpg
+
+Uploading the same bytes again reuses the stored file, no directory holds more
+than a few thousand entries, and since a name never changes content its URL
+can be cached forever. Files are never deleted on upload or replacement, as
+other rows may share them; gc_media removes the ones nothing references.
+"""
+import hashlib
+import os
+import re
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Sent with files served from a content-addressed name
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+HASHED_NAME = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]+)?$')
+
+
+def is_content_addressed(name):
+    """
+    Whether a stored name was derived from the file content
+    """
+    return bool(HASHED_NAME.search(name or ''))
+
+
+def file_digest(content):
+    """
+    Return the SHA-256 hex digest of a File, leaving it rewound
+    """
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(name, digest):
+    """
+    Return the content-addressed name of a file uploaded as `name`
+    """
+    directory, filename = os.path.split(name)
+    extension = os.path.splitext(filename)[1].lower()
+    return os.path.join(directory, digest[:2], digest[2:4], f'{digest}{extension}').replace(os.sep, '/')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files by content and stores identical bytes once
+    """
+
+    def _save(self, name, content):
+        name = hashed_name(name, file_digest(content))
+        if self.exists(name):
+            return name
+        # Two concurrent uploads of the same new file: the loser is stored under
+        # a suffixed name, which is wasteful but still correct
+        return super()._save(name, content)
+
+
+_media_storage = None
+
+
+def content_addressed_storage():
+    """
+    Storage of the uploaded image fields, as a callable so migrations stay independent of settings
+    """
+    global _media_storage
+    if _media_storage is None:
+        _media_storage = ContentAddressedStorage()
+    return _media_storage
@@ -0,0 +1,38 @@
+"""
+Cover Template Tags
+Responsive <picture> markup for book covers
+
+    {% load covers %}
+    {% cover_image book 'card' class='card-img-top book-cover' %}
+"""
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from .. import covers
+
+register = template.Library()
+
+
+@register.simple_tag
+def cover_image(book, layout='card', **attrs):
+    """
+    Render a book's cover as WebP and JPEG renditions with srcset and sizes,
+    lazily loaded unless loading= is given. Falls back to the original upload
+    while the renditions are still being made.
+    """
+    attrs = {'alt': book.title, 'loading': 'lazy', 'decoding': 'async', **attrs}
+    if not book.cover_digest:
+        return format_html('<img src="{}"{}>', book.cover_pic.url, flatatt(attrs))
+
+    width, sizes = covers.LAYOUTS[layout]
+    return format_html(
+        '<picture><source type="{}" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        covers.MIME_TYPES['webp'],
+        covers.srcset(book, 'webp'),
+        sizes,
+        covers.rendition_url(book, width, 'jpg'),
+        covers.srcset(book, 'jpg'),
+        sizes,
+        flatatt(attrs),
+    )
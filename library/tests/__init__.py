@@ -0,0 +1,22 @@
+"""
+Tests for the library app
+Run with: python manage.py test library
+"""
+import datetime
+from library.models import Book
+
+
+def make_book(number, **fields):
+    """
+    Create a book with a unique ISBN and the required fields filled in
+    """
+    values = {
+        'title': f'Book {number:03d}',
+        'author': f'Author {number % 3}',
+        'isbn': f'{9780000000000 + number}',
+        'description': 'A book used by the tests',
+        'category': 'Testing',
+        'published_date': datetime.date(2000, 1, 1),
+        **fields,
+    }
+    return Book.objects.create(**values)
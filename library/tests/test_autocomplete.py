@@ -0,0 +1,55 @@
+"""
+The in-memory prefix index follows renames, however the saved book was loaded
+"""
+from django.test import TestCase
+from library.models import Book
+from library.search import autocomplete
+from . import make_book
+
+
+class PrefixIndexTests(TestCase):
+    def setUp(self):
+        autocomplete.reset_prefix_index()
+        self.addCleanup(autocomplete.reset_prefix_index)
+        self.book = make_book(1, title='Moby Dick', author='Herman Melville')
+        self.index = autocomplete.get_prefix_index()
+
+    def labels(self, prefix):
+        return [suggestion['label'] for suggestion in self.index.suggest(prefix)]
+
+    def rename(self, book, title):
+        book.title = title
+        with self.captureOnCommitCallbacks(execute=True):
+            book.save()
+
+    def test_prefixes_find_titles_and_authors(self):
+        self.assertEqual(self.labels('mob'), ['Moby Dick'])
+        self.assertEqual(self.labels('moby d'), ['Moby Dick'])
+        self.assertEqual(self.labels('dick'), [])
+        self.assertIn('Herman Melville', self.labels('herman mel'))
+        self.assertIn('Herman Melville', self.labels('melv'))
+
+    def test_rename_of_a_fully_loaded_book(self):
+        self.rename(Book.objects.get(pk=self.book.pk), 'The Whale')
+        self.assertEqual(self.labels('mob'), [])
+        self.assertEqual(self.labels('whale'), ['The Whale'])
+
+    def test_rename_of_a_book_loaded_without_its_title(self):
+        self.rename(Book.objects.only('pk', 'isbn').get(pk=self.book.pk), 'The Whale')
+        self.assertEqual(self.labels('mob'), [])
+        self.assertEqual(self.labels('whale'), ['The Whale'])
+
+    def test_rename_of_a_book_built_in_memory(self):
+        stored = Book.objects.get(pk=self.book.pk)
+        unloaded = Book(**{field.attname: getattr(stored, field.attname) for field in Book._meta.concrete_fields})
+        self.rename(unloaded, 'The Whale')
+        self.assertEqual(self.labels('mob'), [])
+        self.assertEqual(self.labels('whale'), ['The Whale'])
+
+    def test_new_and_deleted_books(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other = make_book(2, title='Mobile Homes', author='Ann Lee')
+        self.assertEqual(self.labels('mob'), ['Mobile Homes', 'Moby Dick'])
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self.labels('mob'), ['Moby Dick'])
@@ -0,0 +1,46 @@
+"""
+Conditional GET on book_detail: validators follow the book and its newest review
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from library.conditional import book_page_state
+from library.models import Review
+from . import make_book
+
+
+class BookValidatorTests(TestCase):
+    def setUp(self):
+        self.book = make_book(1)
+        self.url = reverse('book_detail', args=[self.book.pk])
+        self.reader = User.objects.create_user('reader', password='secret')
+
+    def state(self):
+        return book_page_state(RequestFactory().get(self.url), self.book.pk)
+
+    def test_repeat_request_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_review_text_edit_changes_the_etag(self):
+        review = Review.objects.create(book=self.book, user=self.reader, rating=4, review_text='Good')
+        etag = self.client.get(self.url)['ETag']
+        review.review_text = 'Better on a second read'
+        review.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_state_follows_the_newest_review(self):
+        self.assertIsNone(self.state()[1])
+        review = Review.objects.create(book=self.book, user=self.reader, rating=4)
+        self.assertEqual(self.state()[1], review.updated_at)
+        review.delete()
+        self.assertIsNone(self.state()[1])
+        self.assertIsNone(book_page_state(RequestFactory().get('/'), self.book.pk + 100))
+
+    def test_state_is_one_query_without_grouping(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.state()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('GROUP BY', queries[0]['sql'].upper())
@@ -0,0 +1,108 @@
+"""
+Facet counts from the grouped result rows, checked against a recount of the books
+"""
+import datetime
+from collections import Counter
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from library.models import Book
+from library.search import get_search_backend
+from library.search.facets import FacetCounts, cached_grouped_rows, filter_condition, grouped_rows, parse_filters
+from . import make_book
+
+
+def facet_values(book):
+    return {
+        'category': book.category,
+        'initial': book.author[:1].upper(),
+        'decade': book.published_date.year // 10 * 10,
+        'availability': 'available' if book.available_copies > 0 else 'checked_out',
+    }
+
+
+class FacetCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = get_search_backend()
+        fixture = [
+            ('Jazz Age', 'Fitzgerald', 'Fiction', 1925, 2),
+            ('Jazz Piano', 'Evans', 'Music', 1962, 0),
+            ('Jazz Standards', 'Ella Fitz', 'Music', 1968, 1),
+            ('Cool Jazz', 'Davis', 'Music', 1999, 3),
+            ('Jazzy Tales', 'Fitz', 'Fiction', 2001, 0),
+            ('Blue Notes', 'Evans', 'Music', 1964, 1),
+        ]
+        for number, (title, author, category, year, copies) in enumerate(fixture):
+            make_book(number, title=title, author=author, category=category,
+                      published_date=datetime.date(year, 5, 1), available_copies=copies)
+
+    def expected(self, query, filters):
+        """
+        Recount in Python: each facet under every filter but its own
+        """
+        matches = list(Book.objects.filter(pk__in=self.backend.matching_book_ids(query)))
+        counts = {}
+        for name in ('category', 'initial', 'decade', 'availability'):
+            others = {key: value for key, value in filters.items() if key != name}
+            counts[name] = dict(Counter(
+                facet_values(book)[name] for book in matches
+                if all(facet_values(book)[key] == value for key, value in others.items())
+            ))
+        total = sum(
+            1 for book in matches
+            if all(facet_values(book)[key] == value for key, value in filters.items())
+        )
+        return counts, total
+
+    def facet_counts(self, query, filters):
+        rows, complete = cached_grouped_rows(self.backend, query, 'all')
+        return FacetCounts(rows, filters, complete)
+
+    def test_counts_match_a_recount(self):
+        for filters in ({}, {'category': 'Music'}, {'category': 'Music', 'decade': 1960},
+                        {'initial': 'F', 'availability': 'checked_out'}):
+            with self.subTest(filters=filters):
+                counts = self.facet_counts('jazz', filters)
+                expected_counts, expected_total = self.expected('jazz', filters)
+                self.assertEqual(counts.counts, expected_counts)
+                self.assertEqual(counts.total, expected_total)
+                self.assertTrue(counts.complete)
+
+    def test_token_ending_in_z_counts_its_matches(self):
+        counts = self.facet_counts('fitz', {})
+        self.assertEqual(counts.total, 3)
+        self.assertEqual(counts.counts['category'], {'Fiction': 2, 'Music': 1})
+
+    def test_total_agrees_with_the_filtered_search(self):
+        filters = {'category': 'Music', 'availability': 'available'}
+        counts = self.facet_counts('jazz', filters)
+        count, exact = self.backend.count_matches('jazz', filters=filter_condition(filters))
+        self.assertEqual((counts.total, True), (count, exact))
+
+    def test_grouping_stops_at_the_limit(self):
+        rows, complete = grouped_rows(self.backend.matching_book_ids('jazz'), limit=3)
+        self.assertFalse(complete)
+        self.assertEqual(sum(row[-1] for row in rows), 3)
+        rows, complete = grouped_rows(self.backend.matching_book_ids('jazz'), limit=5)
+        self.assertTrue(complete)
+        self.assertEqual(sum(row[-1] for row in rows), 5)
+
+    def test_invalid_filters_are_dropped(self):
+        self.assertEqual(
+            parse_filters({'category': ' Music ', 'initial': 'fi', 'decade': '1965', 'availability': 'maybe'}),
+            {'category': 'Music'},
+        )
+        self.assertEqual(parse_filters({'initial': 'f', 'decade': '1960'}), {'initial': 'F', 'decade': 1960})
+
+    def test_search_page_shows_the_facet_total(self):
+        response = self.client.get(reverse('book_search'), {'q': 'jazz', 'category': 'Music'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['results'].count, 3)
+        self.assertFalse(response.context['facets_partial'])
+
+    @override_settings(LIBRARY_SEARCH={'EXACT_COUNT_THRESHOLD': 2})
+    def test_partial_facets_fall_back_to_the_match_count(self):
+        response = self.client.get(reverse('book_search'), {'q': 'jazz'})
+        self.assertTrue(response.context['facets_partial'])
+        self.assertGreater(response.context['results'].count, 2)
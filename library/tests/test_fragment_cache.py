@@ -0,0 +1,51 @@
+"""
+book_detail fragments are reused until the book or its reviews change
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from library.models import Review
+from . import make_book
+
+
+class BookDetailFragmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book = make_book(1)
+        self.url = reverse('book_detail', args=[self.book.pk])
+        self.author = User.objects.create_user('author', password='secret')
+        self.review = Review.objects.create(book=self.book, user=self.author, rating=4, review_text='First take')
+        # Signed-in readers skip the page cache, so only the fragments are shared
+        self.reader = User.objects.create_user('reader', password='secret')
+        self.client.force_login(self.reader)
+
+    def review_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries if 'FROM "library_review"' in query['sql']]
+
+    def test_cached_review_list_is_not_queried_again(self):
+        self.review_queries()
+        response, queries = self.review_queries()
+        self.assertContains(response, 'First take')
+        # Only the validator subquery and the reader's own review lookup remain
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all('GROUP BY' not in sql for sql in queries))
+
+    def test_review_edit_renders_the_list_again(self):
+        self.review_queries()
+        self.review.review_text = 'Second take'
+        self.review.save()
+        response, queries = self.review_queries()
+        self.assertContains(response, 'Second take')
+        self.assertNotContains(response, 'First take')
+
+    def test_pinned_review_is_left_out_of_the_readers_list(self):
+        self.client.force_login(self.author)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['pinned_review'], self.review.pk)
+        self.assertNotIn(self.review, list(response.context['reviews']))
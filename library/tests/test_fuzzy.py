@@ -0,0 +1,80 @@
+"""
+Typo tolerance: near matches from the trigram index of the title and author vocabulary
+"""
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from library.models import SearchTrigram
+from library.search import get_search_backend
+from library.search.fuzzy import similar_terms, similarity, trigrams
+from . import make_book
+
+
+class SimilarTermTests(TestCase):
+    def setUp(self):
+        self.tolstoy = make_book(1, title='War and Peace', author='Leo Tolstoy')
+        self.tolkien = make_book(2, title='The Hobbit', author='J. R. R. Tolkien')
+
+    def test_vocabulary_is_trigram_indexed(self):
+        self.assertEqual(set(SearchTrigram.objects.filter(term='tolstoy').values_list('gram', flat=True)),
+                         trigrams('tolstoy'))
+        # Descriptions are not fuzzy searchable
+        self.assertFalse(SearchTrigram.objects.filter(term='book').exists())
+
+    def test_misspelling_finds_the_term(self):
+        self.assertEqual(similar_terms('tolstoi')[0][0], 'tolstoy')
+        self.assertEqual(similar_terms('hobit')[0][0], 'hobbit')
+
+    def test_candidates_below_the_cutoff_are_dropped(self):
+        score = similarity(trigrams('tolstoi'), trigrams('tolkien'))
+        self.assertGreater(score, 0)
+        self.assertNotIn('tolkien', [term for term, _ in similar_terms('tolstoi')])
+        self.assertIn('tolkien', [term for term, _ in similar_terms('tolstoi', cutoff=score)])
+
+    def test_shared_trigram_bound_is_applied_in_the_database(self):
+        # 'tolstoi' has 8 trigrams, so a 0.4 match must share at least 4 of them
+        with CaptureQueriesContext(connection) as queries:
+            similar_terms('tolstoi', cutoff=0.4)
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertIn('HAVING', sql)
+        self.assertRegex(sql, r'>= 4\b')
+        # 'tolkien' shares 3 trigrams and is never fetched
+        self.assertNotIn('tolkien', [term for term, _ in similar_terms('tolstoi', cutoff=0.4, limit=100)])
+
+    def test_unrelated_tokens_have_no_candidates(self):
+        self.assertEqual(similar_terms('zzzz', cutoff=0.1), [])
+
+    def test_candidate_limit(self):
+        self.assertEqual(len(similar_terms('tolstoi', cutoff=0.01, limit=1)), 1)
+
+    def test_removed_terms_lose_their_trigrams(self):
+        self.tolstoy.author = 'Lev Nikolayevich'
+        self.tolstoy.save()
+        self.assertFalse(SearchTrigram.objects.filter(term='tolstoy').exists())
+
+
+class SuggestionTests(TestCase):
+    def setUp(self):
+        self.book = make_book(1, title='War and Peace', author='Leo Tolstoy')
+        self.backend = get_search_backend()
+
+    def test_misspelled_query_suggests_the_correction(self):
+        results = self.backend.search_page('tolstoi')
+        self.assertEqual(results.suggestion, 'tolstoy')
+        self.assertEqual([book.pk for book in results.books], [self.book.pk])
+
+    def test_known_tokens_get_no_suggestion(self):
+        results = self.backend.search_page('tolstoy')
+        self.assertIsNone(results.suggestion)
+
+    def test_fields_without_trigrams_are_not_corrected(self):
+        results = self.backend.search_page('tolstoi', 'genre')
+        self.assertIsNone(results.suggestion)
+        self.assertEqual(results.books, [])
+
+    @override_settings(LIBRARY_SEARCH={'FUZZY_SIMILARITY': 0.9})
+    def test_strict_cutoff_suggests_nothing(self):
+        results = self.backend.search_page('tolstoi')
+        self.assertIsNone(results.suggestion)
+        self.assertEqual(results.books, [])
@@ -0,0 +1,130 @@
+"""
+import_books: upsert by ISBN, resume after an interrupted run and the error report
+"""
+import csv
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from library.models import Book
+from library.management.commands import import_books
+from . import make_book
+
+HEADER = ['isbn', 'title', 'author', 'description', 'category', 'published_date', 'available_copies']
+
+
+def isbn(number):
+    return f'{9781000000000 + number}'
+
+
+def row(number, **fields):
+    values = {
+        'isbn': isbn(number),
+        'title': f'Imported {number}',
+        'author': 'Ann Import',
+        'description': 'Imported for the tests',
+        'category': 'Testing',
+        'published_date': '2001-02-03',
+        'available_copies': '2',
+        **fields,
+    }
+    return [values[column] for column in HEADER]
+
+
+class ImportBooksTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='import_test_')
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'books.csv')
+        self.errors_path = f'{self.path}.errors.csv'
+
+    def write(self, rows, header=HEADER):
+        with open(self.path, 'w', newline='', encoding='utf-8') as target:
+            writer = csv.writer(target)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def run_import(self, **options):
+        call_command('import_books', self.path, stdout=io.StringIO(), **options)
+
+    def error_report(self):
+        with open(self.errors_path, newline='', encoding='utf-8') as source:
+            return list(csv.reader(source))
+
+    def test_existing_isbn_is_updated_and_new_isbn_inserted(self):
+        existing = make_book(1, isbn=isbn(1), title='Old title')
+        self.write([row(1, title='New title'), row(2)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_import()
+        existing.refresh_from_db()
+        self.assertEqual(existing.title, 'New title')
+        self.assertEqual(existing.available_copies, 2)
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(Book.objects.get(isbn=isbn(2)).author_ref.name, 'Ann Import')
+
+    def test_importing_the_same_file_again_changes_nothing(self):
+        self.write([row(1), row(2)])
+        self.run_import()
+        stamps = dict(Book.objects.values_list('isbn', 'updated_at'))
+        self.run_import()
+        self.assertEqual(dict(Book.objects.values_list('isbn', 'updated_at')), stamps)
+
+    def test_later_record_of_an_isbn_wins(self):
+        self.write([row(1, title='First'), row(1, title='Second')])
+        self.run_import()
+        self.assertEqual(list(Book.objects.values_list('title', flat=True)), ['Second'])
+
+    def test_resume_continues_after_the_last_committed_chunk(self):
+        self.write([row(number) for number in range(1, 6)])
+        real_upsert = import_books.upsert_chunk
+        chunks = []
+
+        def upsert(rows, fail=False):
+            chunks.append([values['isbn'] for values in rows])
+            if fail:
+                raise RuntimeError('Worker killed')
+            return real_upsert(rows)
+
+        def fail_on_second_chunk(rows):
+            return upsert(rows, fail=len(chunks) == 1)
+
+        with mock.patch.object(import_books, 'upsert_chunk', fail_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.run_import(chunk_size=2)
+        # The first chunk was committed, the second rolled back
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertTrue(os.path.exists(f'{self.path}.checkpoint'))
+
+        chunks.clear()
+        with mock.patch.object(import_books, 'upsert_chunk', upsert):
+            self.run_import(chunk_size=2, resume=True)
+        self.assertEqual(chunks, [[isbn(3), isbn(4)], [isbn(5)]])
+        self.assertEqual(Book.objects.count(), 5)
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+
+    def test_rejected_rows_are_reported(self):
+        self.write([
+            row(1),
+            row(2, isbn='not-an-isbn-at-all'),
+            row(3, title=''),
+            row(4) + ['surplus'],
+            row(5),
+        ])
+        self.run_import(chunk_size=2)
+        self.assertEqual(Book.objects.count(), 2)
+        report = self.error_report()
+        self.assertEqual(report[0], ['record', 'isbn', 'field', 'error'])
+        reported = {(record, isbn, field) for record, isbn, field, error in report[1:]}
+        self.assertIn(('2', 'not-an-isbn-at-all', 'isbn'), reported)
+        self.assertIn(('3', isbn(3), 'title'), reported)
+        self.assertIn(('4', isbn(4), ''), reported)
+        self.assertEqual({record for record, isbn, field in reported}, {'2', '3', '4'})
+        self.assertIn('more values than the header', report[-1][3])
+
+    def test_unknown_columns_are_ignored(self):
+        self.write([row(1) + ['4.5']], header=HEADER + ['average_rating'])
+        self.run_import()
+        self.assertEqual(Book.objects.get().average_rating, 0)
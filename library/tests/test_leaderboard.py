@@ -0,0 +1,94 @@
+"""
+Bayesian leaderboard: ranking, incremental re-scoring and windows that reviews age out of
+"""
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from library import leaderboard
+from library.models import LeaderboardEntry, LeaderboardWindow, Review
+from . import make_book
+
+
+@override_settings(LIBRARY_LEADERBOARD={'BACKGROUND': False})
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create(username=f'reader{number}') for number in range(6)]
+        self.one_review = make_book(1, title='One review')
+        self.many_reviews = make_book(2, title='Many reviews')
+        self.poor = make_book(3, title='Poorly rated')
+        Review.objects.create(book=self.one_review, user=self.users[0], rating=5)
+        for user, rating in zip(self.users, (5, 5, 5, 5, 4, 5)):
+            Review.objects.create(book=self.many_reviews, user=user, rating=rating)
+        for user in self.users[:3]:
+            Review.objects.create(book=self.poor, user=user, rating=2)
+
+    def ranked(self, window='all'):
+        entries, refreshed_at = leaderboard.top_entries(window)
+        return [entry.book_id for entry in entries]
+
+    def test_many_good_reviews_outrank_a_single_perfect_one(self):
+        # Prior mean 4.0 over 3.3 votes: 4.54 for 4.83 from six reviews, 4.23 for one 5
+        self.assertEqual(self.ranked(), [self.many_reviews.pk, self.one_review.pk, self.poor.pk])
+
+    def test_first_read_builds_the_window(self):
+        self.assertFalse(LeaderboardWindow.objects.exists())
+        entries, refreshed_at = leaderboard.top_entries('all')
+        self.assertEqual(len(entries), 3)
+        self.assertIsNotNone(refreshed_at)
+
+    def test_review_changes_rescore_their_book(self):
+        leaderboard.refresh_window('all')
+        newcomer = make_book(4, title='Newcomer')
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(book=newcomer, user=self.users[1], rating=3)
+        self.assertEqual(LeaderboardEntry.objects.get(window='all', book=newcomer).review_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            review.rating = 4
+            review.save()
+        self.assertEqual(LeaderboardEntry.objects.get(window='all', book=newcomer).average_rating, 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            review.delete()
+        self.assertFalse(LeaderboardEntry.objects.filter(window='all', book=newcomer).exists())
+
+    def test_rescoring_a_ranked_book_updates_its_row(self):
+        leaderboard.refresh_window('all')
+        leaderboard.refresh_book(self.one_review.pk)
+        leaderboard.refresh_book(self.one_review.pk)
+        self.assertEqual(LeaderboardEntry.objects.filter(window='all', book=self.one_review).count(), 1)
+
+    def test_stale_dated_window_drops_aged_out_reviews_on_read(self):
+        leaderboard.refresh_window('30d')
+        self.assertIn(self.one_review.pk, self.ranked('30d'))
+        Review.objects.filter(book=self.one_review).update(created_at=timezone.now() - timedelta(days=31))
+        # Within MAX_AGE the entries of the last refresh are shown as they are
+        self.assertIn(self.one_review.pk, self.ranked('30d'))
+
+        LeaderboardWindow.objects.filter(window='30d').update(
+            refreshed_at=timezone.now() - timedelta(seconds=leaderboard.DEFAULTS['MAX_AGE'] + 1)
+        )
+        self.assertEqual(self.ranked('30d'), [self.many_reviews.pk, self.poor.pk])
+
+    def test_all_time_window_is_never_stale(self):
+        long_ago = timezone.now() - timedelta(days=365)
+        self.assertFalse(leaderboard.is_stale('all', long_ago))
+        self.assertTrue(leaderboard.is_stale('30d', long_ago))
+        self.assertTrue(leaderboard.is_stale('all', None))
+
+
+class BackgroundRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_stale_window_is_rebuilt_once_off_the_request(self):
+        with mock.patch.object(leaderboard.threading, 'Thread') as thread:
+            entries, refreshed_at = leaderboard.top_entries('all')
+            leaderboard.top_entries('all')
+        self.assertEqual((entries, refreshed_at), ([], None))
+        self.assertEqual(thread.call_count, 1)
+        self.assertEqual(thread.call_args.kwargs['args'][0], 'all')
+        thread.return_value.start.assert_called_once_with()
+        self.assertFalse(LeaderboardWindow.objects.exists())
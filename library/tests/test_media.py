@@ -0,0 +1,71 @@
+"""
+serve_media answers conditional and range requests
+"""
+import os
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+
+CONTENT = b'0123456789' * 10
+
+
+class ServeMediaTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp(prefix='media_test_')
+        self.addCleanup(shutil.rmtree, self.media_root)
+        os.makedirs(os.path.join(self.media_root, 'files'))
+        with open(os.path.join(self.media_root, 'files', 'sample.bin'), 'wb') as file:
+            file.write(CONTENT)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_SERVE_MODE='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.url = '/media/files/sample.bin'
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changed_etag_sends_the_file(self):
+        response = self.get(HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_single_range(self):
+        response = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(CONTENT)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[10:20])
+
+    def test_suffix_range(self):
+        response = self.get(HTTP_RANGE='bytes=-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_if_range_with_an_old_etag_sends_the_whole_file(self):
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    def test_missing_files_and_paths_outside_media_root(self):
+        self.assertEqual(self.client.get('/media/files/missing.bin').status_code, 404)
+        self.assertEqual(self.client.get('/media/files/%2e%2e/%2e%2e/settings.py').status_code, 400)
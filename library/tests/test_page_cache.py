@@ -0,0 +1,67 @@
+"""
+Whole-page caching serves anonymous visitors only
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from library import page_cache
+from library.pagination import encode_cursor
+from . import make_book
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book = make_book(1)
+        self.url = reverse('book_list')
+
+    def test_anonymous_requests_are_cached(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(page_cache.stats()['misses'], 1)
+        self.assertEqual(page_cache.stats()['hits'], 1)
+
+    def test_unread_parameters_share_the_cached_page(self):
+        self.client.get(self.url)
+        self.client.get(self.url + '?utm_source=mail')
+        self.assertEqual(page_cache.stats()['hits'], 1)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.get(self.url)
+        self.client.force_login(User.objects.create_user('reader', password='secret'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Logout')
+        stats = page_cache.stats()
+        self.assertEqual(stats['bypasses'], 1)
+        self.assertEqual(stats['hits'], 0)
+
+    def test_authenticated_pages_are_not_stored(self):
+        self.client.force_login(User.objects.create_user('reader', password='secret'))
+        self.client.get(self.url)
+        self.client.logout()
+        self.client.get(self.url)
+        self.assertEqual(page_cache.stats()['hits'], 0)
+        self.assertEqual(page_cache.stats()['misses'], 1)
+
+    def test_forged_cursors_bypass_the_cache(self):
+        self.client.get(self.url + '?cursor=forged')
+        self.client.get(self.url + '?cursor=forged')
+        self.assertEqual(page_cache.stats()['bypasses'], 2)
+        self.assertEqual(page_cache.stats()['hits'], 0)
+
+    def test_issued_cursors_are_cached(self):
+        cursor = encode_cursor([self.book.title, self.book.pk], 'next')
+        self.client.get(self.url, {'cursor': cursor})
+        self.client.get(self.url, {'cursor': cursor})
+        self.assertEqual(page_cache.stats()['hits'], 1)
+
+    def test_a_catalogue_change_misses_the_cached_page(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_book(2)
+        self.client.get(self.url)
+        self.assertEqual(page_cache.stats()['misses'], 2)
@@ -0,0 +1,96 @@
+"""
+Keyset cursors round-trip, and cursors this site did not issue fall back to the first page
+"""
+import base64
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from library.models import Book, Review
+from library.pagination import InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor, is_valid_cursor
+from . import make_book
+
+
+def forged_cursor(values, direction='next'):
+    payload = json.dumps({'v': values, 'd': direction}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=') + '.forged'
+
+
+class CursorRoundTripTests(TestCase):
+    def setUp(self):
+        for number in range(7):
+            make_book(number)
+        self.paginator = KeysetPaginator(Book.objects.all(), ('title', 'id'), 3)
+
+    def test_next_and_previous_pages_cover_every_row_once(self):
+        seen = []
+        page = self.paginator.get_page()
+        pages = [page]
+        while page.has_next:
+            page = self.paginator.get_page(page.next_cursor)
+            pages.append(page)
+        for page in pages:
+            seen.extend(book.pk for book in page)
+        self.assertEqual(seen, list(Book.objects.order_by('title', 'id').values_list('pk', flat=True)))
+
+        previous = self.paginator.get_page(pages[-1].previous_cursor)
+        self.assertEqual([book.pk for book in previous], [book.pk for book in pages[-2]])
+
+    def test_cursor_decodes_to_what_was_encoded(self):
+        cursor = encode_cursor(['Book 003', 4], 'prev')
+        self.assertEqual(decode_cursor(cursor), (['Book 003', 4], 'prev'))
+        self.assertTrue(is_valid_cursor(cursor))
+
+    def test_invalid_cursors_give_the_first_page(self):
+        first = [book.pk for book in self.paginator.get_page()]
+        cursors = [
+            'garbage',
+            '!!!.???',
+            forged_cursor(['Book 003', 4]),
+            encode_cursor(['Book 003', 'not a number'], 'next'),
+            encode_cursor(['Book 003'], 'next'),
+            encode_cursor([{'title': 'Book 003'}, 4], 'next'),
+            encode_cursor([['Book 003'], 4], 'next'),
+            encode_cursor([None, 4], 'next'),
+            encode_cursor(['Book 003', 4], 'sideways'),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                self.assertEqual([book.pk for book in self.paginator.get_page(cursor)], first)
+
+    def test_unsigned_and_malformed_cursors_do_not_decode(self):
+        for cursor in ('garbage', forged_cursor(['Book 003', 4]), encode_cursor([1], 'up')):
+            with self.subTest(cursor=cursor):
+                self.assertFalse(is_valid_cursor(cursor))
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor)
+
+
+class InvalidCursorViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book = make_book(1)
+        user = User.objects.create_user('reader', password='secret')
+        Review.objects.create(book=self.book, user=user, rating=4)
+
+    def test_views_answer_invalid_cursors_with_the_first_page(self):
+        urls = [
+            reverse('book_list'),
+            reverse('book_list_fragment'),
+            reverse('book_search') + '?q=Book',
+            reverse('book_detail', args=[self.book.pk]),
+            reverse('review_list_fragment', args=[self.book.pk]),
+        ]
+        cursors = [
+            'garbage',
+            forged_cursor(['Book 001', 1]),
+            encode_cursor(['x', 'notint'], 'next'),
+            encode_cursor([{'a': 1}, [2]], 'next'),
+        ]
+        for url in urls:
+            for cursor in cursors:
+                with self.subTest(url=url, cursor=cursor):
+                    separator = '&' if '?' in url else '?'
+                    response = self.client.get(f'{url}{separator}cursor={cursor}')
+                    self.assertEqual(response.status_code, 200)
@@ -0,0 +1,72 @@
+"""
+BM25 ranking with field weights, and the bounded match count
+"""
+from django.test import TestCase, override_settings
+from library.search import get_search_backend
+from library.search.conf import DEFAULTS
+from library.search.ranking import inverse_document_frequency
+from . import make_book
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        self.backend = get_search_backend()
+
+    def ranked(self, query):
+        return [book.pk for book in self.backend.search_page(query).books]
+
+    def test_title_match_outranks_description_match(self):
+        in_description = make_book(1, title='Tales of the North', description='A dragon sleeps under the hill')
+        in_title = make_book(2, title='The Dragon', description='A story of the north')
+        self.assertEqual(self.ranked('dragon'), [in_title.pk, in_description.pk])
+
+    def test_field_weights_decide_between_fields(self):
+        in_description = make_book(1, title='Tales of the North', description='A dragon sleeps under the hill')
+        in_title = make_book(2, title='The Dragon', description='A story of the north')
+        weights = {**DEFAULTS['FIELD_WEIGHTS'], 'title': 1.0, 'description': 10.0}
+        with override_settings(LIBRARY_SEARCH={'FIELD_WEIGHTS': weights}):
+            self.assertEqual(self.ranked('dragon'), [in_description.pk, in_title.pk])
+
+    def test_rarer_term_outranks_common_term(self):
+        for number in range(5):
+            make_book(10 + number, title=f'Castle {number}')
+        rare_in_title = make_book(1, title='Wizard', description='Lives in a castle')
+        common_in_title = make_book(2, title='Castle', description='Home of a wizard')
+        self.assertEqual(self.ranked('wizard castle'), [rare_in_title.pk, common_in_title.pk])
+
+    def test_whole_term_outranks_prefix_match(self):
+        prefix = make_book(1, title='Dragonfly')
+        whole = make_book(2, title='Dragon')
+        self.assertEqual(self.ranked('dragon'), [whole.pk, prefix.pk])
+
+    def test_inverse_document_frequency_falls_with_frequency(self):
+        self.assertGreater(inverse_document_frequency(1, 100), inverse_document_frequency(50, 100))
+        self.assertGreaterEqual(inverse_document_frequency(100, 100), 0)
+        self.assertEqual(inverse_document_frequency(150, 100), inverse_document_frequency(100, 100))
+
+
+class BoundedCountTests(TestCase):
+    def setUp(self):
+        self.backend = get_search_backend()
+        for number in range(6):
+            make_book(number, title=f'Castle {number}')
+        make_book(10, title='Wizard')
+
+    def test_count_is_exact_up_to_the_threshold(self):
+        with override_settings(LIBRARY_SEARCH={'EXACT_COUNT_THRESHOLD': 6}):
+            self.assertEqual(self.backend.count_matches('castle'), (6, True))
+            results = self.backend.search_page('castle')
+            self.assertEqual((results.count, results.count_is_exact), (6, True))
+
+    def test_count_above_the_threshold_is_an_estimate(self):
+        with override_settings(LIBRARY_SEARCH={'EXACT_COUNT_THRESHOLD': 3}):
+            count, exact = self.backend.count_matches('castle')
+            self.assertFalse(exact)
+            self.assertGreater(count, 3)
+            self.assertEqual(self.backend.count_matches('wizard'), (1, True))
+
+    def test_page_without_count(self):
+        results = self.backend.search_page('castle', count=False)
+        self.assertEqual(len(results.books), 6)
+        self.assertIsNone(results.count)
+        self.assertFalse(results.count_is_exact)
@@ -0,0 +1,73 @@
+"""
+The denormalized rating aggregates must match the reviews after every change
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from library.models import Book, Review
+from library.models.book import RATING_AGGREGATE_FIELDS
+from library.ratings import EMPTY_AGGREGATES, actual_aggregates
+from . import make_book
+
+
+class RatingDriftTests(TestCase):
+    def setUp(self):
+        self.book = make_book(1)
+        self.other_book = make_book(2)
+        self.users = [User.objects.create_user(f'reader{number}', password='secret') for number in range(3)]
+
+    def assertNoDrift(self, *books):
+        expected = actual_aggregates([book.pk for book in books])
+        for book in books:
+            book.refresh_from_db()
+            stored = {field: getattr(book, field) for field in RATING_AGGREGATE_FIELDS}
+            wanted = expected.get(book.pk, EMPTY_AGGREGATES)
+            for field in RATING_AGGREGATE_FIELDS:
+                self.assertAlmostEqual(stored[field], wanted[field], msg=f'{book} {field}')
+
+    def test_create_edit_and_delete_through_the_orm(self):
+        reviews = [
+            Review.objects.create(book=self.book, user=user, rating=rating)
+            for user, rating in zip(self.users, (5, 3, 4))
+        ]
+        self.assertNoDrift(self.book)
+        self.assertEqual(self.book.review_count, 3)
+        self.assertAlmostEqual(self.book.average_rating, 4.0)
+
+        reviews[0].rating = 1
+        reviews[0].save()
+        self.assertNoDrift(self.book)
+        self.assertEqual(self.book.rating_5_count, 0)
+        self.assertEqual(self.book.rating_1_count, 1)
+
+        reviews[1].book = self.other_book
+        reviews[1].save()
+        self.assertNoDrift(self.book, self.other_book)
+
+        reviews[2].delete()
+        reviews[0].delete()
+        self.assertNoDrift(self.book, self.other_book)
+        self.assertEqual(self.book.review_count, 0)
+        self.assertEqual(self.book.average_rating, 0)
+
+    def test_create_edit_and_delete_through_the_views(self):
+        self.client.force_login(self.users[0])
+        self.client.post(reverse('add_review', args=[self.book.pk]), {'rating': 2, 'review_text': 'Meh'})
+        review = Review.objects.get(book=self.book, user=self.users[0])
+        self.assertNoDrift(self.book)
+
+        self.client.post(reverse('edit_review', args=[review.pk]), {'rating': 5, 'review_text': 'Better'})
+        self.assertNoDrift(self.book)
+        self.assertEqual(self.book.rating_5_count, 1)
+        self.assertEqual(self.book.rating_2_count, 0)
+
+        self.client.post(reverse('delete_review', args=[review.pk]))
+        self.assertFalse(Review.objects.filter(pk=review.pk).exists())
+        self.assertNoDrift(self.book)
+
+    def test_deleting_the_user_removes_their_ratings(self):
+        Review.objects.create(book=self.book, user=self.users[0], rating=5)
+        Review.objects.create(book=self.book, user=self.users[1], rating=1)
+        self.users[0].delete()
+        self.assertNoDrift(self.book)
+        self.assertEqual(Book.objects.get(pk=self.book.pk).average_rating, 1.0)
@@ -0,0 +1,42 @@
+"""
+The inverted index finds books by whole tokens and by prefixes
+"""
+from django.test import TestCase
+from library.models import SearchPosting
+from library.search import get_search_backend
+from library.search.query import prefix_condition
+from . import make_book
+
+
+class PrefixMatchTests(TestCase):
+    def setUp(self):
+        self.jazz = make_book(1, title='Jazz Standards of 1999', author='Ella Fitz')
+        self.jade = make_book(2, title='The Jade Emperor', author='Ann Lee', description='Set in 1998')
+        self.backend = get_search_backend()
+
+    def found(self, query, search_type='all'):
+        return [book.pk for book in self.backend.search_page(query, search_type).books]
+
+    def test_tokens_whose_next_character_is_punctuation(self):
+        # The range bound after 'z' is '{' and after '9' is ':', which sort
+        # before letters and digits unless the term columns compare binary
+        self.assertEqual(self.found('jazz'), [self.jazz.pk])
+        self.assertEqual(self.found('fitz', 'author'), [self.jazz.pk])
+        self.assertEqual(self.found('1999'), [self.jazz.pk])
+
+    def test_prefixes_match_every_term_they_start(self):
+        self.assertEqual(sorted(self.found('ja')), sorted([self.jazz.pk, self.jade.pk]))
+        self.assertEqual(sorted(self.found('199')), sorted([self.jazz.pk, self.jade.pk]))
+        self.assertEqual(self.found('jaz'), [self.jazz.pk])
+
+    def test_prefix_condition_matches_the_same_terms_as_startswith(self):
+        for token in ('jazz', 'fitz', '1999', 'ja', 'z', '9'):
+            with self.subTest(token=token):
+                terms = set(SearchPosting.objects.filter(prefix_condition(token)).values_list('term', flat=True))
+                expected = {term for term in SearchPosting.objects.values_list('term', flat=True)
+                            if term.startswith(token)}
+                self.assertEqual(terms, expected)
+
+    def test_every_token_must_match(self):
+        self.assertEqual(self.found('jade 1999'), [])
+        self.assertEqual(self.found('jade emperor'), [self.jade.pk])
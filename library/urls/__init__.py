@@ -3,7 +3,7 @@ URLs Package
 Combines all URL patterns from different modules
 """
 from django.urls import path, include
-from . import books, reviews, auth, users, search
+from . import books, reviews, auth, users, search, browse, exports
 
 # Combine all URL patterns
 urlpatterns = []
@@ -14,3 +14,5 @@ urlpatterns += reviews.urlpatterns
 urlpatterns += auth.urlpatterns
 urlpatterns += users.urlpatterns
 urlpatterns += search.urlpatterns
+urlpatterns += browse.urlpatterns
+urlpatterns += exports.urlpatterns
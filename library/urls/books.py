@@ -11,6 +11,7 @@ urlpatterns = [
 
     # Book CRUD operations
     path('books/', books.book_list, name='book_list'),
+    path('books/fragment/', books.book_list_fragment, name='book_list_fragment'),
     path('books/create/', books.book_create, name='book_create'),
     path('books/<int:pk>/', books.book_detail, name='book_detail'),
     path('books/<int:pk>/edit/', books.book_update, name='book_update'),
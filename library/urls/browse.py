@@ -0,0 +1,16 @@
+"""
+Browse URLs
+Category and author browse URL patterns
+"""
+from django.urls import path
+from ..views import browse
+
+urlpatterns = [
+    # Categories
+    path('categories/', browse.category_list, name='category_list'),
+    path('categories/<int:pk>/', browse.category_detail, name='category_detail'),
+
+    # Authors
+    path('authors/', browse.author_list, name='author_list'),
+    path('authors/<int:pk>/', browse.author_detail, name='author_detail'),
+]
@@ -0,0 +1,11 @@
+"""
+Export URLs
+Staff data export URL patterns
+"""
+from django.urls import path
+from ..views import exports
+
+urlpatterns = [
+    # Streaming CSV / JSONL downloads (?format=jsonl, ?gzip=1)
+    path('exports/<slug:dataset>/', exports.export_dataset, name='export_dataset'),
+]
@@ -6,6 +6,9 @@ from django.urls import path
 from ..views import reviews
 
 urlpatterns = [
+    # Review pages for "load more" on book_detail
+    path('books/<int:pk>/reviews/', reviews.review_list_fragment, name='review_list_fragment'),
+
     # Review operations
     path('books/<int:book_id>/review/add/', reviews.add_review, name='add_review'),
     path('reviews/<int:review_id>/edit/', reviews.edit_review, name='edit_review'),
@@ -8,4 +8,6 @@ from ..views import search
 urlpatterns = [
     # Book Search
     path('search/', search.book_search, name='book_search'),
+    path('search/autocomplete/', search.book_autocomplete, name='book_autocomplete'),
+    path('search/cache-stats/', search.search_cache_stats, name='search_cache_stats'),
 ]
@@ -12,4 +12,5 @@ urlpatterns = [
 
     # Staff Dashboard
     path('staff/dashboard/', users.staff_dashboard, name='staff_dashboard'),
+    path('staff/page-cache-stats/', users.page_cache_stats, name='page_cache_stats'),
 ]
@@ -7,6 +7,7 @@ Exports all view functions for easy importing
 from .books import (
     index,
     book_list,
+    book_list_fragment,
     book_detail,
     book_create,
     book_update,
@@ -15,6 +16,7 @@ from .books import (
 
 # Review views
 from .reviews import (
+    review_list_fragment,
     add_review,
     edit_review,
     delete_review,
@@ -33,22 +35,40 @@ from .users import (
     user_dashboard,
     user_profile,
     staff_dashboard,
+    page_cache_stats,
+)
+
+# Browse views
+from .browse import (
+    category_list,
+    category_detail,
+    author_list,
+    author_detail,
 )
 
 # Search views
 from .search import (
     book_search,
+    book_autocomplete,
+    search_cache_stats,
+)
+
+# Export views
+from .exports import (
+    export_dataset,
 )
 
 __all__ = [
     # Books
     'index',
     'book_list',
+    'book_list_fragment',
     'book_detail',
     'book_create',
     'book_update',
     'book_delete',
     # Reviews
+    'review_list_fragment',
     'add_review',
     'edit_review',
     'delete_review',
@@ -61,6 +81,16 @@ __all__ = [
     'user_dashboard',
     'user_profile',
     'staff_dashboard',
+    'page_cache_stats',
+    # Browse
+    'category_list',
+    'category_detail',
+    'author_list',
+    'author_detail',
     # Search
     'book_search',
+    'book_autocomplete',
+    'search_cache_stats',
+    # Exports
+    'export_dataset',
 ]
@@ -0,0 +1,79 @@
+"""
+Static Asset Views
+Serves collected static files under STATIC_URL when no front-end server does.
+
+A request for `base.4ffc35d4549c.css` is answered from `.br` or `.gz` when
+collectstatic wrote that variant and Accept-Encoding allows it, so a
+stylesheet crosses the network compressed without being compressed per
+request. Hashed names never change content and are cached for a year.
+"""
+import mimetypes
+import os
+import re
+from django.conf import settings
+from django.views.decorators.http import require_safe
+from ..assets import ENCODINGS
+from ..storage import IMMUTABLE_CACHE_CONTROL
+from .media import MUTABLE_CACHE_CONTROL, file_headers, not_modified, stat_file, stream_file
+
+# The 12 hex digits ManifestStaticFilesStorage puts before the extension
+HASHED_STATIC_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+
+def accepted_encodings(header):
+    """
+    Return the content codings an Accept-Encoding header allows
+    """
+    accepted, refused, wildcard = set(), set(), False
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding == '*':
+            wildcard = quality > 0
+        elif coding:
+            (accepted if quality > 0 else refused).add(coding)
+    if wildcard:
+        # '*' stands for every coding not listed explicitly
+        accepted.update(coding for coding, suffix in ENCODINGS if coding not in refused)
+    return accepted
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    Serve a collected static file, or its best precompressed variant
+    """
+    path, fullpath, stat = stat_file(settings.STATIC_ROOT, path)
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    variants = [] if encoding else [
+        (coding, f'{fullpath}{suffix}') for coding, suffix in ENCODINGS if os.path.isfile(f'{fullpath}{suffix}')
+    ]
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', '')) if variants else set()
+    for coding, variant in variants:
+        if coding in accepted:
+            fullpath, stat, encoding = variant, os.stat(variant), coding
+            break
+
+    headers = file_headers(
+        stat, IMMUTABLE_CACHE_CONTROL if HASHED_STATIC_NAME.search(path) else MUTABLE_CACHE_CONTROL
+    )
+    if variants:
+        headers['Vary'] = 'Accept-Encoding'
+    response = not_modified(request, stat, headers)
+    if response is not None:
+        return response
+
+    response = stream_file(request, fullpath, stat, headers, content_type)
+    if encoding and response.status_code != 416:
+        response['Content-Encoding'] = encoding
+    return response
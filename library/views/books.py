@@ -2,59 +2,100 @@
 Book CRUD Views
 Handles all book-related operations including list, detail, create, update, and delete
 """
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from ..models import Book
+from django.template.loader import render_to_string
+from django.utils.functional import SimpleLazyObject
+from .. import homepage
+from ..conditional import book_etag, book_last_modified, book_page_state, catalogue_etag, conditional_page
+from ..page_cache import cache_anonymous_page, catalogue_parts, homepage_parts, page_cache_settings
+from ..models import Book, Review
 from ..forms import BookForm
+from ..pagination import KeysetPaginator, request_cursor
+from .reviews import REVIEW_SORTS, review_list_parts, review_list_variant, review_page, review_sort
 
+# Books per catalogue page and per infinite-scroll fragment
+BOOKS_PER_PAGE = 24
 
-def index(request):
-    """Home page view"""
-    # Get recently added books (limit to 8 for home page display)
-    recent_books = Book.objects.all().order_by('-id')[:8]
 
-    # Get statistics
-    total_books = Book.objects.count()
-    total_categories = Book.objects.values('category').distinct().count()
-    total_authors = Book.objects.values('author').distinct().count()
-    available_books = Book.objects.filter(available_copies__gt=0).count()
+def catalogue_page(cursor=None):
+    """Return the keyset page of catalogue cards after `cursor`, in (title, id) order"""
+    return KeysetPaginator(Book.objects.cards(), ('title', 'id'), BOOKS_PER_PAGE).get_page(cursor)
 
+
+@cache_anonymous_page(homepage_parts)
+def index(request):
+    """Home page view"""
+    # Recently added books and statistics come from the shared cache
     context = {
-        'recent_books': recent_books,
-        'total_books': total_books,
-        'total_categories': total_categories,
-        'total_authors': total_authors,
-        'available_books': available_books,
+        'recent_books': homepage.recent_books(),
+        **homepage.catalogue_stats(),
     }
     return render(request, 'library/index.html', context)
 
 
+@conditional_page(catalogue_etag)
+@cache_anonymous_page(catalogue_parts, params=('cursor',))
 def book_list(request):
-    """Display list of all books"""
-    books = Book.objects.all().order_by('title')
+    """Display the catalogue one keyset page at a time"""
+    page = catalogue_page(request_cursor(request))
     context = {
-        'books': books
+        'books': page.items,
+        'page': page,
     }
     return render(request, 'library/books/book_list.html', context)
 
 
+@conditional_page(catalogue_etag)
+@cache_anonymous_page(catalogue_parts, params=('cursor',))
+def book_list_fragment(request):
+    """Return the next catalogue page as rendered cards for infinite scrolling"""
+    page = catalogue_page(request_cursor(request))
+    html = render_to_string('library/books/_book_cards.html', {'books': page.items}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': page.next_cursor})
+
+
+@conditional_page(book_etag, book_last_modified)
+@cache_anonymous_page(review_list_parts, params=('cursor',))
 def book_detail(request, pk):
-    """Display details of a single book with reviews"""
+    """
+    Display details of a single book with one keyset page of its reviews.
+    The book information and review list are cached template fragments shared
+    by all users; only the review and staff controls are rendered per user,
+    and a reader who reviewed the book gets a list without their own review.
+    """
     book = get_object_or_404(Book, pk=pk)
-    reviews = book.reviews.all().select_related('user')
+    sort = review_sort(request)
+    cursor = request_cursor(request)
 
-    # Check if current user has already reviewed this book
+    # The reader's own review is pinned above the list (one lookup on the unique (book, user) index)
     user_review = None
     if request.user.is_authenticated:
-        user_review = reviews.filter(user=request.user).first()
+        user_review = Review.objects.filter(book=book, user=request.user).first()
+    # ...and left out of it; only queried when the review list fragment is not cached
+    pinned_user = user_review.user_id if user_review else None
+    reviews = SimpleLazyObject(lambda: review_page(book.pk, sort, cursor, exclude_user=pinned_user))
 
+    updated_at, last_review = book_page_state(request, pk)
     context = {
         'book': book,
         'reviews': reviews,
+        'review_sort': sort,
+        'review_sorts': REVIEW_SORTS,
+        'review_cursor': cursor or '',
         'user_review': user_review,
+        'pinned_review': user_review.pk if user_review else 0,
+        # Fragment keys: the book row and its newest review change, from the
+        # indexed state lookup the ETag check already made for this request
+        'book_version': updated_at.timestamp(),
+        'review_version': last_review.timestamp() if last_review else 0,
+        'review_list_variant': review_list_variant(request),
+        'fragment_timeout': page_cache_settings()['TIMEOUT'],
         'average_rating': book.get_average_rating(),
-        'review_count': book.get_review_count()
+        'review_count': book.get_review_count(),
+        'rating_histogram': book.get_rating_histogram()
     }
     return render(request, 'library/books/book_detail.html', context)
 
@@ -0,0 +1,58 @@
+"""
+Browse Views
+Handles browsing the catalogue by category and by author
+"""
+from django.shortcuts import render, get_object_or_404
+from ..models import Author, Book, Category
+from ..pagination import KeysetPaginator
+
+# Entries per page of the author and category indexes
+ENTITIES_PER_PAGE = 60
+# Books per page of a single author or category
+BOOKS_PER_PAGE = 24
+
+
+def category_list(request):
+    """List categories with their book counts"""
+    return _entity_list(request, Category, 'library/browse/category_list.html')
+
+
+def category_detail(request, pk):
+    """List the books of one category"""
+    category = get_object_or_404(Category, pk=pk)
+    return _entity_detail(request, category, Book.objects.filter(category_ref=category),
+                          'library/browse/category_detail.html')
+
+
+def author_list(request):
+    """List authors with their book counts"""
+    return _entity_list(request, Author, 'library/browse/author_list.html')
+
+
+def author_detail(request, pk):
+    """List the books of one author"""
+    author = get_object_or_404(Author, pk=pk)
+    return _entity_detail(request, author, Book.objects.filter(author_ref=author),
+                          'library/browse/author_detail.html')
+
+
+def _entity_list(request, model, template_name):
+    # Seeks along the (name, id) index; book counts are read off the rows
+    entities = model.objects.filter(book_count__gt=0).only('pk', 'name', 'book_count')
+    page = KeysetPaginator(entities, ('name', 'id'), ENTITIES_PER_PAGE).get_page(request.GET.get('cursor'))
+    context = {
+        'entities': page.items,
+        'page': page,
+    }
+    return render(request, template_name, context)
+
+
+def _entity_detail(request, entity, books, template_name):
+    # Seeks along the (fk, title, id) index of the books table
+    page = KeysetPaginator(books.cards(), ('title', 'id'), BOOKS_PER_PAGE).get_page(request.GET.get('cursor'))
+    context = {
+        'entity': entity,
+        'books': page.items,
+        'page': page,
+    }
+    return render(request, template_name, context)
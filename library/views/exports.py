@@ -0,0 +1,37 @@
+"""
+Export Views
+Handles streaming downloads of the catalogue and its reviews for staff
+"""
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils import timezone
+from .. import exporting
+
+
+@login_required
+def export_dataset(request, dataset):
+    """
+    Stream all books or reviews as CSV or JSON Lines - Staff only.
+    ?format=csv|jsonl picks the format and ?gzip=1 compresses on the fly.
+    """
+    if not request.user.is_staff:
+        messages.error(request, 'Only library staff can export data.')
+        return redirect('user_dashboard')
+    if dataset not in exporting.DATASETS:
+        raise Http404('Unknown export')
+
+    output_format = request.GET.get('format', 'csv')
+    if output_format not in exporting.FORMATS:
+        output_format = 'csv'
+    compress = request.GET.get('gzip') == '1'
+
+    response = StreamingHttpResponse(
+        exporting.export_stream(dataset, output_format, compress),
+        content_type='application/gzip' if compress else exporting.FORMATS[output_format],
+    )
+    filename = exporting.export_filename(dataset, output_format, compress, timezone.localdate())
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,184 @@
+"""
+Media Views
+Serves uploaded files under MEDIA_URL.
+
+With MEDIA_SERVE_MODE set, the view only checks the request and hands the
+transfer to the front-end server through X-Accel-Redirect (nginx) or
+X-Sendfile (Apache, lighttpd), so no Python worker is held while the bytes go
+out. Otherwise the file is streamed through FileResponse, which WSGI servers
+with a file wrapper (gunicorn, uWSGI) send with sendfile(). Either way the
+response carries ETag and Last-Modified, and conditional and single-range
+requests are answered with 304, 206 or 416.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from ..covers import is_rendition
+from ..storage import IMMUTABLE_CACHE_CONTROL, is_content_addressed
+
+# Cache lifetime of media whose name does not change with its content
+MUTABLE_CACHE_CONTROL = 'public, max-age=3600'
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    Read-only view of `length` bytes of an open file starting at `start`.
+    It keeps fileno(), so a WSGI file wrapper can still sendfile() the range:
+    the file is positioned at `start` and Content-Length bounds the transfer.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) of a single satisfiable byte range, None to send the
+    whole file, or False when the range cannot be satisfied
+    """
+    match = RANGE_HEADER.match(header.replace(' ', ''))
+    if match is None:
+        # Malformed or multiple ranges: ignoring the header is allowed
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def range_applies(request, etag, mtime):
+    """
+    Honour Range unless If-Range names an older version of the file
+    """
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def stat_file(root, path):
+    """
+    Return (normalized path, full path, stat) of a regular file below root, or raise Http404
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(root, path)
+        stat = os.stat(fullpath)
+    except (OSError, ValueError):
+        raise Http404('File not found')
+    if not os.path.isfile(fullpath):
+        raise Http404('File not found')
+    return path, fullpath, stat
+
+
+def file_headers(stat, cache_control):
+    return {
+        'ETag': file_etag(stat),
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': cache_control,
+    }
+
+
+def not_modified(request, stat, headers):
+    """
+    Return the 304 answering a conditional request for the file, or None
+    """
+    response = get_conditional_response(request, etag=headers['ETag'], last_modified=int(stat.st_mtime))
+    if response is not None:
+        for header in ('ETag', 'Cache-Control', 'Last-Modified', 'Vary'):
+            if header in headers:
+                response.headers.setdefault(header, headers[header])
+    return response
+
+
+def stream_file(request, fullpath, stat, headers, content_type):
+    """
+    Return a FileResponse for the file, or for the single byte range requested
+    """
+    size = stat.st_size
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and range_applies(request, headers['ETag'], stat.st_mtime):
+        byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range is False:
+        return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+
+    file = open(fullpath, 'rb')
+    if byte_range is None:
+        return FileResponse(file, content_type=content_type, headers=headers)
+    start, end = byte_range
+    response = FileResponse(FileRange(file, start, end - start + 1), status=206, content_type=content_type,
+                            headers=headers)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = end - start + 1
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a file below MEDIA_ROOT, or delegate it to the front-end server
+    """
+    path, fullpath, stat = stat_file(settings.MEDIA_ROOT, path)
+    headers = file_headers(
+        stat,
+        IMMUTABLE_CACHE_CONTROL if is_content_addressed(path) or is_rendition(path) else MUTABLE_CACHE_CONTROL
+    )
+    response = not_modified(request, stat, headers)
+    if response is not None:
+        return response
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    mode = settings.MEDIA_SERVE_MODE
+    if mode:
+        # The front-end server answers Range and sends the bytes itself
+        response = HttpResponse(content_type=content_type, headers=headers)
+        if mode == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + path
+        else:
+            response['X-Sendfile'] = fullpath
+        return response
+
+    response = stream_file(request, fullpath, stat, headers, content_type)
+    if encoding and response.status_code != 416:
+        response['Content-Encoding'] = encoding
+    return response
@@ -1,12 +1,75 @@
 """
 Review Views
-Handles all review-related operations including add, edit, and delete
+Handles all review-related operations including listing, add, edit, and delete
 """
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.template.loader import render_to_string
+from ..conditional import book_etag, book_page_state, conditional_page
+from ..page_cache import book_parts, cache_anonymous_page
 from ..models import Book, Review
 from ..forms import ReviewForm
+from ..pagination import KeysetPaginator, request_cursor
+
+# Reviews per page on book_detail and per "load more" fragment
+REVIEWS_PER_PAGE = 10
+
+# Every column of a sort runs in one direction, so the (book, created_at, id)
+# and (book, rating, created_at, id) indexes serve each sort as a range scan
+REVIEW_SORTS = {
+    'newest': ('-created_at', '-id'),
+    'highest': ('-rating', '-created_at', '-id'),
+    'lowest': ('rating', 'created_at', 'id'),
+}
+
+
+def review_sort(request):
+    """Return the review sort named in the query string, newest by default"""
+    sort = request.GET.get('sort')
+    return sort if sort in REVIEW_SORTS else 'newest'
+
+
+def review_page(book_id, sort, cursor=None, exclude_user=None):
+    """
+    Return the keyset page of a book's reviews after `cursor` in the given sort,
+    without the review of `exclude_user` (pinned separately for its author)
+    """
+    reviews = Review.objects.filter(book_id=book_id).select_related('user')
+    if exclude_user is not None:
+        reviews = reviews.exclude(user_id=exclude_user)
+    return KeysetPaginator(reviews, REVIEW_SORTS[sort], REVIEWS_PER_PAGE).get_page(cursor)
+
+
+def review_list_parts(request, pk):
+    """Page cache key parts of pages listing a book's reviews: its state and the sort"""
+    state = book_parts(request, pk)
+    return None if state is None else [*state, review_sort(request)]
+
+
+def review_list_variant(request):
+    # Staff see moderation buttons on every review, so they get their own copy of the list
+    return 'staff' if request.user.is_staff else 'public'
+
+
+@conditional_page(book_etag)
+@cache_anonymous_page(review_list_parts, params=('cursor',))
+def review_list_fragment(request, pk):
+    """
+    Return the next page of a book's reviews as rendered items for "load more"
+    """
+    if book_page_state(request, pk) is None:
+        raise Http404('Book not found')
+    reader = request.user.pk if request.user.is_authenticated else None
+    page = review_page(pk, review_sort(request), request_cursor(request), exclude_user=reader)
+    context = {
+        'reviews': page.items,
+        'review_list_variant': review_list_variant(request),
+    }
+    html = render_to_string('library/reviews/_review_items.html', context, request=request)
+    return JsonResponse({'html': html, 'next_cursor': page.next_cursor})
 
 
 @login_required
@@ -29,7 +92,9 @@ def add_review(request, book_id):
             review = form.save(commit=False)
             review.book = book
             review.user = request.user
-            review.save()
+            # The review and the book's rating aggregates commit together
+            with transaction.atomic():
+                review.save()
             messages.success(request, 'Your review has been added successfully!')
             return redirect('book_detail', pk=book.pk)
     else:
@@ -57,7 +122,8 @@ def edit_review(request, review_id):
     if request.method == 'POST':
         form = ReviewForm(request.POST, instance=review)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
             messages.success(request, 'Your review has been updated successfully!')
             return redirect('book_detail', pk=review.book.pk)
     else:
@@ -87,7 +153,8 @@ def delete_review(request, review_id):
     if request.method == 'POST':
         book_pk = review.book.pk
         review_author = review.user.username
-        review.delete()
+        with transaction.atomic():
+            review.delete()
 
         # Different message for staff moderation
         if request.user.is_staff and review.user != request.user:
@@ -2,36 +2,97 @@
 Search Views
 Handles book search functionality
 """
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import render
-from django.db.models import Q
-from ..models import Book
+from django.urls import reverse
+from django.utils.http import urlencode
+from ..search import get_search_backend
+from ..catalogue import catalogue_version
+from ..conditional import catalogue_etag, conditional_page
+from ..page_cache import cache_anonymous_page
+from ..pagination import request_cursor
+from ..search import facets, result_cache
+from ..search.autocomplete import get_prefix_index
+from ..search.conf import SEARCH_TYPE_FIELDS, search_settings
 
 
-def book_search(request):
-    """Search books by title, author, or genre"""
-    query = request.GET.get('q', '')
+def search_params(request):
+    """
+    Return the query, search type and facet filters of a search request in
+    canonical form, so equivalent requests share cache entries
+    """
+    query = ' '.join(request.GET.get('q', '').split())
     search_type = request.GET.get('type', 'all')
+    if search_type not in SEARCH_TYPE_FIELDS:
+        search_type = 'all'
+    return query, search_type, facets.parse_filters(request.GET)
+
+
+def search_parts(request):
+    query, search_type, filters = search_params(request)
+    return [catalogue_version(), query, search_type, sorted(filters.items())]
 
-    books = Book.objects.all()
+
+@conditional_page(catalogue_etag)
+@cache_anonymous_page(search_parts, params=('cursor',))
+def book_search(request):
+    """Search books by title, author, or genre, one keyset page at a time, with facet drill-down"""
+    query, search_type, filters = search_params(request)
+    cursor = request_cursor(request)
+
+    results = None
+    facet_counts = None
 
     if query:
-        if search_type == 'title':
-            books = books.filter(title__icontains=query)
-        elif search_type == 'author':
-            books = books.filter(author__icontains=query)
-        elif search_type == 'genre':
-            books = books.filter(category__icontains=query)
-        else:  # 'all' - search in all fields
-            books = books.filter(
-                Q(title__icontains=query) |
-                Q(author__icontains=query) |
-                Q(category__icontains=query) |
-                Q(description__icontains=query)
-            )
+        backend = get_search_backend()
+        results = result_cache.search_page(backend, query, search_type, cursor=cursor, filters=filters, count=False)
+        # Facets describe whatever query was actually answered, corrected or not
+        answered = results.suggestion or query
+        rows, complete = facets.cached_grouped_rows(backend, answered, search_type)
+        facet_counts = facets.FacetCounts(rows, filters, complete)
+        if complete:
+            # Grouped rows of every match hold the exact size of the filtered result set
+            results.count, results.count_is_exact = facet_counts.total, True
+        else:
+            results.count, results.count_is_exact = result_cache.match_count(backend, answered, search_type, filters)
 
     context = {
-        'books': books,
+        'books': results.books if results else [],
+        'results': results,
+        'did_you_mean': results.suggestion if results else None,
+        'facets': facet_counts.facets({'q': query, 'type': search_type}) if facet_counts else [],
+        'facets_partial': facet_counts is not None and not facet_counts.complete,
+        'facet_sample_size': search_settings()['EXACT_COUNT_THRESHOLD'],
+        'filters': filters,
+        'filter_query': facets.filter_params(filters),
         'query': query,
         'search_type': search_type
     }
     return render(request, 'library/search/search_results.html', context)
+
+
+def book_autocomplete(request):
+    """Return JSON title and author suggestions for a partially typed query"""
+    query = request.GET.get('q', '')
+    suggestions = get_prefix_index().suggest(query, limit=search_settings()['AUTOCOMPLETE_LIMIT'])
+
+    for suggestion in suggestions:
+        if suggestion['book_id']:
+            suggestion['url'] = reverse('book_detail', args=[suggestion['book_id']])
+        else:
+            suggestion['url'] = f"{reverse('book_search')}?{urlencode({'type': 'author', 'q': suggestion['label']})}"
+
+    return JsonResponse({'query': query, 'suggestions': suggestions})
+
+
+@login_required
+def search_cache_stats(request):
+    """Return this worker's search result cache counters as JSON (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff access required.'}, status=403)
+
+    return JsonResponse({
+        'catalogue_version': catalogue_version(),
+        'result_cache': result_cache.get_result_cache().stats(),
+    })
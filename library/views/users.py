@@ -2,10 +2,11 @@
 User Dashboard and Profile Views
 Handles user dashboard, profile management, and staff dashboard
 """
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Avg
+from .. import leaderboard, page_cache
 from ..models import Book, UserProfile, Review
 from ..forms import UserProfileForm, UserUpdateForm
 
@@ -63,16 +64,30 @@ def staff_dashboard(request):
     # Get recent reviews
     recent_reviews = Review.objects.all().select_related('book', 'user').order_by('-created_at')[:10]
 
-    # Get top-rated books
-    top_rated_books = Book.objects.annotate(
-        avg_rating=Avg('reviews__rating')
-    ).filter(avg_rating__isnull=False).order_by('-avg_rating')[:5]
+    # Get top-rated books from the materialized leaderboard
+    leaderboard_config = leaderboard.leaderboard_settings()
+    window = request.GET.get('window', leaderboard_config['DEFAULT_WINDOW'])
+    if window not in leaderboard_config['WINDOWS']:
+        window = leaderboard_config['DEFAULT_WINDOW']
+    top_rated_books, leaderboard_refreshed_at = leaderboard.top_entries(window)
 
     context = {
         'total_books': total_books,
         'total_users': total_users,
         'total_reviews': total_reviews,
         'recent_reviews': recent_reviews,
-        'top_rated_books': top_rated_books
+        'top_rated_books': top_rated_books,
+        'leaderboard_window': window,
+        'leaderboard_refreshed_at': leaderboard_refreshed_at,
+        'leaderboard_windows': leaderboard_config['WINDOWS'],
     }
     return render(request, 'library/users/staff_dashboard.html', context)
+
+
+@login_required
+def page_cache_stats(request):
+    """Return the anonymous page cache counters as JSON (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff access required.'}, status=403)
+
+    return JsonResponse(page_cache.stats())